@@ -0,0 +1,75 @@
+"""Adaptive TDEE: refine the formula TDEE from logged weights with a one-dimensional Kalman filter.
+
+Energy balance gives one noisy TDEE observation per weight log:
+    observed_tdee = planned_intake - KCAL_PER_KG * (trend weight change per day)
+Each update is O(1) and only needs the previous state, so nothing re-reads the weight history.
+"""
+import math
+
+from app.ai_engine.calorie_engine import KCAL_PER_KG
+
+# Time constant (days) of the exponentially smoothed weight trend
+TREND_TAU_DAYS = 10.0
+# Day-to-day scale noise of the smoothed trend (kg, standard deviation)
+TREND_NOISE_KG = 0.3
+# How much true TDEE can drift per day (kcal/day standard deviation)
+PROCESS_NOISE_KCAL = 15.0
+# Starting uncertainty around the formula TDEE (kcal/day standard deviation)
+INITIAL_SD_KCAL = 300.0
+# Keep estimates within a physiologically sensible band
+MIN_TDEE, MAX_TDEE = 1000.0, 5000.0
+
+
+def smooth_weight(prev_trend_kg, weight_kg, days):
+    """Time-aware exponential smoothing: a gap of `days` moves the trend further toward the new weight."""
+    if prev_trend_kg is None:
+        return float(weight_kg)
+    alpha = 1.0 - math.exp(-max(days, 1) / TREND_TAU_DAYS)
+    return prev_trend_kg + alpha * (float(weight_kg) - prev_trend_kg)
+
+
+def kalman_update(tdee, variance, observed_tdee, days):
+    """
+    One scalar Kalman step. The prior variance grows with elapsed days (TDEE drifts); the observation
+    is noisier for short gaps because a small weight change is divided by few days.
+    Returns (tdee, variance).
+    """
+    days = max(days, 1)
+    prior_var = variance + (PROCESS_NOISE_KCAL ** 2) * days
+    obs_sd = KCAL_PER_KG * math.sqrt(2) * TREND_NOISE_KG / days
+    gain = prior_var / (prior_var + obs_sd ** 2)
+    tdee = tdee + gain * (observed_tdee - tdee)
+    return min(max(tdee, MIN_TDEE), MAX_TDEE), (1 - gain) * prior_var
+
+
+def update_estimate(state, weight_kg, logged_at, planned_intake, formula_tdee):
+    """
+    Fold one weight log into the estimator state (dict with tdee, variance, trend_weight_kg,
+    last_logged_at, num_updates; empty dict for a new user). Returns the new state dict.
+    Logs dated on or before the last processed one (backfills) leave the state unchanged.
+    """
+    if not state or state.get("tdee") is None:
+        return {
+            "tdee": float(formula_tdee),
+            "variance": INITIAL_SD_KCAL ** 2,
+            "trend_weight_kg": float(weight_kg),
+            "last_logged_at": logged_at,
+            "num_updates": 0,
+        }
+    last = state.get("last_logged_at")
+    if last is not None and logged_at <= last:
+        return dict(state)
+    days = (logged_at - last).days if last is not None else 1
+    trend = smooth_weight(state.get("trend_weight_kg"), weight_kg, days)
+    prev_trend = state.get("trend_weight_kg")
+    if prev_trend is None:
+        prev_trend = trend
+    observed = float(planned_intake) - KCAL_PER_KG * (trend - prev_trend) / max(days, 1)
+    tdee, variance = kalman_update(state["tdee"], state["variance"], observed, days)
+    return {
+        "tdee": tdee,
+        "variance": variance,
+        "trend_weight_kg": trend,
+        "last_logged_at": logged_at,
+        "num_updates": (state.get("num_updates") or 0) + 1,
+    }
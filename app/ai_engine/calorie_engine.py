@@ -1,4 +1,5 @@
 """Calorie engine: BMI, BMR, TDEE, daily calorie target, ideal weight, and time-to-goal estimate."""
+import numpy as np
 
 # Approximate kcal per kg body-weight change (mixed tissue/fat)
 KCAL_PER_KG = 7700
@@ -35,9 +36,10 @@ def get_calorie_target(tdee, goal):
     return round(tdee, 0)  # maintain
 
 
-def get_all_metrics(user, activity_factor=1.4, weight_kg_override=None):
+def get_all_metrics(user, activity_factor=1.4, weight_kg_override=None, tdee_override=None):
     """Return dict with bmi, bmr, tdee, calorie_target for the given user object.
-    If weight_kg_override is set (e.g. last logged weight), it is used instead of user.weight_kg."""
+    If weight_kg_override is set (e.g. last logged weight), it is used instead of user.weight_kg.
+    If tdee_override is set (adaptive estimate from weight logs), it replaces BMR × activity factor."""
     weight = weight_kg_override if weight_kg_override is not None else (getattr(user, "weight_kg", 70) or 70)
     height = getattr(user, "height_cm", 170) or 170
     age = getattr(user, "age", 25) or 25
@@ -46,7 +48,7 @@ def get_all_metrics(user, activity_factor=1.4, weight_kg_override=None):
 
     bmi = calculate_bmi(weight, height)
     bmr = calculate_bmr(weight, height, age, gender)
-    tdee = calculate_tdee(bmr, activity_factor)
+    tdee = calculate_tdee(bmr, activity_factor) if tdee_override is None else round(tdee_override, 0)
     calorie_target = get_calorie_target(tdee, goal)
 
     return {
@@ -55,6 +57,7 @@ def get_all_metrics(user, activity_factor=1.4, weight_kg_override=None):
         "tdee": tdee,
         "calorie_target": calorie_target,
         "activity_factor": activity_factor,
+        "adaptive": tdee_override is not None,
     }
 
 
@@ -108,4 +111,144 @@ def estimate_weeks_to_weight(
         weeks = (target_kg - current_kg) / kg_per_week
         return weeks, "gain"
     else:
-        return None, "maintain"
\ No newline at end of file
+        return None, "maintain"
+
+
+# ----- Batch (cohort) versions: same formulas over NumPy arrays -----
+
+# estimate_weeks_to_weight's capped rates (kg/week) for get_calorie_target's -500 / +300 kcal offsets. The
+# offsets always give a deficit or surplus, so "no_deficit" / "no_surplus" cannot occur here.
+_LOSS_KG_PER_WEEK = min(500.0 * 7 / KCAL_PER_KG, 1.0)
+_GAIN_KG_PER_WEEK = min(300.0 * 7 / KCAL_PER_KG, 0.35)
+_WEEKS_MESSAGES = ["maintain", "loss", "no_deficit", "already_at_or_below", "gain", "no_surplus", "already_at_or_above"]
+
+
+def _round_array(values, ndigits):
+    """np.round that matches Python's round() exactly, including ties that float scaling gets wrong."""
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    whole = np.round(scaled)
+    rounded = whole / scale
+    # Only values within a rounding error of a .5 boundary can disagree with round(); redo those in Python.
+    # 1e-9 exceeds that error while |scaled| < 2**22, far beyond any body metric.
+    for i in np.flatnonzero(np.abs(scaled - whole) > 0.5 - 1e-9):
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+def _number_array(values, default, size):
+    """Float array where missing/zero entries get the same default get_all_metrics uses."""
+    arr = np.array(np.broadcast_to(np.asarray(values if values is not None else default, dtype=float), (size,)))
+    arr[np.isnan(arr) | (arr == 0)] = default
+    return arr
+
+
+def _classify(values, default, size, classify):
+    """Map each string in values to classify(stripped lower-case string) -> int code.
+    Each distinct value is classified once, so Python work is O(unique values)."""
+    import pandas as pd  # only the batch functions need pandas; keep it off the per-user import path
+
+    if np.ndim(values) == 0:
+        label = str(values).strip().lower() if values is not None else ""
+        return np.full(size, classify(label or default.lower()))
+    codes, uniques = pd.factorize(values)  # categoricals reuse their codes
+    labels = [str(u).strip().lower() for u in uniques]
+    table = np.array([classify(label or default.lower()) for label in labels] + [classify(default.lower())])
+    return table[codes]  # code -1 (missing) picks the default, last entry
+
+
+def _gender_code(s):
+    """1 for male, 0 otherwise (same rule as calculate_bmr)."""
+    return 1 if s in ("male", "m") else 0
+
+
+def _goal_code(s):
+    """-1 weight loss, 1 gain, 0 maintain (same precedence as get_calorie_target)."""
+    if "loss" in s or "lose" in s:
+        return -1
+    if "gain" in s or "muscle" in s:
+        return 1
+    return 0
+
+
+def get_all_metrics_batch(
+    weight_kg,
+    height_cm,
+    age,
+    gender,
+    goal,
+    activity_factor=1.4,
+    target_kg=None,
+):
+    """
+    Vectorized get_all_metrics for a whole cohort. Each argument is a scalar or array-like of equal length.
+    Returns a dict of NumPy arrays: bmi, bmr, tdee, calorie_target, activity_factor, ideal_weight_kg,
+    healthy_min_kg, healthy_max_kg, weeks_to_target (NaN when not applicable) and weeks_message
+    (a pandas Categorical of estimate_weeks_to_weight's message strings).
+    target_kg defaults to ideal weight, as on the dashboard. Results match the scalar functions exactly.
+    gender/goal are fastest as pandas categoricals (their codes are reused instead of hashing every string).
+    """
+    import pandas as pd
+
+    size = max(np.size(v) for v in (weight_kg, height_cm, age, gender, goal, activity_factor))
+    weight = _number_array(weight_kg, 70, size)
+    height = _number_array(height_cm, 170, size)
+    age_arr = _number_array(age, 25, size)
+    factor = np.array(np.broadcast_to(np.asarray(activity_factor, dtype=float), (size,)))
+    male = _classify(gender, "Male", size, _gender_code) == 1
+    goal_codes = _classify(goal, "Maintain Weight", size, _goal_code)
+    losing, gaining = goal_codes == -1, goal_codes == 1
+
+    height_m2 = (height / 100.0) ** 2
+    bmi = _round_array(weight / height_m2, 1)
+    bmr = np.round(10 * weight + 6.25 * height - 5 * age_arr + np.where(male, 5.0, -161.0))
+    tdee = np.round(bmr * factor)
+    # tdee is a whole number, so adding the offset needs no rounding
+    calorie_target = tdee + np.select([losing, gaining], [-500.0, 300.0], 0.0)
+    ideal = _round_array(22.0 * height_m2, 1)
+
+    # estimate_weeks_to_weight with get_calorie_target's targets (target defaults to ideal weight)
+    target = ideal if target_kg is None else _number_array(target_kg, 0, size)
+    loss_done = losing & (weight <= target)
+    gain_done = gaining & (weight >= target)
+    weeks = np.select(
+        [loss_done | gain_done, losing, gaining],
+        [np.nan, (weight - target) / _LOSS_KG_PER_WEEK, (target - weight) / _GAIN_KG_PER_WEEK],
+        np.nan,
+    )
+    messages = np.select(
+        [loss_done, losing, gain_done, gaining],
+        [_WEEKS_MESSAGES.index(m) for m in ("already_at_or_below", "loss", "already_at_or_above", "gain")],
+        _WEEKS_MESSAGES.index("maintain"),
+    )
+
+    return {
+        "bmi": bmi,
+        "bmr": bmr,
+        "tdee": tdee,
+        "calorie_target": calorie_target,
+        "activity_factor": factor,
+        "ideal_weight_kg": ideal,
+        "healthy_min_kg": _round_array(18.5 * height_m2, 1),
+        "healthy_max_kg": _round_array(24.9 * height_m2, 1),
+        "weeks_to_target": weeks,
+        # Categorical keeps messages as small integer codes instead of one string per user
+        "weeks_message": pd.Categorical.from_codes(messages, categories=_WEEKS_MESSAGES),
+    }
+
+
+def get_all_metrics_frame(df, activity_factor=1.4):
+    """
+    Batch metrics for a DataFrame with columns weight_kg, height_cm, age, gender, goal
+    (and optionally activity_factor / target_kg). Returns a copy with the metric columns added.
+    """
+    metrics = get_all_metrics_batch(
+        df["weight_kg"].to_numpy(),
+        df["height_cm"].to_numpy(),
+        df["age"].to_numpy(),
+        df["gender"],
+        df["goal"],
+        activity_factor=df["activity_factor"].to_numpy() if "activity_factor" in df else activity_factor,
+        target_kg=df["target_kg"].to_numpy() if "target_kg" in df else None,
+    )
+    return df.assign(**metrics)
@@ -1,23 +1,133 @@
-"""Gemini client: send prompts and get text (or JSON) back."""
-import google.generativeai as genai
-from app.config import GEMINI_API_KEY
+"""Gemini client: send prompts and get text (or JSON) back.
+
+generate_text goes through a pluggable backend. LLM_BACKEND selects it:
+  gemini (default)  the real API
+  record            call Gemini and save every response to the cassette store (LLM_CASSETTE_DIR)
+  replay            answer only from recorded cassettes (no network)
+  synthetic         fabricated plan JSON; SYNTHETIC_LATENCY_S, SYNTHETIC_JITTER_S, SYNTHETIC_TOKENS_PER_S,
+                    SYNTHETIC_ERROR_RATE, SYNTHETIC_429_RATE and SYNTHETIC_SEED tune it
+LLM_CACHE_TTL_S > 0 wraps the backend in a CachingBackend: identical prompts are answered from the shared
+cache (CACHE_BACKEND) for that many seconds.
+"""
+import os
+import threading
 
-genai.configure(api_key=GEMINI_API_KEY or "")
+from app.config import GEMINI_API_KEY
+from app.ai_engine.llm_backends import CachingBackend, RecordReplayBackend, SyntheticBackend
+from app.ai_engine.usage_ledger import begin_call, end_call, note_usage
+from app.tracing import span
 
 # Use a model that supports generateContent in the current API. If you get 429, try gemini-2.5-flash-lite.
 MODEL_NAME = "gemini-2.5-flash"
 
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def _get_genai():
+    """google.generativeai, imported and configured on first use (it is slow to import and only the
+    Gemini backend needs it)."""
+    global _genai
+    with _genai_lock:
+        if _genai is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=GEMINI_API_KEY or "")
+            _genai = genai
+        return _genai
+
 
 def get_model():
     """Return the Gemini model instance."""
-    return genai.GenerativeModel(MODEL_NAME)
+    return _get_genai().GenerativeModel(MODEL_NAME)
+
+
+class GeminiBackend:
+    """The real Gemini API."""
+
+    model = MODEL_NAME
+
+    def generate(self, prompt, system_instruction=None):
+        model = get_model()
+        note_usage(model=MODEL_NAME, billable=True)
+        response = model.generate_content(prompt)
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            note_usage(
+                prompt_tokens=getattr(usage, "prompt_token_count", None),
+                output_tokens=getattr(usage, "candidates_token_count", None),
+            )
+        if response and response.candidates:
+            part = response.candidates[0].content.parts[0]
+            return part.text if hasattr(part, "text") else str(part)
+        return ""
+
+
+def _env_float(name, default=0.0):
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def backend_from_env():
+    """Build the backend named by LLM_BACKEND, cached when LLM_CACHE_TTL_S is set (see module docstring)."""
+    backend = _uncached_backend_from_env()
+    ttl = _env_float("LLM_CACHE_TTL_S")
+    return CachingBackend(backend, ttl) if ttl > 0 else backend
+
+
+def _uncached_backend_from_env():
+    name = (os.getenv("LLM_BACKEND") or "gemini").strip().lower()
+    cassette_dir = os.getenv("LLM_CASSETTE_DIR") or None
+    if name == "gemini":
+        return GeminiBackend()
+    if name in ("record", "replay", "auto"):
+        inner = GeminiBackend() if name != "replay" else None
+        return RecordReplayBackend(name, cassette_dir, inner=inner, model=MODEL_NAME)
+    if name == "synthetic":
+        seed = os.getenv("SYNTHETIC_SEED")
+        return SyntheticBackend(
+            latency_s=_env_float("SYNTHETIC_LATENCY_S"),
+            latency_jitter_s=_env_float("SYNTHETIC_JITTER_S"),
+            tokens_per_s=_env_float("SYNTHETIC_TOKENS_PER_S") or None,
+            error_rate=_env_float("SYNTHETIC_ERROR_RATE"),
+            rate_limit_rate=_env_float("SYNTHETIC_429_RATE"),
+            seed=int(seed) if seed else None,
+        )
+    raise ValueError(f"Unknown LLM_BACKEND: {name!r} (expected gemini, record, replay, auto or synthetic)")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Process-wide backend, created from the environment on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = backend_from_env()
+        return _backend
+
+
+def set_backend(backend):
+    """Swap the backend (e.g. a SyntheticBackend in benchmarks). Returns the previous one."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+        return previous
 
 
 def generate_text(prompt, system_instruction=None):
-    """Send the prompt to Gemini and return the response as a string."""
-    model = get_model()
-    response = model.generate_content(prompt)
-    if response and response.candidates:
-        part = response.candidates[0].content.parts[0]
-        return part.text if hasattr(part, "text") else str(part)
-    return ""
\ No newline at end of file
+    """Send the prompt to the configured backend (Gemini by default) and return the response as a string."""
+    backend = get_backend()
+    call, token = begin_call(prompt, backend)
+    with span("llm.generate_text", backend=call.backend, prompt_chars=len(prompt)) as s:
+        try:
+            text = backend.generate(prompt, system_instruction)
+        except Exception as e:
+            end_call(call, token, error=e)
+            raise
+        end_call(call, token, text=text)
+        if s is not None:
+            s.attributes["response_chars"] = len(text or "")
+        return text
@@ -0,0 +1,86 @@
+"""Goal simulator: week-by-week weight trajectories for many what-if scenarios at once.
+
+Unlike estimate_weeks_to_weight (constant deficit, fixed TDEE), BMR and TDEE are recomputed from the
+simulated weight every week, so deficits shrink as weight drops. All scenarios (and users) are stepped
+together as one NumPy grid with shape (users, calorie_targets, activity_factors, adherence_rates, weeks + 1).
+"""
+import numpy as np
+
+from app.ai_engine.calorie_engine import KCAL_PER_KG
+
+
+def _axis(values):
+    return np.atleast_1d(np.asarray(values, dtype=float))
+
+
+def simulate_trajectories(
+    start_weight_kg,
+    height_cm,
+    age,
+    is_male,
+    calorie_targets,
+    activity_factors=(1.4,),
+    adherence_rates=(1.0,),
+    weeks=26,
+):
+    """
+    Project weekly weights. User arguments are scalars or 1-D arrays (one entry per user); scenario
+    arguments are 1-D sequences forming the grid. Adherence r means the calorie target is eaten on a
+    fraction r of days and maintenance (current TDEE) on the rest.
+    Returns float array of shape (users, targets, factors, adherence, weeks + 1); index 0 is the start.
+    """
+    w0 = _axis(start_weight_kg)
+    n_users = w0.size
+    shape_user = (n_users, 1, 1, 1)
+    height = np.broadcast_to(_axis(height_cm), (n_users,)).reshape(shape_user)
+    age_arr = np.broadcast_to(_axis(age), (n_users,)).reshape(shape_user)
+    sex_offset = np.where(np.broadcast_to(np.atleast_1d(is_male), (n_users,)), 5.0, -161.0).reshape(shape_user)
+    targets = _axis(calorie_targets).reshape(1, -1, 1, 1)
+    factors = _axis(activity_factors).reshape(1, 1, -1, 1)
+    adherence = np.clip(_axis(adherence_rates), 0.0, 1.0).reshape(1, 1, 1, -1)
+
+    grid_shape = np.broadcast_shapes(shape_user, targets.shape, factors.shape, adherence.shape)
+    out = np.empty(grid_shape + (weeks + 1,))
+    weight = np.broadcast_to(w0.reshape(shape_user), grid_shape).astype(float)
+    out[..., 0] = weight
+    # Constant part of Mifflin–St Jeor; only 10 × weight changes week to week
+    bmr_const = 6.25 * height - 5 * age_arr + sex_offset
+    for week in range(1, weeks + 1):
+        tdee = (10 * weight + bmr_const) * factors
+        daily_balance = adherence * (targets - tdee)
+        weight = weight + daily_balance * 7 / KCAL_PER_KG
+        out[..., week] = weight
+    return out
+
+
+def weeks_to_reach(trajectories, target_kg):
+    """
+    First week index at which each trajectory reaches target_kg (crossing from either side).
+    target_kg is a scalar or one value per user. Returns float array (grid shape without weeks), NaN if never.
+    """
+    target = np.asarray(target_kg, dtype=float).reshape((-1,) + (1,) * (trajectories.ndim - 1))
+    start_above = trajectories[..., :1] > target
+    reached = np.where(start_above, trajectories <= target, trajectories >= target)
+    first = np.argmax(reached, axis=-1).astype(float)
+    first[~reached.any(axis=-1)] = np.nan
+    return first
+
+
+def rank_calorie_targets(trajectories, calorie_targets, target_kg, max_kg_per_week=1.0, adherence_rates=(1.0,)):
+    """
+    For each user, order calorie targets by weeks to reach target_kg at full adherence and the first
+    activity factor, skipping targets that change weight faster than max_kg_per_week in any week.
+    adherence_rates must be the ones the trajectories were simulated with and include 1.0.
+    Returns (ranked_targets, weeks), both shaped (users, targets): calorie targets best-first
+    (unreachable/unsafe last) and their weeks-to-target (NaN if excluded).
+    """
+    full = np.flatnonzero(np.clip(_axis(adherence_rates), 0.0, 1.0) == 1.0)
+    if full.size == 0:
+        raise ValueError("adherence_rates has no full-adherence (1.0) scenario to rank")
+    traj = trajectories[:, :, 0, full[0], :]
+    weeks = weeks_to_reach(traj[:, :, None, None, :], target_kg)[:, :, 0, 0]
+    # initial=0: a zero-week simulation has no weekly changes
+    too_fast = np.abs(np.diff(traj, axis=-1)).max(axis=-1, initial=0.0) > max_kg_per_week
+    weeks[too_fast] = np.nan
+    order = np.argsort(np.where(np.isnan(weeks), np.inf, weeks), axis=1, kind="stable")
+    return np.asarray(calorie_targets, dtype=float)[order], np.take_along_axis(weeks, order, axis=1)
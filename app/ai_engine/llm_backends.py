@@ -0,0 +1,251 @@
+"""Offline LLM backends: record/replay cassettes and a synthetic plan generator.
+
+Every backend has generate(prompt, system_instruction=None) -> str, the same contract as
+gemini_client.generate_text. Pick one with LLM_BACKEND (see gemini_client.backend_from_env) or
+gemini_client.set_backend(), so load tests and benchmarks can run the full pipeline without a network.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+DEFAULT_CASSETTE_DIR = Path(__file__).resolve().parents[2] / "data" / "llm_cassettes"
+
+
+class RateLimitError(RuntimeError):
+    """Raised by the synthetic backend to mimic a Gemini 429 (quota exhausted)."""
+
+
+class SyntheticLLMError(RuntimeError):
+    """Raised by the synthetic backend to mimic a transient server error."""
+
+
+class CassetteMissError(LookupError):
+    """Replay mode found no recorded response for a prompt."""
+
+
+def prompt_key(prompt, system_instruction=None, model=""):
+    """Stable cassette key for a request (sha256 of model, system instruction and prompt)."""
+    h = hashlib.sha256()
+    for part in (model, system_instruction or "", prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class RecordReplayBackend:
+    """
+    Cassette store keyed by prompt hash, one JSON file per response in cassette_dir.
+    mode="record": call `inner` and save its response (overwriting). mode="replay": only read cassettes,
+    raising CassetteMissError for unknown prompts. mode="auto": replay when recorded, otherwise record.
+    """
+
+    MODES = ("record", "replay", "auto")
+
+    def __init__(self, mode="replay", cassette_dir=None, inner=None, model=""):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cassette mode: {mode!r}")
+        if mode != "replay" and inner is None:
+            raise ValueError(f"Cassette mode {mode!r} needs an inner backend to record from")
+        self.mode = mode
+        self.cassette_dir = Path(cassette_dir or DEFAULT_CASSETTE_DIR)
+        self.inner = inner
+        self.model = model
+
+    def _path(self, key):
+        return self.cassette_dir / f"{key}.json"
+
+    def load(self, prompt, system_instruction=None):
+        """Recorded response text for this prompt, or None."""
+        path = self._path(prompt_key(prompt, system_instruction, self.model))
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["response"]
+
+    def save(self, prompt, system_instruction, response):
+        key = prompt_key(prompt, system_instruction, self.model)
+        self.cassette_dir.mkdir(parents=True, exist_ok=True)
+        record = {
+            "key": key,
+            "model": self.model,
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "prompt_preview": prompt[:200],
+            "response": response,
+        }
+        # Write then rename so concurrent readers never see a half-written cassette
+        fd, tmp = tempfile.mkstemp(dir=self.cassette_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self._path(key))
+
+    def generate(self, prompt, system_instruction=None):
+        if self.mode != "record":
+            recorded = self.load(prompt, system_instruction)
+            if recorded is not None:
+                return recorded
+            if self.mode == "replay":
+                raise CassetteMissError(
+                    f"No cassette for prompt {prompt_key(prompt, system_instruction, self.model)[:12]} "
+                    f"in {self.cassette_dir}; record it with LLM_BACKEND=record"
+                )
+        response = self.inner.generate(prompt, system_instruction)
+        if response:
+            self.save(prompt, system_instruction, response)
+        return response
+
+
+class CachingBackend:
+    """
+    Answers repeated prompts from the shared cache (app.cache, namespace "llm") for ttl seconds, so
+    identical requests from any worker reach `inner` once. Only non-empty responses are cached; a hit is not
+    billed. Enable with LLM_CACHE_TTL_S (see gemini_client.backend_from_env).
+    """
+
+    NAMESPACE = "llm"
+
+    def __init__(self, inner, ttl, cache=None):
+        self.inner = inner
+        self.ttl = ttl
+        self.model = getattr(inner, "model", "")
+        self._cache = cache
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            from app.cache import get_cache
+
+            return get_cache()
+        return self._cache
+
+    def generate(self, prompt, system_instruction=None):
+        key = prompt_key(prompt, system_instruction, self.model)
+        cached = self.cache.get(self.NAMESPACE, key)
+        if cached is not None:
+            return cached
+        response = self.inner.generate(prompt, system_instruction)
+        if response:
+            self.cache.set(self.NAMESPACE, key, response, ttl=self.ttl)
+        return response
+
+
+# Staples for synthetic grocery lists: (name, weekly quantity, approx cost ₹, reusable)
+_SYNTHETIC_GROCERIES = [
+    ("Rice", "1 kg", 70, "yes"), ("Atta", "1 kg", 50, "yes"), ("Toor Dal", "500g", 80, "yes"),
+    ("Cooking Oil", "1 litre", 180, "yes"), ("Salt", "200g", 20, "yes"), ("Turmeric", "50g", 30, "yes"),
+    ("Milk", "3 litre", 180, "no"), ("Curd", "500g", 60, "no"), ("Onion", "1 kg", 40, "no"),
+    ("Tomato", "1 kg", 40, "no"), ("Banana", "12 pieces", 60, "no"), ("Eggs", "12 pieces", 84, "no"),
+    ("Spinach", "500g", 40, "no"), ("Oats", "500g", 90, "yes"), ("Peanuts", "250g", 50, "yes"),
+]
+_SYNTHETIC_DISHES = ["Poha", "Upma", "Dal Rice", "Veg Pulao", "Chana Salad", "Roti Sabzi", "Oats Porridge",
+                     "Moong Chilla", "Curd Rice", "Fruit Bowl", "Peanut Chikki", "Warm Milk"]
+# Share of the daily calorie target per meal slot (same order as SLOT_ORDER)
+_SLOT_SHARES = [0.05, 0.2, 0.1, 0.27, 0.1, 0.23, 0.05]
+
+
+def _search(pattern, text, default, cast=int):
+    m = re.search(pattern, text)
+    return cast(m.group(1)) if m else default
+
+
+class SyntheticBackend:
+    """
+    Fabricates valid meal/workout plan JSON from the prompt (days, calorie target, budget, exercise IDs).
+    latency_s (+ uniform jitter up to latency_jitter_s) and output tokens / tokens_per_s set the delay;
+    error_rate and rate_limit_rate inject SyntheticLLMError and RateLimitError (message contains "429").
+    fenced wraps the JSON in a ```json block like the real model often does.
+    """
+
+    model = "synthetic"
+
+    def __init__(self, latency_s=0.0, latency_jitter_s=0.0, tokens_per_s=None, error_rate=0.0,
+                 rate_limit_rate=0.0, seed=None, fenced=False):
+        self.latency_s = latency_s
+        self.latency_jitter_s = latency_jitter_s
+        self.tokens_per_s = tokens_per_s
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.fenced = fenced
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        with self._lock:
+            return self._rng.random(), self._rng.random(), self._rng.randrange(1 << 30)
+
+    def generate(self, prompt, system_instruction=None):
+        fault, jitter, seed = self._draw()
+        rng = random.Random(seed)
+        if fault < self.rate_limit_rate:
+            time.sleep(self.latency_s)
+            raise RateLimitError("429 Resource has been exhausted (e.g. check quota). [synthetic]")
+        if fault < self.rate_limit_rate + self.error_rate:
+            time.sleep(self.latency_s)
+            raise SyntheticLLMError("500 Internal error encountered. [synthetic]")
+        if "workout plan" in prompt:
+            plan = self._workout_plan(prompt, rng)
+        else:
+            plan = self._meal_plan(prompt, rng)
+        text = json.dumps(plan, ensure_ascii=False)
+        if self.fenced:
+            text = f"```json\n{text}\n```"
+        delay = self.latency_s + jitter * self.latency_jitter_s
+        if self.tokens_per_s:
+            delay += (len(text) / 4) / self.tokens_per_s  # ~4 characters per token
+        if delay > 0:
+            time.sleep(delay)
+        return text
+
+    def _meal_plan(self, prompt, rng):
+        from app.ai_engine.meal_plan_generator import SLOT_ORDER
+
+        num_days = _search(r"Generate a (\d+)-day meal plan", prompt, 7)
+        target = _search(r"calorie target≈(\d+(?:\.\d+)?)", prompt, 2000, float)
+        budget = _search(r"budget≈₹(\d+(?:\.\d+)?)", prompt, 1500, float)
+        names = re.findall(r"^- (.+?): ", prompt, re.MULTILINE) or _SYNTHETIC_DISHES
+        start = date.today()
+        days = []
+        for d in range(num_days):
+            meals = []
+            for (slot, label), share in zip(SLOT_ORDER, _SLOT_SHARES):
+                name = rng.choice(names)
+                meals.append({
+                    "slot": slot,
+                    "time": label.split("(")[-1].rstrip(")"),
+                    "name": name,
+                    "recipe_detail": f"Ingredients: {name} staples, 1 tsp oil, salt to taste. "
+                                     "Method: prepare, cook for 10-15 minutes and serve warm.",
+                    "calories": round(target * share),
+                })
+            days.append({"day": d + 1, "date": (start + timedelta(days=d)).isoformat(), "meals": meals})
+        groceries = rng.sample(_SYNTHETIC_GROCERIES, k=min(10, len(_SYNTHETIC_GROCERIES)))
+        return {
+            "days": days,
+            "weekly_grocery_list": [f"{n} | {q} | {c} | {r}" for n, q, c, r in groceries],
+            "total_weekly_cost": round(min(budget * 0.9, sum(c for _, _, c, _ in groceries))),
+        }
+
+    def _workout_plan(self, prompt, rng):
+        num_days = _search(r"Create a (\d+)-day workout plan", prompt, 7)
+        minutes = _search(r"Minutes per day=(\d+)", prompt, 30)
+        exercises = re.findall(r"ID: (\d+) \| Name: (.+?) \|", prompt) or [("1", "Brisk Walk")]
+        per_day = max(1, min(len(exercises), minutes // 10))
+        return {"days": [
+            {"day": d + 1, "exercises": [
+                {
+                    "exercise_id": int(ex_id),
+                    "name": name,
+                    "instructions": "Warm up for 2 minutes. Do 3 sets of 12 reps with 60 seconds rest. "
+                                    "Keep your core tight and back straight. Stop if you feel joint pain.",
+                    "duration_min": minutes // per_day,
+                }
+                for ex_id, name in rng.sample(exercises, per_day)
+            ]}
+            for d in range(num_days)
+        ]}
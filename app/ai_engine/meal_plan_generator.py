@@ -24,10 +24,14 @@
 import json
 from datetime import datetime, timedelta
 from app.ai_engine.gemini_client import generate_text
+from app.ai_engine.usage_ledger import track_call
 from app.services.user_service import get_user_by_id
-from app.services.recipe_service import get_recipes_filtered, get_all_recipes
+from app.services.catalog_service import find_recipes
 from app.services.meal_plan_service import create_meal_plan
+from app.services.pantry_service import get_pantry_item_names
+from app.services.tdee_service import get_adaptive_tdee
 from app.ai_engine.calorie_engine import get_all_metrics
+from app.tracing import span, traced
 
 SLOT_ORDER = [
     ("early_morning", "Early morning (6:30 AM)"),
@@ -41,8 +45,10 @@ SLOT_ORDER = [
 
 
 def recipes_to_context(recipes, max_chars=8000):
-    """Turn recipes into one string for LLM context (inspiration only)."""
+    """Turn recipes into one string for LLM context (inspiration only). Stops reading recipes once max_chars
+    is reached, so the long text of recipes that would be cut off is never loaded."""
     lines = []
+    total = 0
     for r in recipes:
         block = (
             f"- {r.name}: {getattr(r, 'meal_type', 'Any')} | "
@@ -54,18 +60,29 @@ def recipes_to_context(recipes, max_chars=8000):
         if getattr(r, "instructions", None):
             block += f"\n  Method: {r.instructions[:300]}"
         lines.append(block)
+        total += len(block) + 1
+        if total > max_chars:
+            break
     out = "\n".join(lines)
     return out[:max_chars] if len(out) > max_chars else out
 
 
-def build_meal_plan_prompt(user, recipes, calorie_target, budget, num_days=7):
-    """Build prompt: LLM generates full plan with 7 slots per day, detailed recipe per meal, grocery list per day."""
+@traced()
+def build_meal_plan_prompt(user, recipes, calorie_target, budget, num_days=7, pantry_items=None):
+    """Build prompt: LLM generates full plan with 7 slots per day, detailed recipe per meal, grocery list per day.
+    pantry_items: names of staples the user already has; they are left out of the grocery list."""
     recipe_context = recipes_to_context(recipes)
     goal = getattr(user, "goal", "Maintain Weight") or "Maintain Weight"
     diet = getattr(user, "dietary_preference", "Veg") or "Veg"
     cuisine_pref = getattr(user, "cuisine", None) or "any"
     budget = float(budget)
     slots_desc = ", ".join(f'"{s[0]}"' for s in SLOT_ORDER)
+    pantry_rule = ""
+    if pantry_items:
+        pantry_rule = (
+            f"\n6. PANTRY (already stocked, you may cook with these): {', '.join(pantry_items)}. "
+            "Do NOT list these in weekly_grocery_list."
+        )
 
     prompt = f"""You are a student-friendly nutrition assistant. Generate a {num_days}-day meal plan. You MUST output valid JSON only (no markdown, no code fence).
 
@@ -76,7 +93,7 @@ RULES:
 2. For each meal provide: "slot" (one of those keys), "time" (e.g. "6:30 AM"), "name" (dish name), "recipe_detail" (detailed recipe: ingredients with quantities + short method or key steps; 2-5 sentences), "calories" (number).
 3. Provide ONE "weekly_grocery_list" at the plan level (NOT per day): a single array of strings for the whole week. Each string MUST have exactly 4 parts separated by pipe: "Item name | total_quantity_for_week | approx_cost_rupees | reusable". List EVERY ingredient separately — do NOT group (e.g. do NOT write "Basic Spices (Salt, Turmeric, ...)". Instead list "Salt | 200g | 20 | yes", "Turmeric | 50g | 30 | yes", "Cumin Seeds | 50g | 25 | yes", "Mustard Seeds | 50g | 25 | yes", "Red Chili Powder | 50g | 40 | yes" as separate entries). total_quantity_for_week: realistic shopper-friendly amount for 7 days (e.g. "6 pieces", "0.5 kg", "1 litre", "200g"). reusable: "yes" for pantry (oil, bread, paste, spices, atta, flour, rice, dal); "no" for perishables. No pipe inside the item name.
 4. Total weekly cost must be reasonable for budget ₹{budget}. Match daily calories to about {calorie_target}.
-5. Use the RECIPE CONTEXT below only as inspiration. You are free to create meals that fit the user's diet and goal; do not restrict yourself to only listing recipe IDs.
+5. Use the RECIPE CONTEXT below only as inspiration. You are free to create meals that fit the user's diet and goal; do not restrict yourself to only listing recipe IDs.{pantry_rule}
 
 RECIPE CONTEXT (for inspiration only; you generate the actual plan):
 {recipe_context}
@@ -89,10 +106,8 @@ Output the JSON now (no other text):"""
     return prompt
 
 
-def generate_meal_plan(user, recipes, calorie_target, budget, num_days=7):
-    """Call Gemini to generate full meal plan JSON; return dict or None."""
-    prompt = build_meal_plan_prompt(user, recipes, calorie_target, budget, num_days)
-    raw = generate_text(prompt)
+def _parse_meal_plan(raw):
+    """Parse the model's response (optionally code-fenced JSON) into a plan dict, or None."""
     if not raw:
         return None
     text = raw.strip()
@@ -104,7 +119,8 @@ def generate_meal_plan(user, recipes, calorie_target, budget, num_days=7):
             lines = lines[:-1]
         text = "\n".join(lines)
     try:
-        plan = json.loads(text)
+        with span("meal_plan.parse_json", chars=len(text)):
+            plan = json.loads(text)
     except json.JSONDecodeError:
         return None
     if not isinstance(plan, dict) or "days" not in plan:
@@ -116,27 +132,43 @@ def generate_meal_plan(user, recipes, calorie_target, budget, num_days=7):
     return plan
 
 
+@traced()
+def generate_meal_plan(user, recipes, calorie_target, budget, num_days=7, pantry_items=None):
+    """Call Gemini to generate full meal plan JSON; return dict or None."""
+    prompt = build_meal_plan_prompt(user, recipes, calorie_target, budget, num_days, pantry_items)
+    with track_call(getattr(user, "id", None), "meal") as call:
+        plan = _parse_meal_plan(generate_text(prompt))
+        if plan is None:
+            call.mark_parse_failed()
+    return plan
+
+
+@traced()
 def generate_and_save_meal_plan(session, user_id):
-    """Load user, get recipes as context, generate full plan with LLM, save and return plan dict."""
+    """
+    Load user, get recipes as context, generate full plan with LLM and save it.
+    Returns (plan_id, plan dict), or None if the user is missing or generation failed.
+    """
     user = get_user_by_id(session, user_id)
     if not user:
         return None
-    metrics = get_all_metrics(user)
+    metrics = get_all_metrics(user, tdee_override=get_adaptive_tdee(session, user_id))
     calorie_target = metrics["calorie_target"]
     budget = float(getattr(user, "budget", 500) or 500)
     diet = (getattr(user, "dietary_preference", "Veg") or "Veg").strip().lower()
     cuisine_pref = (getattr(user, "cuisine", None) or "").strip() or None
     if cuisine_pref and cuisine_pref.lower() == "any":
         cuisine_pref = None
-    recipes = get_recipes_filtered(session, diet_type=diet, cuisine=cuisine_pref)
+    recipes = find_recipes(session, diet_type=diet, cuisine=cuisine_pref)
     if not recipes:
-        recipes = get_recipes_filtered(session, diet_type=diet)
+        recipes = find_recipes(session, diet_type=diet)
     if not recipes:
-        recipes = get_all_recipes(session)
+        recipes = find_recipes(session)
+    pantry_items = get_pantry_item_names(session, user_id)
     # Pass recipes as context even if empty; LLM can still generate
-    plan = generate_meal_plan(user, recipes or [], calorie_target, budget, 7)
+    plan = generate_meal_plan(user, recipes or [], calorie_target, budget, 7, pantry_items)
     if not plan:
         return None
     weekly_cost = plan.get("total_weekly_cost", 0)
-    create_meal_plan(session, user_id, calorie_target, plan, weekly_cost)
-    return plan
\ No newline at end of file
+    saved = create_meal_plan(session, user_id, calorie_target, plan, weekly_cost)
+    return saved.id, plan
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""LLM usage ledger: per-call size, tokens, latency, model, outcome and cost, written to llm_usage in batches.
+
+generate_text opens a call record for every request. Generators wrap their call in track_call(user_id, kind)
+so the record carries who asked and whether the response parsed. Records are queued and inserted by a
+background thread (multi-row INSERT every few seconds), so the request path never waits on the ledger.
+Set LLM_USAGE_LEDGER=0 to disable.
+"""
+import atexit
+import contextvars
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# USD per 1M tokens (input, output). Update when pricing changes; unknown models are costed at 0.
+MODEL_PRICES_USD_PER_MTOK = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+}
+
+_current = contextvars.ContextVar("llm_call", default=None)
+
+
+def estimate_tokens(chars):
+    """Rough token count for text of this length (~4 characters per token)."""
+    return (chars + 3) // 4
+
+
+def _outcome_for_error(e):
+    text = f"{e.__class__.__name__} {e}"
+    if "429" in text or "ResourceExhausted" in text or "RateLimit" in text or "quota" in text.lower():
+        return "rate_limited"
+    return "error"
+
+
+class LlmCall:
+    """One LLM request as it will be stored in llm_usage."""
+
+    def __init__(self, user_id=None, kind=None):
+        self.user_id = user_id
+        self.kind = kind
+        self.model = None
+        self.backend = None
+        self.prompt_chars = 0
+        self.prompt_tokens = None
+        self.output_chars = 0
+        self.output_tokens = None
+        self.latency_ms = None
+        self.outcome = None
+        self.error = None
+        self.billable = False
+        self.created_at = None
+        self._started = None
+        self._standalone = False
+
+    def mark_parse_failed(self):
+        if self.outcome == "ok":
+            self.outcome = "parse_failed"
+
+    def cost_usd(self):
+        if not self.billable:
+            return 0.0
+        price_in, price_out = MODEL_PRICES_USD_PER_MTOK.get(self.model, (0.0, 0.0))
+        return ((self.prompt_tokens or 0) * price_in + (self.output_tokens or 0) * price_out) / 1e6
+
+    def to_row(self):
+        return {
+            "created_at": self.created_at,
+            "user_id": self.user_id,
+            "kind": self.kind,
+            "model": self.model,
+            "backend": self.backend,
+            "prompt_chars": self.prompt_chars,
+            "prompt_tokens": self.prompt_tokens if self.prompt_tokens is not None else estimate_tokens(self.prompt_chars),
+            "output_chars": self.output_chars,
+            "output_tokens": self.output_tokens if self.output_tokens is not None else estimate_tokens(self.output_chars),
+            "latency_ms": self.latency_ms,
+            "outcome": self.outcome,
+            "error": self.error,
+            "billable": self.billable,
+            "cost_usd": self.cost_usd(),
+        }
+
+
+@contextmanager
+def track_call(user_id=None, kind=None):
+    """Attribute the generate_text call made inside the block to this user and plan kind; the record is
+    queued when the block exits, so a generator can mark_parse_failed() on the yielded LlmCall first."""
+    call = LlmCall(user_id, kind)
+    token = _current.set(call)
+    try:
+        yield call
+    finally:
+        _current.reset(token)
+        if call._started is not None:
+            get_ledger().record(call)
+
+
+def begin_call(prompt, backend):
+    """Start timing a request (generate_text calls this). Returns (call, token) for end_call."""
+    call = _current.get()
+    if call is None or call._started is not None:
+        # Outside track_call (or a second request in the same block): recorded on its own
+        call = LlmCall(call.user_id if call else None, call.kind if call else None)
+        call._standalone = True
+    call.backend = type(backend).__name__
+    call.model = getattr(backend, "model", None) or call.backend
+    call.prompt_chars = len(prompt)
+    call.created_at = datetime.utcnow()
+    call._started = time.perf_counter()
+    return call, _current.set(call)
+
+
+def end_call(call, token, text=None, error=None):
+    """Finish the request started by begin_call; standalone calls are queued right away."""
+    call.latency_ms = (time.perf_counter() - call._started) * 1000
+    if error is not None:
+        call.outcome = _outcome_for_error(error)
+        call.error = f"{error.__class__.__name__}: {str(error)[:500]}"
+    else:
+        call.output_chars = len(text or "")
+        call.outcome = "ok" if text else "empty"
+    _current.reset(token)
+    if call._standalone:
+        get_ledger().record(call)
+
+
+def note_usage(model=None, prompt_tokens=None, output_tokens=None, billable=None):
+    """Backends report what the API told them (model, token counts, whether the call was billed)."""
+    call = _current.get()
+    if call is None:
+        return
+    if model is not None:
+        call.model = model
+    if prompt_tokens is not None:
+        call.prompt_tokens = int(prompt_tokens)
+    if output_tokens is not None:
+        call.output_tokens = int(output_tokens)
+    if billable is not None:
+        call.billable = billable
+
+
+class UsageLedger:
+    """Bounded queue drained by a daemon thread that inserts rows in batches. Never blocks callers:
+    when the queue is full, records are dropped and counted."""
+
+    def __init__(self, batch_size=50, flush_interval=2.0, max_queue=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self.failed_batches = 0
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def record(self, call):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(call.to_row())
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=5.0):
+        """Write everything queued so far (waits up to timeout seconds)."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="llm-usage-ledger", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        rows = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if isinstance(item, threading.Event):
+                self._write(rows)
+                rows = []
+                item.set()
+            elif item is not None:
+                rows.append(item)
+            if len(rows) >= self.batch_size or (rows and time.monotonic() >= deadline):
+                self._write(rows)
+                rows = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, rows):
+        if not rows:
+            return
+        from app.database import SessionLocal
+        from app.models.llm_usage import LlmUsage
+
+        session = SessionLocal()
+        try:
+            session.execute(LlmUsage.__table__.insert(), rows)
+            session.commit()
+            self.written += len(rows)
+        except Exception as e:
+            session.rollback()
+            self.failed_batches += 1
+            if self.failed_batches == 1:
+                print(f"LLM usage ledger: could not write {len(rows)} rows ({e.__class__.__name__}: {e})")
+        finally:
+            session.close()
+
+
+class _NullLedger:
+    dropped = written = failed_batches = 0
+
+    def record(self, call):
+        pass
+
+    def flush(self, timeout=5.0):
+        pass
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    """Process-wide ledger (a no-op one when LLM_USAGE_LEDGER=0)."""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                enabled = os.getenv("LLM_USAGE_LEDGER", "1") != "0"
+                _ledger = UsageLedger() if enabled else _NullLedger()
+                if enabled:
+                    atexit.register(_ledger.flush, 2.0)
+    return _ledger
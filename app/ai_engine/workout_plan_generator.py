@@ -3,9 +3,11 @@
 
 import json
 from app.ai_engine.gemini_client import generate_text
+from app.ai_engine.usage_ledger import track_call
 from app.services.user_service import get_user_by_id
-from app.services.workout_service import get_workouts_filtered, get_all_workouts
+from app.services.catalog_service import find_workouts
 from app.services.workout_plan_service import create_workout_plan
+from app.tracing import span, traced
 
 
 def workouts_to_context(workouts):
@@ -22,6 +24,7 @@ def workouts_to_context(workouts):
     return "\n\n".join(lines)
 
 
+@traced()
 def build_workout_plan_prompt(user, workouts, minutes_per_day, num_days=7):
     """Build the prompt for Gemini: user constraints + workout list + JSON instructions."""
     workout_context = workouts_to_context(workouts)
@@ -49,10 +52,8 @@ Output the JSON workout plan now:"""
     return prompt
 
 
-def generate_workout_plan(user, workouts, minutes_per_day, num_days=7):
-    """Call Gemini to generate a workout plan JSON; return dict or None on failure."""
-    prompt = build_workout_plan_prompt(user, workouts, minutes_per_day, num_days)
-    raw = generate_text(prompt)
+def _parse_workout_plan(raw):
+    """Parse the model's response (optionally code-fenced JSON) into a plan dict, or None."""
     if not raw:
         return None
     text = raw.strip()
@@ -64,7 +65,8 @@ def generate_workout_plan(user, workouts, minutes_per_day, num_days=7):
             lines = lines[:-1]
         text = "\n".join(lines)
     try:
-        plan = json.loads(text)
+        with span("workout_plan.parse_json", chars=len(text)):
+            plan = json.loads(text)
     except json.JSONDecodeError:
         return None
     if not isinstance(plan, dict) or "days" not in plan:
@@ -72,23 +74,38 @@ def generate_workout_plan(user, workouts, minutes_per_day, num_days=7):
     return plan
 
 
+@traced()
+def generate_workout_plan(user, workouts, minutes_per_day, num_days=7):
+    """Call Gemini to generate a workout plan JSON; return dict or None on failure."""
+    prompt = build_workout_plan_prompt(user, workouts, minutes_per_day, num_days)
+    with track_call(getattr(user, "id", None), "workout") as call:
+        plan = _parse_workout_plan(generate_text(prompt))
+        if plan is None:
+            call.mark_parse_failed()
+    return plan
+
+
+@traced()
 def generate_and_save_workout_plan(session, user_id):
-    """Load user, get workouts, generate plan with Gemini, save and return plan dict."""
+    """
+    Load user, get workouts, generate plan with Gemini and save it.
+    Returns (plan_id, plan dict), or None if the user is missing or generation failed.
+    """
     user = get_user_by_id(session, user_id)
     if not user:
         return None
     goal = getattr(user, "goal", "Maintain Weight") or "Maintain Weight"
     equipment = getattr(user, "equipment", "None") or "None"
     minutes = int(getattr(user, "workout_minutes_per_day", 30) or 30)
-    workouts = get_workouts_filtered(session, goal=goal, equipment=equipment)
+    workouts = find_workouts(session, goal=goal, equipment=equipment)
     if not workouts:
-        workouts = get_workouts_filtered(session, equipment=equipment)
+        workouts = find_workouts(session, equipment=equipment)
     if not workouts:
-        workouts = get_all_workouts(session)
+        workouts = find_workouts(session)
     if not workouts:
         return None
     plan = generate_workout_plan(user, workouts, minutes, 7)
     if not plan:
         return None
-    create_workout_plan(session, user_id, plan)
-    return plan
\ No newline at end of file
+    saved = create_workout_plan(session, user_id, plan)
+    return saved.id, plan
\ No newline at end of file
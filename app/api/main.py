@@ -0,0 +1,343 @@
+"""HTTP API for plans, metrics and progress. Run: uv run --with uvicorn uvicorn app.api.main:app
+
+Route handlers are async; all SQLAlchemy work (and the blocking Gemini call) runs in the thread pool
+with its own session, so the event loop never blocks and workers scale out horizontally.
+"""
+import asyncio
+import json
+from datetime import date
+
+from fastapi import Body, FastAPI, Header, HTTPException, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.services.user_service import get_user_by_id, get_user_by_profile_code
+from app.services.meal_plan_service import get_latest_meal_plan_id, get_meal_plan_by_id, plan_content_hash
+from app.services.workout_plan_service import get_latest_workout_plan_id, get_workout_plan_by_id
+from app.services.progress_service import log_weight, log_weights_bulk, get_weight_logs, get_latest_weight_log
+from app.services.bulk_write_service import get_write_buffer
+from app.services.tdee_service import get_adaptive_tdee
+from app.services.job_service import get_job, job_to_dict
+from app.services.job_runner import enqueue_job
+from app.services.single_flight import generate_plan_once
+from app.ai_engine.calorie_engine import get_all_metrics, ideal_weight_kg, healthy_bmi_range_kg
+from app.ai_engine.meal_plan_generator import generate_and_save_meal_plan
+from app.ai_engine.workout_plan_generator import generate_and_save_workout_plan
+
+app = FastAPI(title="Health Companion API")
+# Plan bodies are tens of KB of repetitive recipe text; gzip shrinks them several-fold
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Clients may cache plan bodies but must revalidate with If-None-Match (cheap: answered from the plan id)
+_CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+class WeightLogIn(BaseModel):
+    weight_kg: float = Field(gt=30, lt=300)
+    logged_at: date | None = None
+
+
+async def _with_session(fn, *args):
+    """Run fn(session, *args) in the thread pool with a fresh session; the result must be plain data."""
+    def work():
+        db = SessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+    return await run_in_threadpool(work)
+
+
+def _user_dict(user):
+    return {
+        "id": user.id,
+        "profile_code": user.profile_code,
+        "name": user.name,
+        "age": user.age,
+        "gender": user.gender,
+        "height_cm": user.height_cm,
+        "weight_kg": user.weight_kg,
+        "goal": user.goal,
+        "dietary_preference": user.dietary_preference,
+        "cuisine": user.cuisine,
+        "budget": user.budget,
+        "equipment": user.equipment,
+        "workout_minutes_per_day": user.workout_minutes_per_day,
+    }
+
+
+def _plan_meta(plan):
+    return {
+        "id": plan.id,
+        "user_id": plan.user_id,
+        "created_at": plan.created_at.isoformat() if plan.created_at else None,
+        "version": plan_content_hash(plan.plan_json),
+    }
+
+
+def _plan_etag(kind, plan_id, variant="full"):
+    """Plans are immutable after insert, so (kind, id) identifies the content; no need to load plan_json."""
+    return f'"{kind}-{variant}-{plan_id}"'
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+
+
+def _not_modified(etag):
+    return Response(status_code=304, headers={"ETag": etag, **_CACHE_HEADERS})
+
+
+def _load_plan_json(plan):
+    """Parsed plan_json of a stored plan ({} when empty); a 500 naming the plan when the row is corrupt."""
+    try:
+        parsed = json.loads(plan.plan_json) if plan.plan_json else {}
+    except ValueError:
+        parsed = None
+    if not isinstance(parsed, dict):
+        raise HTTPException(status_code=500, detail=f"Stored plan {plan.id} is not a valid JSON object")
+    return parsed
+
+
+def _plan_response(meta, plan, etag):
+    """
+    JSON response that embeds the stored plan_json text as-is (no re-serialization). Every row is parsed first,
+    so a truncated or corrupt one (e.g. written before the services validated on insert) is an error rather
+    than a 200 with a broken body.
+    """
+    _load_plan_json(plan)
+    plan_text = plan.plan_json or "null"
+    body = json.dumps(meta)[:-1] + ', "plan": ' + plan_text + "}"
+    return Response(content=body, media_type="application/json", headers={"ETag": etag, **_CACHE_HEADERS})
+
+
+def _meal_plan_summary(plan):
+    """Compact view: per-day meal names and calories, cost and grocery count (no recipe text)."""
+    days = plan.get("days", [])
+    return {
+        "num_days": len(days),
+        "total_weekly_cost": plan.get("total_weekly_cost", 0),
+        "grocery_item_count": len(plan.get("weekly_grocery_list") or []),
+        "days": [
+            {
+                "day": d.get("day"),
+                "date": d.get("date"),
+                "total_calories": sum((m.get("calories") or 0) for m in d.get("meals", []) if isinstance(m.get("calories"), (int, float))),
+                "meals": [
+                    {"slot": m.get("slot"), "name": m.get("name") or m.get("recipe_name"), "calories": m.get("calories")}
+                    for m in d.get("meals", [])
+                ],
+            }
+            for d in days
+        ],
+    }
+
+
+def _workout_plan_summary(plan):
+    """Compact view: per-day exercise names and durations (no instructions)."""
+    return {
+        "num_days": len(plan.get("days", [])),
+        "days": [
+            {
+                "day": d.get("day"),
+                "exercises": [{"name": ex.get("name"), "duration_min": ex.get("duration_min")} for ex in d.get("exercises", [])],
+            }
+            for d in plan.get("days", [])
+        ],
+    }
+
+
+def _log_dict(log):
+    return {"id": log.id, "weight_kg": log.weight_kg, "trend_kg": log.trend_kg, "logged_at": log.logged_at.isoformat()}
+
+
+def _require_user(db, user_id):
+    user = get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/users/by-code/{profile_code}")
+async def user_by_code(profile_code: str):
+    def work(db):
+        user = get_user_by_profile_code(db, profile_code)
+        if not user:
+            raise HTTPException(status_code=404, detail="No profile found for that code")
+        return _user_dict(user)
+    return await _with_session(work)
+
+
+@app.get("/users/{user_id}/metrics")
+async def user_metrics(user_id: int):
+    def work(db):
+        user = _require_user(db, user_id)
+        # Same inputs as the dashboard: smoothed logged weight and adaptive TDEE when available
+        latest_log = get_latest_weight_log(db, user_id)
+        if latest_log:
+            weight_kg = float(latest_log.trend_kg if latest_log.trend_kg is not None else latest_log.weight_kg)
+        else:
+            weight_kg = user.weight_kg or 0
+        metrics = get_all_metrics(user, weight_kg_override=weight_kg, tdee_override=get_adaptive_tdee(db, user_id))
+        height_cm = user.height_cm or 170
+        min_kg, max_kg = healthy_bmi_range_kg(height_cm)
+        return {
+            **metrics,
+            "weight_kg": weight_kg,
+            "ideal_weight_kg": ideal_weight_kg(height_cm),
+            "healthy_weight_range_kg": [min_kg, max_kg],
+        }
+    return await _with_session(work)
+
+
+def _latest_plan_endpoint(kind, get_latest_id, get_by_id, summarize, extra_meta=None):
+    """Build GET handlers (full and summary) with ETag / If-None-Match support for one plan kind."""
+
+    async def full(user_id: int, if_none_match: str | None = Header(default=None)):
+        def work(db):
+            plan_id = get_latest_id(db, user_id)
+            if plan_id is None:
+                raise HTTPException(status_code=404, detail=f"No {kind} plan yet")
+            etag = _plan_etag(kind, plan_id)
+            if _etag_matches(if_none_match, etag):
+                return _not_modified(etag)
+            plan = get_by_id(db, plan_id)
+            meta = _plan_meta(plan)
+            if extra_meta:
+                meta.update(extra_meta(plan))
+            return _plan_response(meta, plan, etag)
+        return await _with_session(work)
+
+    async def summary(user_id: int, if_none_match: str | None = Header(default=None)):
+        def work(db):
+            plan_id = get_latest_id(db, user_id)
+            if plan_id is None:
+                raise HTTPException(status_code=404, detail=f"No {kind} plan yet")
+            etag = _plan_etag(kind, plan_id, "summary")
+            if _etag_matches(if_none_match, etag):
+                return _not_modified(etag)
+            plan = get_by_id(db, plan_id)
+            body = {**_plan_meta(plan), "summary": summarize(_load_plan_json(plan))}
+            if extra_meta:
+                body.update(extra_meta(plan))
+            return Response(content=json.dumps(body), media_type="application/json", headers={"ETag": etag, **_CACHE_HEADERS})
+        return await _with_session(work)
+
+    return full, summary
+
+
+latest_meal_plan, latest_meal_plan_summary = _latest_plan_endpoint(
+    "meal", get_latest_meal_plan_id, get_meal_plan_by_id, _meal_plan_summary,
+    extra_meta=lambda plan: {"calorie_target": plan.calorie_target, "weekly_cost": plan.weekly_cost},
+)
+latest_workout_plan, latest_workout_plan_summary = _latest_plan_endpoint(
+    "workout", get_latest_workout_plan_id, get_workout_plan_by_id, _workout_plan_summary,
+)
+app.get("/users/{user_id}/meal-plan/latest")(latest_meal_plan)
+app.get("/users/{user_id}/meal-plan/latest/summary")(latest_meal_plan_summary)
+app.get("/users/{user_id}/workout-plan/latest")(latest_workout_plan)
+app.get("/users/{user_id}/workout-plan/latest/summary")(latest_workout_plan_summary)
+
+
+@app.get("/users/{user_id}/weight-logs")
+async def weight_logs(user_id: int):
+    def work(db):
+        _require_user(db, user_id)
+        return [_log_dict(log) for log in get_weight_logs(db, user_id)]
+    return await _with_session(work)
+
+
+@app.post("/users/{user_id}/weight-logs", status_code=201)
+async def add_weight_log(user_id: int, body: WeightLogIn):
+    """With WRITE_BUFFER_MS set, concurrent logs are written together in one transaction per window."""
+    buffer = get_write_buffer()
+
+    def work(db):
+        _require_user(db, user_id)
+        if buffer is None:
+            return _log_dict(log_weight(db, user_id, body.weight_kg, body.logged_at or date.today()))
+    result = await _with_session(work)
+    if buffer is not None:
+        row = await asyncio.wrap_future(buffer.log_weight(user_id, body.weight_kg, body.logged_at or date.today()))
+        result = _log_dict(row)
+    return result
+
+
+@app.post("/users/{user_id}/weight-logs/bulk", status_code=201)
+async def add_weight_logs_bulk(user_id: int, body: list[WeightLogIn] = Body(max_length=10000)):
+    """Many logs in one transaction (one multi-row INSERT; trend and TDEE updated once)."""
+    def work(db):
+        _require_user(db, user_id)
+        entries = [(log.logged_at or date.today(), log.weight_kg) for log in body]
+        return [_log_dict(row) for row in log_weights_bulk(db, user_id, entries)]
+    return await _with_session(work)
+
+
+@app.post("/users/{user_id}/meal-plan")
+async def generate_meal_plan(user_id: int):
+    def work(db):
+        _require_user(db, user_id)
+        saved = generate_plan_once(db, user_id, "meal", generate_and_save_meal_plan)
+        if not saved:
+            raise HTTPException(status_code=502, detail="Could not generate meal plan")
+        plan_id, plan = saved
+        return {"user_id": user_id, "plan_id": plan_id, "plan": plan}
+    return await _with_session(work)
+
+
+@app.post("/users/{user_id}/workout-plan")
+async def generate_workout_plan(user_id: int):
+    def work(db):
+        _require_user(db, user_id)
+        saved = generate_plan_once(db, user_id, "workout", generate_and_save_workout_plan)
+        if not saved:
+            raise HTTPException(status_code=502, detail="Could not generate workout plan")
+        plan_id, plan = saved
+        return {"user_id": user_id, "plan_id": plan_id, "plan": plan}
+    return await _with_session(work)
+
+
+async def _submit_generation_job(user_id, kind, idempotency_key):
+    def work(db):
+        _require_user(db, user_id)
+        return job_to_dict(enqueue_job(db, user_id, kind, idempotency_key))
+    return await _with_session(work)
+
+
+@app.post("/users/{user_id}/meal-plan/jobs", status_code=202)
+async def submit_meal_plan_job(user_id: int, idempotency_key: str | None = Header(default=None)):
+    """
+    Queue meal plan generation; poll GET /jobs/{id}. Reusing an Idempotency-Key (per user and plan kind)
+    returns the same job.
+    """
+    return await _submit_generation_job(user_id, "meal", idempotency_key)
+
+
+@app.post("/users/{user_id}/workout-plan/jobs", status_code=202)
+async def submit_workout_plan_job(user_id: int, idempotency_key: str | None = Header(default=None)):
+    """
+    Queue workout plan generation; poll GET /jobs/{id}. Reusing an Idempotency-Key (per user and plan kind)
+    returns the same job.
+    """
+    return await _submit_generation_job(user_id, "workout", idempotency_key)
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: int):
+    def work(db):
+        job = get_job(db, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job_to_dict(job)
+    return await _with_session(work)
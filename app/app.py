@@ -7,19 +7,19 @@ _root = Path(__file__).resolve().parent.parent
 if str(_root) not in sys.path:
     sys.path.insert(0, str(_root))
 
-import re
-from io import BytesIO
+import os
+import uuid
+from functools import partial, wraps
 from html import escape as html_escape
 import streamlit as st
 from datetime import date
-import pandas as pd
-import altair as alt
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 
 from app.database import SessionLocal
+from app.tracing import start_trace, end_trace, span
+from app.query_counter import start_capture, stop_capture, clear_captures
+from app.grocery import parse_and_merge_grocery_items
+from app.pdf_export import build_meal_plan_pdf, build_grocery_pdf
+from app.downsample import downsample_indices, point_budget
 from app.config import GEMINI_API_KEY, DATABASE_URL
 from app.services.user_service import (
     get_user_by_id,
@@ -28,17 +28,20 @@ from app.services.user_service import (
     create_user,
     update_user_preferences,
 )
-from app.services.meal_plan_service import get_latest_meal_plan
-from app.services.workout_plan_service import get_latest_workout_plan
-from app.services.progress_service import log_weight, get_weight_logs, get_latest_weight_log
+from app.services.plan_store import get_plan, load_latest_plan
+from app.services.progress_service import log_weight, get_weight_log_bounds, get_weight_series, get_latest_weight_log
+from app.services.pantry_service import get_pantry, subtract_pantry, accept_grocery_list, is_grocery_list_accepted
+from app.services.tdee_service import get_adaptive_tdee
+from app.services.job_service import get_job, get_latest_job, ACTIVE_STATUSES
+from app.services.job_runner import enqueue_job
 from app.ai_engine.calorie_engine import (
     get_all_metrics,
     ideal_weight_kg,
     healthy_bmi_range_kg,
     estimate_weeks_to_weight,
 )
-from app.ai_engine.meal_plan_generator import generate_and_save_meal_plan, SLOT_ORDER
-from app.ai_engine.workout_plan_generator import generate_and_save_workout_plan
+from app.ai_engine.goal_simulator import simulate_trajectories
+from app.ai_engine.meal_plan_generator import SLOT_ORDER
 
 # Must be first Streamlit command
 st.set_page_config(
@@ -254,10 +257,18 @@ st.markdown("""
 # Session state defaults
 if "user_id" not in st.session_state:
     st.session_state["user_id"] = None
-if "latest_meal_plan" not in st.session_state:
-    st.session_state["latest_meal_plan"] = None
-if "latest_workout_plan" not in st.session_state:
-    st.session_state["latest_workout_plan"] = None
+# Plans themselves live in the process-wide plan store; a session only remembers which plan it shows
+if "meal_plan_id" not in st.session_state:
+    st.session_state["meal_plan_id"] = None
+if "workout_plan_id" not in st.session_state:
+    st.session_state["workout_plan_id"] = None
+# (meal plan id, accepted?) as last read from the database; accepting re-checks there, so a stale False is harmless
+if "groceries_accepted" not in st.session_state:
+    st.session_state["groceries_accepted"] = None
+if "meal_job_id" not in st.session_state:
+    st.session_state["meal_job_id"] = None
+if "workout_job_id" not in st.session_state:
+    st.session_state["workout_job_id"] = None
 
 
 def get_db_session():
@@ -265,196 +276,172 @@ def get_db_session():
     return SessionLocal()
 
 
-def _sum_quantity_strings(qtys):
+def _render_trace_panel(trace):
+    """Hidden developer panel: waterfall of the spans recorded during this rerun."""
+    import altair as alt
+    import pandas as pd
+
+    rows = trace.rows()
+    with st.expander(f"Developer: rerun trace · {len(rows)} spans · {trace.duration_ms:,.0f} ms"):
+        df = pd.DataFrame(rows)
+        df["end_ms"] = df["start_ms"] + df["duration_ms"]
+        df["label"] = [f"{i:03d} {label}" for i, label in enumerate(df["span"])]
+        df["details"] = df["attributes"].astype(str)
+        chart = alt.Chart(df.drop(columns=["attributes"])).mark_bar().encode(
+            x=alt.X("start_ms:Q", title="ms since rerun start"),
+            x2="end_ms:Q",
+            y=alt.Y("label:N", sort=None, title=None, axis=alt.Axis(labelLimit=320)),
+            color=alt.Color("status:N", scale=alt.Scale(domain=["ok", "error", "stopped"], range=["#0284c7", "#dc2626", "#a3a3a3"])),
+            tooltip=["name", alt.Tooltip("duration_ms:Q", format=".2f"), alt.Tooltip("start_ms:Q", format=".2f"), "details"],
+        ).properties(height=max(120, 18 * len(df)))
+        st.altair_chart(chart, use_container_width=True)
+        totals = (
+            df[df["depth"] > 0].groupby("name")["duration_ms"].agg(["count", "sum", "max"])
+            .sort_values("sum", ascending=False).round(2)
+        )
+        st.dataframe(totals, use_container_width=True)
+
+
+def _render_sql_panel(log):
+    """Hidden developer panel: SQL statements run during this rerun, grouped, with N+1 warnings."""
+    import pandas as pd
+
+    with st.expander(f"Developer: SQL · {log.count} statements · {log.total_seconds * 1e3:,.1f} ms"):
+        for sql, n in log.n_plus_one():
+            st.warning(f"Possible N+1: {n} similar statements — `{sql[:200]}`")
+        for sql, params, n in log.duplicates():
+            st.info(f"Repeated {n}× with identical parameters — `{sql[:200]}` {params}")
+        st.dataframe(
+            pd.DataFrame(
+                [(sql, n, round(seconds * 1e3, 2)) for sql, n, seconds in log.by_statement()],
+                columns=["statement", "count", "total_ms"],
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+
+def _show_generation_error(err, what):
+    """Show a friendly message for a failed plan generation, with details for debugging."""
+    if "429" in err or "quota" in err.lower():
+        st.warning("Rate limit reached. Wait about a minute and try again. You can switch to gemini-2.5-flash-lite in app/ai_engine/gemini_client.py if needed.")
+    else:
+        st.error(f"Could not generate {what}. Please try again.")
+    with st.expander("Error details (for debugging)"):
+        st.code(err)
+
+
+def _resume_active_job(db, user_id, kind):
+    """After a reconnect, pick up a job still queued/running for this user so polling continues."""
+    job_key = f"{kind}_job_id"
+    if st.session_state.get(job_key) is None:
+        job = get_latest_job(db, user_id, kind)
+        if job and job.status in ACTIVE_STATUSES:
+            st.session_state[job_key] = job.id
+
+
+@st.fragment(run_every=2)
+def _poll_generation_job(kind, what):
+    """Poll the background job for this plan kind; on completion reload the plan with a full rerun."""
+    job_key = f"{kind}_job_id"
+    job_id = st.session_state.get(job_key)
+    if not job_id:
+        return
+    db = get_db_session()
+    try:
+        job = get_job(db, job_id)
+        status, progress, error = (job.status, job.progress, job.error) if job else ("failed", 100, "Job not found.")
+    finally:
+        db.close()
+    if status in ACTIVE_STATUSES:
+        st.progress(min(max(progress or 0, 5), 95) / 100, text=f"Generating your {what}… You can leave this page; it keeps running.")
+        return
+    st.session_state[job_key] = None
+    if status == "succeeded":
+        st.session_state[f"{kind}_plan_id"] = None  # look up the newly saved plan
+        st.session_state[f"{kind}_job_message"] = ("success", None)
+    else:
+        st.session_state[f"{kind}_job_message"] = ("error", error or "Unknown error")
+    st.rerun()
+
+
+@st.fragment
+def _what_if_projection(weight_kg, height_cm, age, is_male, metrics):
+    """What-if fan chart: calorie targets × adherence, BMR/TDEE recomputed as weight changes.
+    Simulated only while the toggle is on; toggling reruns just this section."""
+    if not st.toggle("Show projection", key="what_if_projection"):
+        st.caption("Turn on to simulate your weight over the next 26 weeks at three calorie targets.")
+        return
+    target_kcal = float(metrics["calorie_target"])
+    scenario_targets = [target_kcal - 250, target_kcal, target_kcal + 250]
+    adherence_rates = [0.5, 0.75, 1.0]
+    factor = float(metrics["tdee"]) / float(metrics["bmr"]) if metrics["bmr"] else 1.4
+    trajectories = simulate_trajectories(
+        weight_kg, height_cm, age, is_male, scenario_targets, [factor], adherence_rates, weeks=26,
+    )[0, :, 0, :, :]  # -> (targets, adherence, weeks + 1)
+    # Charting libraries load on first use so the landing page starts without them
+    import altair as alt
+    import pandas as pd
+
+    fan_df = pd.concat([
+        pd.DataFrame({
+            "week": range(trajectories.shape[-1]),
+            "plan": f"{t:,.0f} kcal/day",
+            "low": trajectories[i].min(axis=0),
+            "high": trajectories[i].max(axis=0),
+            "full": trajectories[i, -1],
+        })
+        for i, t in enumerate(scenario_targets)
+    ])
+    fan_base = alt.Chart(fan_df).encode(
+        x=alt.X("week:Q", title="Week"),
+        color=alt.Color("plan:N", title="Calorie target", sort=[f"{t:,.0f} kcal/day" for t in scenario_targets]),
+    )
+    fan_chart = alt.layer(
+        fan_base.mark_area(opacity=0.2).encode(y=alt.Y("low:Q", title="Weight (kg)", scale=alt.Scale(zero=False)), y2="high:Q"),
+        fan_base.mark_line(strokeWidth=2).encode(y="full:Q"),
+    ).properties(height=280)
+    st.altair_chart(fan_chart, use_container_width=True)
+    st.caption("Lines assume you follow the target every day; shaded bands cover 50–100% adherence (other days at maintenance).")
+
+
+# True while the whole script runs; False during a fragment-only rerun (a tab interaction)
+_full_run = False
+
+
+def _tab_fragment(name):
     """
-    Given a list of quantity strings (e.g. ["200ml", "100ml", "50ml"]), return a single total
-    when all use the same unit (e.g. "350ml"). Otherwise return "qty1 + qty2 + ...".
+    Decorator: render a tab as a fragment, so its widgets rerun only that tab. During a full-app run the
+    tab is a span of the rerun trace; on its own reruns it gets its own trace / SQL capture and shows
+    the developer panels inside the tab.
     """
-    if not qtys:
-        return "—"
-    parsed = []
-    for q in qtys:
-        q = str(q).strip()
-        if not q:
-            continue
-        # Match optional number (int or decimal) at start, rest is unit
-        m = re.match(r"^\s*([\d.]+)\s*(.*)$", q)
-        if m:
+    def decorator(fn):
+        @wraps(fn)
+        def run():
+            if _full_run:
+                with span(f"tab.{name}"):
+                    return fn()
+            fragment_trace = start_trace(f"streamlit.fragment.{name}", force=show_trace_panel)
+            clear_captures()
+            fragment_queries = start_capture(f"fragment.{name}") if show_sql_panel else None
             try:
-                num = float(m.group(1))
-                unit = (m.group(2) or "").strip()
-                parsed.append((num, unit))
-            except ValueError:
-                parsed.append((1, q))
-        else:
-            parsed.append((1, q))
-    if not parsed:
-        return "—"
-    units = [p[1].lower() for p in parsed]
-    if all(u == units[0] for u in units):
-        total_num = sum(p[0] for p in parsed)
-        unit = parsed[0][1]
-        if unit:
-            return f"{total_num:g} {unit}".strip()
-        return f"{total_num:g}"
-    return " + ".join(qtys)
-
-
-# Pantry items typically bought in larger packs and reused across weeks (for fallback when LLM doesn't set reusable)
-_PANTRY_KEYWORDS = (
-    "oil", "bread", "paste", "atta", "flour", "rice", "dal", "lentil", "masala", "powder",
-    "spice", "asafoetida", "besan", "chana", "cumin", "turmeric", "coriander", "pepper",
-    "cloves", "cardamom", "cinnamon", "mustard", "fenugreek", "biryani", "garam", "chilli",
-    "ginger", "garlic", "sugar", "salt", "vinegar", "sauce", "jam", "honey", "ghee",
-)
-
+                fn()
+            finally:
+                # Also on errors and st.rerun(), so the trace and query capture never leak into the next run
+                end_trace(fragment_trace)
+                if fragment_queries is not None:
+                    stop_capture(fragment_queries)
+            if show_trace_panel and fragment_trace is not None:
+                _render_trace_panel(fragment_trace)
+            if fragment_queries is not None:
+                _render_sql_panel(fragment_queries)
+        return st.fragment(run)
+    return decorator
 
-def _infer_reusable(display_name):
-    """Treat as reusable if item name suggests pantry/staple (for old plans or when LLM omits flag)."""
-    lower = display_name.lower()
-    return any(kw in lower for kw in _PANTRY_KEYWORDS)
 
-
-def _parse_and_merge_grocery_items(grocery_strings):
-    """
-    Parse grocery strings: "Item name | quantity | approx_cost_rupees | reusable" or 2/3 part variants.
-    Merge by item name (case-insensitive): collect quantities, sum costs; item is reusable if any entry says so.
-    Returns list of (display_name, total_quantity_str, total_cost, is_reusable).
-    """
-    merged = {}  # key -> (display_name, [quantities], total_cost, is_reusable)
-    for s in grocery_strings:
-        s = str(s).strip()
-        if not s:
-            continue
-        if "|" in s:
-            parts = [p.strip() for p in s.split("|", 3)]  # up to 4 parts
-            name = parts[0] if parts else s
-            if len(parts) >= 4:
-                qty = parts[1]
-                cost_str = parts[2]
-                reusable_str = (parts[3] or "").lower()
-                is_reusable = reusable_str in ("yes", "true", "1", "y")
-            elif len(parts) == 3:
-                qty = parts[1]
-                cost_str = parts[2]
-                is_reusable = False
-            elif len(parts) == 2:
-                qty = ""
-                cost_str = parts[1]
-                is_reusable = False
-            else:
-                qty, cost_str, is_reusable = "", "", False
-            try:
-                cost = int(re.sub(r"[^\d]", "", cost_str)) if cost_str else 0
-            except (ValueError, TypeError):
-                cost = 0
-        else:
-            name, qty, cost, is_reusable = s, "", 0, False
-        if not name:
-            continue
-        key = name.lower().strip()
-        if key not in merged:
-            merged[key] = (name, [], 0, False)
-        disp, qtys, total, any_reusable = merged[key]
-        if qty:
-            qtys.append(qty)
-        merged[key] = (disp, qtys, total + cost, any_reusable or is_reusable)
-    out = []
-    for (disp, qtys, total, is_reusable) in merged.values():
-        total_qty = _sum_quantity_strings(qtys)
-        # Fallback: infer reusable from name if LLM didn't set it (e.g. old plans)
-        if not is_reusable and _infer_reusable(disp):
-            is_reusable = True
-        out.append((disp, total_qty, total, is_reusable))
-    out.sort(key=lambda x: x[0].lower())
-    return out
-
-
-def _parse_ingredients_to_list(ingredients_text):
-    """Split recipe ingredients (comma/newline/and-separated) into a sorted, deduplicated list."""
-    if not ingredients_text or not str(ingredients_text).strip():
-        return []
-    text = str(ingredients_text).strip()
-    # Split on newlines, commas, and " and " (keep tokens)
-    parts = re.split(r"[\n,]+|\s+and\s+", text, flags=re.IGNORECASE)
-    seen = set()
-    out = []
-    for p in parts:
-        p = p.strip()
-        if not p or len(p) < 2:
-            continue
-        key = p.lower()
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(p)
-    return sorted(out, key=lambda x: x.lower())
-
-
-def _pdf_escape(s):
-    """Escape for ReportLab Paragraph (XML-like)."""
-    if not s:
-        return ""
-    return str(s).replace("&", "&amp;").replace("<", "&lt;")
-
-
-def _build_meal_plan_pdf(plan_obj):
-    """Return PDF bytes for the 7-day meal plan."""
-    buffer = BytesIO()
-    styles = getSampleStyleSheet()
-    style_title = ParagraphStyle(name="CustomTitle", parent=styles["Heading1"], fontSize=16, spaceAfter=12)
-    style_heading = ParagraphStyle(name="CustomHeading", parent=styles["Heading2"], fontSize=12, spaceAfter=6)
-    style_body = ParagraphStyle(name="CustomBody", parent=styles["Normal"], fontSize=9, spaceAfter=4)
-    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=0.75 * inch, rightMargin=0.75 * inch, topMargin=0.75 * inch, bottomMargin=0.75 * inch)
-    story = []
-    cost = plan_obj.get("total_weekly_cost", 0)
-    story.append(Paragraph(_pdf_escape("7-Day Meal Plan"), style_title))
-    story.append(Paragraph(_pdf_escape(f"Weekly cost: Rs. {cost:.0f}"), style_body))
-    story.append(Spacer(1, 12))
-    for d in plan_obj.get("days", []):
-        day_num = d.get("day", 0)
-        date_str = d.get("date", "")
-        story.append(Paragraph(_pdf_escape(f"Day {day_num} — {date_str}"), style_heading))
-        meals_by_slot = {m.get("slot"): m for m in d.get("meals", [])}
-        for _slot_key, label in SLOT_ORDER:
-            m = meals_by_slot.get(_slot_key)
-            if m:
-                name = m.get("name") or m.get("recipe_name") or "Meal"
-                cal = m.get("calories") or 0
-                recipe = (m.get("recipe_detail") or m.get("description") or "").strip()
-                story.append(Paragraph(_pdf_escape(f"{label}: {name} — {cal} kcal"), style_body))
-                if recipe:
-                    for line in recipe.split("\n")[:15]:
-                        if line.strip():
-                            story.append(Paragraph(_pdf_escape(line.strip()), style_body))
-            else:
-                story.append(Paragraph(_pdf_escape(f"{label}: —"), style_body))
-        story.append(Spacer(1, 8))
-    doc.build(story)
-    return buffer.getvalue()
-
-
-def _build_grocery_pdf(grocery_tuples, total_cost):
-    """Return PDF bytes for the grocery list."""
-    buffer = BytesIO()
-    styles = getSampleStyleSheet()
-    style_title = ParagraphStyle(name="GroceryTitle", parent=styles["Heading1"], fontSize=16, spaceAfter=12)
-    style_body = ParagraphStyle(name="GroceryBody", parent=styles["Normal"], fontSize=10, spaceAfter=4)
-    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=0.75 * inch, rightMargin=0.75 * inch, topMargin=0.75 * inch, bottomMargin=0.75 * inch)
-    story = []
-    story.append(Paragraph(_pdf_escape("Grocery List (Whole Week)"), style_title))
-    story.append(Paragraph(_pdf_escape("Items marked with [R] can be reused for future weeks."), style_body))
-    story.append(Spacer(1, 8))
-    for display_name, total_qty, approx_cost, is_reusable in grocery_tuples:
-        prefix = "[R] " if is_reusable else ""
-        qty_show = total_qty if (total_qty and total_qty != "—") else "—"
-        cost_str = f"Rs. {approx_cost:.0f}" if approx_cost else "—"
-        story.append(Paragraph(_pdf_escape(f"• {prefix}{display_name} — {qty_show} — {cost_str}"), style_body))
-    if total_cost > 0:
-        story.append(Spacer(1, 8))
-        story.append(Paragraph(_pdf_escape(f"Total approx grocery cost: Rs. {total_cost:.0f}"), style_body))
-    doc.build(story)
-    return buffer.getvalue()
+def _rerun_tab():
+    """Rerun only the current tab's fragment (the whole app when called during a full run)."""
+    st.rerun(scope="app" if _full_run else "fragment")
 
 
 def check_env():
@@ -472,12 +459,21 @@ if env_error:
     st.error(env_error)
     st.stop()
 
+# ----- Developer panels (hidden: set TRACE_PANEL=1 / SQL_DEBUG=1; never switchable from the URL) -----
+show_trace_panel = os.getenv("TRACE_PANEL") == "1"
+show_sql_panel = os.getenv("SQL_DEBUG") == "1"
+_full_run = True
+rerun_trace = start_trace("streamlit.rerun", force=show_trace_panel)
+clear_captures()
+rerun_queries = start_capture("rerun") if show_sql_panel else None
+
 # ----- Restore user from URL (profile code) -----
 url_code = st.query_params.get("code")
 if url_code:
     db = get_db_session()
     try:
-        user = get_user_by_profile_code(db, url_code)
+        with span("restore_profile"):
+            user = get_user_by_profile_code(db, url_code)
         if user:
             st.session_state["user_id"] = user.id
     finally:
@@ -488,10 +484,10 @@ st.markdown("### 🥗 Health Companion")
 st.caption("AI-powered meal and workout plans for students.")
 st.markdown("")  # small spacer before tabs
 
-# ----- Tabs -----
-tab_dashboard, tab_meals, tab_workout, tab_progress = st.tabs(["Dashboard", "Nutrition & Meals", "Workout", "Progress"])
-
-with tab_dashboard:
+# ----- Tabs (each one a fragment: its widgets rerun only that tab) -----
+@_tab_fragment("dashboard")
+def _dashboard_tab():
+    """Profile forms (no user yet) or metrics, goal timeline and what-if projection."""
     user_id = st.session_state.get("user_id")
 
     # ----- When no user: show returning user / recover and new profile form -----
@@ -595,10 +591,13 @@ with tab_dashboard:
         try:
             user = get_user_by_id(db, user_id)
             if user:
-                # Use last logged weight as current weight when available; else profile weight
+                # Use smoothed trend of logged weights as current weight when available; else profile weight
                 latest_log = get_latest_weight_log(db, user_id)
-                weight_kg = float(latest_log.weight_kg) if latest_log else (getattr(user, "weight_kg", None) or 0)
-                metrics = get_all_metrics(user, weight_kg_override=weight_kg)
+                if latest_log:
+                    weight_kg = float(latest_log.trend_kg if latest_log.trend_kg is not None else latest_log.weight_kg)
+                else:
+                    weight_kg = getattr(user, "weight_kg", None) or 0
+                metrics = get_all_metrics(user, weight_kg_override=weight_kg, tdee_override=get_adaptive_tdee(db, user_id))
                 name = getattr(user, "name", None) or "there"
                 height_cm = getattr(user, "height_cm", None) or 0
                 goal = getattr(user, "goal", None) or "Maintain Weight"
@@ -720,6 +719,8 @@ with tab_dashboard:
                 # Key metrics in equal-width cards
                 st.subheader("Your health metrics")
                 st.caption("Personalized from your profile. Use these to guide your nutrition and meal plans.")
+                if metrics.get("adaptive"):
+                    st.caption("TDEE is adapted from your logged weight trend and planned intake.")
                 bmi, bmr, tdee, budget = metrics["bmi"], int(metrics["bmr"]), int(metrics["tdee"]), int(metrics["calorie_target"])
                 st.markdown(f"""
                 <div class="dashboard-metrics-row">
@@ -787,7 +788,7 @@ with tab_dashboard:
                     time_value = "—"
                 st.subheader("Weight goal & timeline")
                 st.caption("Ideal weight from healthy BMI (18.5–24.9). Time estimate assumes consistent adherence to your calorie plan.")
-                current_weight_unit = "kg (from latest log)" if latest_log else "kg (from profile)"
+                current_weight_unit = "kg (smoothed trend)" if latest_log else "kg (from profile)"
                 st.markdown(f"""
                 <div class="dashboard-metrics-row">
                     <div class="dashboard-metric-box">
@@ -813,6 +814,13 @@ with tab_dashboard:
                 </div>
                 """, unsafe_allow_html=True)
 
+                with st.expander("What-if: projected weight over 26 weeks", expanded=False):
+                    _what_if_projection(
+                        weight_kg, height_cm or 170, getattr(user, "age", 25) or 25,
+                        (getattr(user, "gender", "") or "").strip().lower() in ("male", "m"),
+                        metrics,
+                    )
+
                 # Detailed explanations
                 st.subheader("Understanding your metrics")
                 with st.expander("**BMI - Body Mass Index**", expanded=False):
@@ -843,49 +851,39 @@ with tab_dashboard:
         finally:
             db.close()
 
-with tab_meals:
-
+@_tab_fragment("meals")
+def _meals_tab():
+    """Meal plan generation, the 7-day plan and the grocery list."""
     user_id = st.session_state.get("user_id")
     if not user_id:
         st.info("Complete your profile on the **Dashboard** tab first.")
-        st.stop()
-
-    def load_meal_plan_into_session(db):
-        plan_obj = get_latest_meal_plan(db, user_id)
-        if plan_obj and plan_obj.plan_json:
-            import json
-            st.session_state["latest_meal_plan"] = json.loads(plan_obj.plan_json)
-        else:
-            st.session_state["latest_meal_plan"] = None
+        return
 
     db = get_db_session()
     try:
-        if st.session_state.get("latest_meal_plan") is None:
-            load_meal_plan_into_session(db)
-
-        gen_clicked = st.button("Generate my meal plan", type="primary", help="Generate or replace your 7-day meal plan")
+        if st.session_state.get("meal_plan_id") is None:
+            st.session_state["meal_plan_id"] = load_latest_plan(db, "meal", user_id)
+        _resume_active_job(db, user_id, "meal")
+
+        gen_clicked = st.button(
+            "Generate my meal plan",
+            type="primary",
+            help="Generate or replace your 7-day meal plan",
+            disabled=st.session_state.get("meal_job_id") is not None,
+        )
         if gen_clicked:
-            with st.spinner("Generating your meal plan…"):
-                try:
-                    plan = generate_and_save_meal_plan(db, user_id)
-                    if plan:
-                        st.session_state["latest_meal_plan"] = plan
-                        st.success("Meal plan generated!")
-                    else:
-                        st.error("Could not generate plan. Please try again.")
-                        st.caption("Possible causes: no recipes in the database, or the AI returned invalid data. Check that recipes are loaded (scripts/load_recipes) and your Gemini API key is set in .env.")
-                except Exception as e:
-                    err = str(e)
-                    if "429" in err or "quota" in err.lower():
-                        st.warning("Rate limit reached. Wait about a minute and try again. You can switch to gemini-2.5-flash-lite in app/ai_engine/gemini_client.py if needed.")
-                    else:
-                        st.error("Could not generate plan. Please try again.")
-                    with st.expander("Error details (for debugging)"):
-                        st.code(err)
-        else:
-            pass  # show existing plan below
-
-        plan = st.session_state.get("latest_meal_plan")
+            # Generation runs on the background job pool; the fragment below polls until it finishes
+            job = enqueue_job(db, user_id, "meal", idempotency_key=f"ui:{uuid.uuid4().hex}")
+            st.session_state["meal_job_id"] = job.id
+        _poll_generation_job("meal", "meal plan")
+        job_message = st.session_state.pop("meal_job_message", None)
+        if job_message and job_message[0] == "success":
+            st.success("Meal plan generated!")
+        elif job_message:
+            _show_generation_error(job_message[1], "plan")
+            st.caption("Possible causes: no recipes in the database, or the AI returned invalid data. Check that recipes are loaded (scripts/load_recipes) and your Gemini API key is set in .env.")
+
+        plan = get_plan(db, "meal", st.session_state.get("meal_plan_id"))
         if not plan:
             st.info("Generate your first meal plan using the button above.")
         else:
@@ -902,7 +900,7 @@ with tab_meals:
             with dl_plan_col:
                 st.download_button(
                     "Download meal plan",
-                    data=_build_meal_plan_pdf(plan),
+                    data=partial(build_meal_plan_pdf, plan),  # built only when clicked
                     file_name="meal_plan.pdf",
                     mime="application/pdf",
                     key="dl_meal_plan",
@@ -911,7 +909,11 @@ with tab_meals:
             # Grocery data (used for download and for display below)
             weekly_raw = plan.get("weekly_grocery_list") or []
             all_raw = weekly_raw if weekly_raw else [g for d in days for g in (d.get("grocery_list") or [])]
-            merged_groceries = _parse_and_merge_grocery_items(all_raw)
+            merged_groceries = parse_and_merge_grocery_items(all_raw)
+            # Skip what the user already has in their pantry from earlier weeks
+            pantry = get_pantry(db, user_id)
+            in_pantry = [g[0] for g in merged_groceries if g[0].lower().strip() in pantry]
+            merged_groceries = subtract_pantry(merged_groceries, pantry)
             total_grocery_cost = sum(g[2] for g in merged_groceries)
 
             # Build slot key -> label for display
@@ -945,10 +947,14 @@ with tab_meals:
             with grocery_cap_col:
                 st.caption(f"Use this list to shop for the week. Weekly plan cost ₹{cost:.0f} is within your budget of ₹{budget:.0f}." if within_budget else f"Weekly plan cost ₹{cost:.0f} (budget ₹{budget:.0f}).")
                 st.caption("Items marked with ♻️ can be reused for future weeks.")
+                if pantry:
+                    st.caption(f"Already in your pantry: {', '.join(sorted((p.name for p in pantry.values()), key=str.lower))}.")
+                if in_pantry:
+                    st.caption(f"Reduced or removed from this list because you have them: {', '.join(in_pantry)}.")
             with grocery_dl_col:
                 st.download_button(
                     "Download grocery list",
-                    data=_build_grocery_pdf(merged_groceries, total_grocery_cost),
+                    data=partial(build_grocery_pdf, merged_groceries, total_grocery_cost),
                     file_name="grocery_list.pdf",
                     mime="application/pdf",
                     key="dl_grocery",
@@ -979,51 +985,58 @@ with tab_meals:
                 if total_grocery_cost > 0:
                     st.markdown("---")
                     st.markdown(f"**Total approx grocery cost:** ₹{total_grocery_cost:.0f}")
+                meal_plan_id = st.session_state.get("meal_plan_id")
+                accepted = st.session_state.get("groceries_accepted")
+                if not accepted or accepted[0] != meal_plan_id:
+                    accepted = (meal_plan_id, is_grocery_list_accepted(db, user_id, meal_plan_id))
+                    st.session_state["groceries_accepted"] = accepted
+                if accepted[1]:
+                    st.caption("✅ Groceries recorded. Reusable items are in your pantry for next week.")
+                elif st.button("I bought these groceries", help="Add reusable items to your pantry so next week's list skips them"):
+                    try:
+                        # Applied at most once per plan: a no-op if another tab or session already accepted it
+                        accept_grocery_list(db, user_id, meal_plan_id, merged_groceries, plan)
+                        st.session_state["groceries_accepted"] = (meal_plan_id, True)
+                        _rerun_tab()
+                    except Exception as e:
+                        st.error(f"Could not update pantry: {e}")
             else:
                 st.caption("— No items generated. Regenerate the meal plan to get items with quantity and cost.")
     finally:
         db.close()
 
-with tab_workout:
+@_tab_fragment("workout")
+def _workout_tab():
+    """Workout plan generation and the weekly workout."""
     user_id = st.session_state.get("user_id")
     if not user_id:
         st.info("Complete your profile on the **Dashboard** tab first.")
-        st.stop()
-
-    def load_workout_plan_into_session(db):
-        plan_obj = get_latest_workout_plan(db, user_id)
-        if plan_obj and plan_obj.plan_json:
-            import json
-            st.session_state["latest_workout_plan"] = json.loads(plan_obj.plan_json)
-        else:
-            st.session_state["latest_workout_plan"] = None
+        return
 
     db = get_db_session()
     try:
-        if st.session_state.get("latest_workout_plan") is None:
-            load_workout_plan_into_session(db)
-
-        gen_workout_clicked = st.button("Generate my workout plan", type="primary", help="Generate or replace your 7-day workout plan")
+        if st.session_state.get("workout_plan_id") is None:
+            st.session_state["workout_plan_id"] = load_latest_plan(db, "workout", user_id)
+        _resume_active_job(db, user_id, "workout")
+
+        gen_workout_clicked = st.button(
+            "Generate my workout plan",
+            type="primary",
+            help="Generate or replace your 7-day workout plan",
+            disabled=st.session_state.get("workout_job_id") is not None,
+        )
         if gen_workout_clicked:
-            with st.spinner("Generating your workout plan…"):
-                try:
-                    plan = generate_and_save_workout_plan(db, user_id)
-                    if plan:
-                        st.session_state["latest_workout_plan"] = plan
-                        st.success("Workout plan generated!")
-                    else:
-                        st.error("Could not generate workout plan. Please try again.")
-                        st.caption("Check that workouts are loaded (scripts/load_workouts) and your Gemini API key is set in .env.")
-                except Exception as e:
-                    err = str(e)
-                    if "429" in err or "quota" in err.lower():
-                        st.warning("Rate limit reached. Wait about a minute and try again. You can switch to gemini-2.5-flash-lite in app/ai_engine/gemini_client.py if needed.")
-                    else:
-                        st.error("Could not generate workout plan. Please try again.")
-                    with st.expander("Error details (for debugging)"):
-                        st.code(err)
-
-        plan = st.session_state.get("latest_workout_plan")
+            job = enqueue_job(db, user_id, "workout", idempotency_key=f"ui:{uuid.uuid4().hex}")
+            st.session_state["workout_job_id"] = job.id
+        _poll_generation_job("workout", "workout plan")
+        job_message = st.session_state.pop("workout_job_message", None)
+        if job_message and job_message[0] == "success":
+            st.success("Workout plan generated!")
+        elif job_message:
+            _show_generation_error(job_message[1], "workout plan")
+            st.caption("Check that workouts are loaded (scripts/load_workouts) and your Gemini API key is set in .env.")
+
+        plan = get_plan(db, "workout", st.session_state.get("workout_plan_id"))
         if not plan:
             st.info("Generate your first workout plan using the button above.")
         else:
@@ -1044,13 +1057,15 @@ with tab_workout:
     finally:
         db.close()
 
-with tab_progress:
+@_tab_fragment("progress")
+def _progress_tab():
+    """Weight logging and the weight trend chart."""
     st.subheader("Log your weight to track progress over time.")
 
     user_id = st.session_state.get("user_id")
     if not user_id:
         st.info("Complete your profile on the **Dashboard** tab first.")
-        st.stop()
+        return
 
     db = get_db_session()
     try:
@@ -1064,40 +1079,97 @@ with tab_progress:
                 except Exception as e:
                     st.error(f"Could not log weight: {e}")
 
-        logs = get_weight_logs(db, user_id)
-        if len(logs) < 2:
+        with st.expander("Import weight history (CSV or JSON export)", expanded=False):
+            with st.form("import_weights_form", clear_on_submit=True):
+                upload = st.file_uploader("Export file", type=["csv", "json", "jsonl", "txt"])
+                pounds = st.checkbox("Weights are in pounds (unless the file says)")
+                if st.form_submit_button("Import") and upload is not None:
+                    from app.services.weight_import_service import WeightImportError, import_weight_history
+
+                    try:
+                        stats = import_weight_history(db, user_id, upload, unit="lb" if pounds else None)
+                        st.success(f"Imported {stats['imported']:,} entries "
+                                   f"({stats['duplicates']:,} already logged, {stats['invalid']:,} unreadable).")
+                    except WeightImportError as e:
+                        st.error(f"Could not import this file: {e}")
+
+        first_day, last_day, n_logs = get_weight_log_bounds(db, user_id)
+        if n_logs < 2:
             st.info("Log your first weight to see the chart. Add at least 2 entries for a trend line.")
         else:
             st.subheader("Weight trend")
-            df = pd.DataFrame([
-                {"date": log.logged_at, "weight_kg": float(log.weight_kg)}
-                for log in logs
-            ])
+            import altair as alt
+            import pandas as pd
+
+            # Zooming reruns only this tab and loads only the logs inside the chosen window
+            start, end = first_day, last_day
+            if last_day > first_day:
+                start, end = st.slider(
+                    "Date range", min_value=first_day, max_value=last_day, value=(first_day, last_day),
+                    format="MMM D, YYYY", key="weight_chart_range",
+                )
+            df = pd.DataFrame(get_weight_series(db, user_id, start, end), columns=["date", "weight_kg", "trend_kg"])
+            df["trend_kg"] = df["trend_kg"].fillna(df["weight_kg"])
             # Ensure date is datetime for Altair
             df["date"] = pd.to_datetime(df["date"])
-            df = df.sort_values("date").reset_index(drop=True)
-            w_min, w_max = df["weight_kg"].min(), df["weight_kg"].max()
-            y_padding = max(2.0, (w_max - w_min) * 0.15) if w_max > w_min else 2.0
-            y_domain = [max(30, w_min - y_padding), min(200, w_max + y_padding)]
-
-            chart = (
-                alt.Chart(df)
-                .mark_line(point={"size": 90, "filled": True}, strokeWidth=2)
-                .encode(
+            if df.empty:
+                st.info("No entries in this date range.")
+            else:
+                w_min, w_max = df["weight_kg"].min(), df["weight_kg"].max()
+                y_padding = max(2.0, (w_max - w_min) * 0.15) if w_max > w_min else 2.0
+                y_domain = [max(30, w_min - y_padding), min(200, w_max + y_padding)]
+                # Long histories: send a shape-preserving subset sized to the chart width, not every log
+                n_shown = len(df)
+                budget = point_budget(n_shown, window_days=(end - start).days)
+                if budget < n_shown:
+                    days = (df["date"] - df["date"].iloc[0]).dt.days.to_numpy()
+                    df = df.iloc[downsample_indices(days, df["weight_kg"].to_numpy(), budget)]
+                subtitle = "Points: logged entries · Line: smoothed trend"
+                if len(df) < n_shown:
+                    subtitle += f" · {len(df)} of {n_shown} entries shown; narrow the date range for full detail"
+
+                base = alt.Chart(df).encode(
                     x=alt.X("date:T", title="Date", axis=alt.Axis(format="%b %d", labelOverlap="parity")),
+                )
+                logged = base.mark_line(point={"size": 90, "filled": True}, strokeWidth=1, opacity=0.5).encode(
                     y=alt.Y("weight_kg:Q", title="Weight (kg)", scale=alt.Scale(domain=y_domain)),
                 )
-                .properties(
-                    title=alt.TitleParams(text="Weight over time", subtitle="Log entries in the Progress tab"),
-                    height=320,
+                trend = base.mark_line(strokeWidth=3, color="#0284c7").encode(
+                    y=alt.Y("trend_kg:Q", scale=alt.Scale(domain=y_domain)),
                 )
-                .configure_axis(
-                    labelFontSize=11,
-                    titleFontSize=12,
-                    gridOpacity=0.2,
+                chart = (
+                    alt.layer(logged, trend)
+                    .properties(
+                        title=alt.TitleParams(text="Weight over time", subtitle=subtitle),
+                        height=320,
+                    )
+                    .configure_axis(
+                        labelFontSize=11,
+                        titleFontSize=12,
+                        gridOpacity=0.2,
+                    )
+                    .configure_view(strokeWidth=0)
                 )
-                .configure_view(strokeWidth=0)
-            )
-            st.altair_chart(chart, use_container_width=True)
+                st.altair_chart(chart, use_container_width=True)
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+tab_dashboard, tab_meals, tab_workout, tab_progress = st.tabs(["Dashboard", "Nutrition & Meals", "Workout", "Progress"])
+with tab_dashboard:
+    _dashboard_tab()
+with tab_meals:
+    _meals_tab()
+with tab_workout:
+    _workout_tab()
+with tab_progress:
+    _progress_tab()
+_full_run = False
+
+# ----- Developer panels -----
+end_trace(rerun_trace)
+if rerun_queries is not None:
+    stop_capture(rerun_queries)
+if show_trace_panel and rerun_trace is not None:
+    _render_trace_panel(rerun_trace)
+if rerun_queries is not None:
+    _render_sql_panel(rerun_queries)
@@ -0,0 +1,82 @@
+"""One-time startup work (create tables, load reference data) instead of repeating it on every script run.
+
+ensure_ready() runs the steps at most once per database: the first process to get there takes a lock
+(a Postgres advisory lock across processes, a thread lock within one), runs them and records a readiness
+marker row. Later processes see the marker and skip straight through; later calls in the same process
+return without touching the database. Every process also opens the memory-mapped catalog snapshot here.
+"""
+import threading
+
+from sqlalchemy import inspect
+
+from app.database import Base, SessionLocal, engine
+
+# Bump when the steps in _run_steps change (or a table is added) so existing databases run them again
+BOOTSTRAP_VERSION = 2
+_MARKER = "startup"
+
+_ready = False
+_lock = threading.Lock()
+
+
+def _marker_current(session):
+    from app.models.bootstrap_marker import BootstrapMarker
+
+    # Check for the table instead of catching the failed SELECT: rolling back would end the transaction, and
+    # with it the transaction-level advisory lock this is called under
+    if not inspect(session.connection()).has_table(BootstrapMarker.__tablename__):
+        return False  # the database has never been bootstrapped
+    marker = session.get(BootstrapMarker, _MARKER)
+    return marker is not None and marker.version >= BOOTSTRAP_VERSION
+
+
+def _run_steps(session):
+    import app.models  # noqa: F401  (register every table on Base.metadata)
+    from app.models.bootstrap_marker import BootstrapMarker
+    from scripts.load_workouts import load_workouts
+
+    Base.metadata.create_all(bind=engine)
+    load_workouts()
+    session.merge(BootstrapMarker(name=_MARKER, version=BOOTSTRAP_VERSION))
+    session.commit()
+
+
+def _run_once(session):
+    """Run the steps unless the marker says they are done, holding the bootstrap lock. True if they ran."""
+    from app.services.single_flight import advisory_lock
+
+    if _marker_current(session):
+        return False
+    with advisory_lock(session, "bootstrap"):
+        # Another process may have finished while we waited for the lock
+        if _marker_current(session):
+            return False
+        _run_steps(session)
+        return True
+
+
+def is_ready():
+    """True once ensure_ready() has completed in this process."""
+    return _ready
+
+
+def ensure_ready():
+    """Make sure tables and reference data exist. Returns True if this call ran the bootstrap steps."""
+    global _ready
+    if _ready:
+        return False
+    with _lock:
+        if _ready:
+            return False
+        session = SessionLocal()
+        try:
+            ran = _run_once(session)
+            # Map the catalog snapshot now (built from the database if this host has none yet) so the first
+            # plan request does not pay for it
+            from app.catalog_snapshot import get_snapshot
+
+            get_snapshot(session)
+        finally:
+            session.close()
+        _ready = True
+        return ran
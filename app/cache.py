@@ -0,0 +1,481 @@
+"""Cache shared between processes (several Streamlit / API workers on one host or behind a load balancer).
+
+Every backend stores JSON-serializable values under (namespace, key) with an optional TTL and bounded size,
+and supports versioned invalidation: invalidate(namespace) bumps the namespace's version, so entries written
+under older versions stop matching in every process. Backends (CACHE_BACKEND):
+
+  none (default)  no shared cache; in-process caches such as the plan store still work
+  memory          per-process LRU (tests, single worker)
+  sqlite          SQLite file shared by the processes on one host (CACHE_SQLITE_PATH)
+  postgres        UNLOGGED table in the app database; invalidations are broadcast with LISTEN/NOTIFY.
+                  Uses its own small connection pool (CACHE_PG_POOL_SIZE, default 3, one of which the
+                  invalidation listener holds), never the app's
+
+CACHE_MAX_MB bounds the stored bytes (default 256). Values are JSON, never pickles, so a shared store
+cannot inject code into the workers reading it. The cache fails open: a backend error (locked SQLite file,
+unreachable Postgres) makes get() a miss and set() a no-op, so callers fall back to the database.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+NOTIFY_CHANNEL = "cache_invalidate"
+# Recipe / workout catalog data; the load scripts invalidate it after changing the tables
+CATALOG_NAMESPACE = "catalog"
+
+
+class CacheBackend:
+    """
+    Interface and shared bookkeeping. Subclasses implement _load, _store, _delete, _read_versions and
+    _bump_version; versions are held locally and refreshed every version_poll_s (or on notification).
+    """
+
+    name = "base"
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, default_ttl=None, version_poll_s=1.0):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.version_poll_s = version_poll_s
+        self.hits = self.misses = self.sets = self.evictions = self.errors = 0
+        self._versions = {}
+        self._versions_read_at = 0.0
+        self._versions_lock = threading.Lock()
+
+    # ---- public API ----
+
+    def get(self, namespace, key, default=None):
+        """
+        Cached value, or default when missing, expired, written under an older namespace version or
+        unreadable because the backend failed.
+        """
+        try:
+            row = self._load(namespace, key)
+            if row is not None:
+                value, version, expires_at = row
+                if version == self.version(namespace) and (expires_at is None or expires_at > time.time()):
+                    self.hits += 1
+                    return json.loads(value)
+        except Exception as e:
+            self._failed("get", e)
+        self.misses += 1
+        return default
+
+    def set(self, namespace, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.default_ttl
+        data = json.dumps(value, separators=(",", ":"), default=str)
+        if len(data) > self.max_bytes:
+            return
+        try:
+            self._store(namespace, key, data, self.version(namespace), time.time() + ttl if ttl else None)
+        except Exception as e:
+            self._failed("set", e)
+            return
+        self.sets += 1
+
+    def get_or_set(self, namespace, key, compute, ttl=None):
+        """Cached value, else compute() stored for next time (None results are not cached)."""
+        value = self.get(namespace, key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(namespace, key, value, ttl)
+        return value
+
+    def delete(self, namespace, key):
+        self._delete(namespace, key)
+
+    def invalidate(self, namespace):
+        """Drop every entry of the namespace in all processes (bumps and broadcasts its version)."""
+        version = self._bump_version(namespace)
+        with self._versions_lock:
+            self._versions[namespace] = version
+        return version
+
+    def version(self, namespace):
+        with self._versions_lock:
+            if time.monotonic() - self._versions_read_at >= self.version_poll_s:
+                self._versions_read_at = time.monotonic()
+                try:
+                    self._versions = self._read_versions()
+                except Exception as e:
+                    self._failed("version read", e)  # keep the last known versions until the next poll
+            return self._versions.get(namespace, 0)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name, "hits": self.hits, "misses": self.misses, "sets": self.sets,
+            "evictions": self.evictions, "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+    def _failed(self, op, error):
+        self.errors += 1
+        if self.errors == 1:
+            print(f"Cache ({self.name}): {op} failed, treating as a miss ({error.__class__.__name__}: {error})")
+
+    # ---- backend hooks ----
+
+    def _load(self, namespace, key):
+        """(json text, version, expires_at or None) or None."""
+        raise NotImplementedError
+
+    def _store(self, namespace, key, data, version, expires_at):
+        raise NotImplementedError
+
+    def _delete(self, namespace, key):
+        raise NotImplementedError
+
+    def _read_versions(self):
+        raise NotImplementedError
+
+    def _bump_version(self, namespace):
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    """No shared cache: every get misses and nothing is stored."""
+
+    name = "none"
+
+    def get(self, namespace, key, default=None):
+        return default
+
+    def set(self, namespace, key, value, ttl=None):
+        pass
+
+    def delete(self, namespace, key):
+        pass
+
+    def invalidate(self, namespace):
+        return 0
+
+    def version(self, namespace):
+        return 0
+
+
+class MemoryCache(CacheBackend):
+    """Per-process LRU bounded by stored bytes."""
+
+    name = "memory"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries = OrderedDict()  # (namespace, key) -> (data, version, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _load(self, namespace, key):
+        with self._lock:
+            row = self._entries.get((namespace, key))
+            if row is not None:
+                self._entries.move_to_end((namespace, key))
+            return row
+
+    def _store(self, namespace, key, data, version, expires_at):
+        with self._lock:
+            old = self._entries.pop((namespace, key), None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[(namespace, key)] = (data, version, expires_at)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _key, (evicted, _v, _e) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _delete(self, namespace, key):
+        with self._lock:
+            old = self._entries.pop((namespace, key), None)
+            if old is not None:
+                self._bytes -= len(old[0])
+
+    def _read_versions(self):
+        return self._versions
+
+    def _bump_version(self, namespace):
+        with self._lock:
+            for k in [k for k in self._entries if k[0] == namespace]:
+                self._bytes -= len(self._entries.pop(k)[0])
+        return self._versions.get(namespace, 0) + 1
+
+
+# Shared SQL for the two table-backed stores. accessed_at is refreshed at most every _TOUCH_S seconds,
+# so hits rarely write; eviction removes expired rows, then the least recently accessed.
+_TOUCH_S = 30.0
+_EVICT_EVERY = 200  # sets between eviction passes
+
+
+class SqliteCache(CacheBackend):
+    """SQLite file (WAL mode) shared by every process on the host; one connection per thread."""
+
+    name = "sqlite"
+
+    def __init__(self, path=None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = str(path or Path(tempfile.gettempdir()) / "health_companion_cache.sqlite3")
+        self._local = threading.local()
+        self._sets_since_evict = 0
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL, key TEXT NOT NULL, version INTEGER NOT NULL, value TEXT NOT NULL,
+                size INTEGER NOT NULL, expires_at REAL, accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed ON cache_entries (accessed_at);
+            CREATE TABLE IF NOT EXISTS cache_versions (namespace TEXT PRIMARY KEY, version INTEGER NOT NULL);
+        """)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _load(self, namespace, key):
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, version, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[3] > _TOUCH_S:
+            conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, namespace, key))
+        return row[0], row[1], row[2]
+
+    def _store(self, namespace, key, data, version, expires_at):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, version, value, size, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (namespace, key, version, data, len(data), expires_at, time.time()),
+        )
+        self._sets_since_evict += 1
+        if self._sets_since_evict >= _EVICT_EVERY:
+            self._sets_since_evict = 0
+            self.evict()
+
+    def _delete(self, namespace, key):
+        self._conn().execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def _read_versions(self):
+        return dict(self._conn().execute("SELECT namespace, version FROM cache_versions").fetchall())
+
+    def _bump_version(self, namespace):
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO cache_versions (namespace, version) VALUES (?, 1) "
+            "ON CONFLICT (namespace) DO UPDATE SET version = version + 1",
+            (namespace,),
+        )
+        conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+        return conn.execute("SELECT version FROM cache_versions WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def evict(self):
+        """Delete expired entries, then the least recently accessed until under max_bytes."""
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)).rowcount
+        removed += conn.execute("""
+            DELETE FROM cache_entries WHERE (namespace, key) IN (
+                SELECT namespace, key FROM (
+                    SELECT namespace, key, SUM(size) OVER (ORDER BY accessed_at DESC, namespace, key) AS running
+                    FROM cache_entries
+                ) WHERE running > ?
+            )
+        """, (self.max_bytes,)).rowcount
+        self.evictions += removed
+
+
+class PostgresCache(CacheBackend):
+    """
+    UNLOGGED table in the app's Postgres database (no WAL cost; emptied after a crash, which is fine for a
+    cache). engine should be the cache's own (cache_from_env builds one): the listener holds one of its
+    connections for good. invalidate() NOTIFYs the other workers, whose listener thread applies the new version at once;
+    the version poll is only a fallback if a notification is missed.
+    """
+
+    name = "postgres"
+
+    def __init__(self, engine, version_poll_s=30.0, **kwargs):
+        super().__init__(version_poll_s=version_poll_s, **kwargs)
+        from sqlalchemy import text
+
+        self._text = text
+        self.engine = engine
+        self._sets_since_evict = 0
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE UNLOGGED TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL, key TEXT NOT NULL, version INTEGER NOT NULL, value TEXT NOT NULL,
+                    size INTEGER NOT NULL, expires_at DOUBLE PRECISION, accessed_at DOUBLE PRECISION NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed ON cache_entries (accessed_at)"))
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS cache_versions (namespace TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            ))
+        self._listener = threading.Thread(target=self._listen, name="cache-invalidation-listener", daemon=True)
+        self._listener.start()
+
+    def _load(self, namespace, key):
+        with self.engine.connect() as conn:
+            row = conn.execute(self._text(
+                "SELECT value, version, expires_at, accessed_at FROM cache_entries WHERE namespace = :ns AND key = :k"
+            ), {"ns": namespace, "k": key}).first()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[3] > _TOUCH_S:
+                conn.execute(self._text(
+                    "UPDATE cache_entries SET accessed_at = :now WHERE namespace = :ns AND key = :k"
+                ), {"now": now, "ns": namespace, "k": key})
+                conn.commit()
+            return row[0], row[1], row[2]
+
+    def _store(self, namespace, key, data, version, expires_at):
+        with self.engine.begin() as conn:
+            conn.execute(self._text("""
+                INSERT INTO cache_entries (namespace, key, version, value, size, expires_at, accessed_at)
+                VALUES (:ns, :k, :v, :data, :size, :exp, :now)
+                ON CONFLICT (namespace, key) DO UPDATE SET version = EXCLUDED.version, value = EXCLUDED.value,
+                    size = EXCLUDED.size, expires_at = EXCLUDED.expires_at, accessed_at = EXCLUDED.accessed_at
+            """), {"ns": namespace, "k": key, "v": version, "data": data, "size": len(data),
+                   "exp": expires_at, "now": time.time()})
+        self._sets_since_evict += 1
+        if self._sets_since_evict >= _EVICT_EVERY:
+            self._sets_since_evict = 0
+            self.evict()
+
+    def _delete(self, namespace, key):
+        with self.engine.begin() as conn:
+            conn.execute(self._text("DELETE FROM cache_entries WHERE namespace = :ns AND key = :k"), {"ns": namespace, "k": key})
+
+    def _read_versions(self):
+        with self.engine.connect() as conn:
+            return dict(conn.execute(self._text("SELECT namespace, version FROM cache_versions")).all())
+
+    def _bump_version(self, namespace):
+        with self.engine.begin() as conn:
+            version = conn.execute(self._text("""
+                INSERT INTO cache_versions (namespace, version) VALUES (:ns, 1)
+                ON CONFLICT (namespace) DO UPDATE SET version = cache_versions.version + 1
+                RETURNING version
+            """), {"ns": namespace}).scalar_one()
+            conn.execute(self._text("DELETE FROM cache_entries WHERE namespace = :ns"), {"ns": namespace})
+            conn.execute(self._text("SELECT pg_notify(:channel, :payload)"),
+                         {"channel": NOTIFY_CHANNEL, "payload": f"{namespace}:{version}"})
+        return version
+
+    def _listen(self):
+        """Apply other workers' invalidations as they are broadcast; reconnect after errors."""
+        import select
+
+        while True:
+            raw = None
+            try:
+                raw = self.engine.raw_connection()
+                dbapi = raw.driver_connection
+                dbapi.autocommit = True
+                dbapi.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+                while True:
+                    if select.select([dbapi], [], [], 60.0) == ([], [], []):
+                        continue
+                    dbapi.poll()
+                    while dbapi.notifies:
+                        namespace, _, version = dbapi.notifies.pop(0).payload.rpartition(":")
+                        with self._versions_lock:
+                            if int(version) > self._versions.get(namespace, 0):
+                                self._versions[namespace] = int(version)
+            except Exception:
+                time.sleep(5.0)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+
+    def evict(self):
+        """Delete expired entries, then the least recently accessed until under max_bytes."""
+        with self.engine.begin() as conn:
+            removed = conn.execute(self._text(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= :now"
+            ), {"now": time.time()}).rowcount
+            removed += conn.execute(self._text("""
+                DELETE FROM cache_entries WHERE (namespace, key) IN (
+                    SELECT namespace, key FROM (
+                        SELECT namespace, key,
+                               SUM(size) OVER (ORDER BY accessed_at DESC, namespace, key) AS running
+                        FROM cache_entries
+                    ) ranked WHERE running > :max_bytes
+                )
+            """), {"max_bytes": self.max_bytes}).rowcount
+        self.evictions += removed
+
+
+def cache_from_env():
+    """Build the backend named by CACHE_BACKEND (see module docstring)."""
+    name = (os.getenv("CACHE_BACKEND") or "none").strip().lower()
+    max_bytes = int(float(os.getenv("CACHE_MAX_MB") or 256) * 1024 * 1024)
+    if name == "none":
+        return NullCache()
+    if name == "memory":
+        return MemoryCache(max_bytes=max_bytes)
+    if name == "sqlite":
+        return SqliteCache(os.getenv("CACHE_SQLITE_PATH") or None, max_bytes=max_bytes)
+    if name == "postgres":
+        from sqlalchemy import create_engine
+
+        from app.database import engine
+
+        if engine.dialect.name != "postgresql":
+            raise ValueError("CACHE_BACKEND=postgres needs a PostgreSQL DATABASE_URL")
+        # A separate pool, so cache lookups never wait on (or starve) the request sessions' connections;
+        # a short pool_timeout turns a saturated cache pool into misses rather than stalls
+        pool_size = max(2, int(os.getenv("CACHE_PG_POOL_SIZE") or 3))
+        cache_engine = create_engine(engine.url, pool_size=pool_size, max_overflow=0, pool_timeout=1.0,
+                                     pool_pre_ping=True)
+        return PostgresCache(cache_engine, max_bytes=max_bytes)
+    raise ValueError(f"Unknown CACHE_BACKEND: {name!r} (expected none, memory, sqlite or postgres)")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Process-wide cache backend, created from the environment on first use. A backend that cannot be opened
+    (unwritable CACHE_SQLITE_PATH, database down) is replaced by NullCache; a misconfiguration still raises.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = cache_from_env()
+            except ValueError:
+                raise
+            except Exception as e:
+                print(f"Cache: could not open the shared cache, running without it ({e.__class__.__name__}: {e})")
+                _cache = NullCache()
+        return _cache
+
+
+def set_cache(cache):
+    """Swap the backend (e.g. a MemoryCache in benchmarks). Returns the previous one."""
+    global _cache
+    with _cache_lock:
+        previous, _cache = _cache, cache
+        return previous
@@ -0,0 +1,344 @@
+"""Columnar snapshot of the recipe and workout catalog, memory-mapped by every worker on the host.
+
+A snapshot is a directory named after the catalog hash, holding per table:
+  <table>.<column>.npy          numeric columns (float64 / int64, NaN for NULL)
+  <table>.<column>.codes.npy    short categorical strings as int32 codes into the manifest's vocabulary (-1 = NULL)
+  <table>.<column>.bin / .offsets.npy   long text as one UTF-8 blob plus (start, end) per row ((-1, -1) = NULL)
+and manifest.json (format version, hash, row counts, vocabularies). Numeric arrays are opened with
+np.load(mmap_mode="r") and text is decoded only for the rows that are read, so opening a snapshot costs a few
+milliseconds and the page cache is shared by all processes using it.
+
+Snapshots are written by build_snapshot (the catalog load scripts call it, and a worker builds one on first use
+when none exists) into a temporary directory that is renamed into place, so readers never see a partial one.
+CURRENT-<database> names the snapshot in use for each database. A worker re-checks that pointer every few
+seconds; when the shared cache's "catalog" namespace is invalidated it reopens the snapshot the pointer names,
+and rebuilds from the database only if there is none (or the pointer did not move).
+
+CATALOG_SNAPSHOT_DIR sets the directory (default data/catalog_snapshot); CATALOG_SNAPSHOT=0 disables snapshots
+(catalog reads then go to the database).
+"""
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.cache import CATALOG_NAMESPACE, get_cache
+from app.models.recipes import Recipe
+from app.models.workout import Workout
+from app.tracing import span
+
+FORMAT_VERSION = 1
+DEFAULT_DIR = Path(__file__).resolve().parent.parent / "data" / "catalog_snapshot"
+# Seconds between checks of the CURRENT pointer (another process may have built a newer snapshot)
+CHECK_INTERVAL_S = 5.0
+# Snapshot directories kept per database; older ones are removed (mapped pages stay valid for open readers)
+KEEP_SNAPSHOTS = 2
+
+# table -> (model, numeric, categorical, text) columns
+SCHEMA = {
+    "recipes": (
+        Recipe,
+        ("id", "calories_per_serving", "protein_g", "carbs_g", "fat_g", "cost_per_serving"),
+        ("diet_type", "cuisine", "meal_type"),
+        ("name", "ingredients", "instructions"),
+    ),
+    "workouts": (
+        Workout,
+        ("id", "calories_burn_per_30min"),
+        ("category", "difficulty", "goal", "equipment_required"),
+        ("exercise_name", "suggested_instructions"),
+    ),
+}
+
+
+def snapshot_dir():
+    return Path(os.getenv("CATALOG_SNAPSHOT_DIR") or DEFAULT_DIR)
+
+
+def snapshots_enabled():
+    return (os.getenv("CATALOG_SNAPSHOT") or "1").strip().lower() not in ("0", "off", "false", "no")
+
+
+def database_key(engine):
+    """Short stable id of the database the snapshot was built from (password left out)."""
+    url = engine.url.render_as_string(hide_password=True)
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:12]
+
+
+class SnapshotRecord:
+    """One catalog row; attributes are read from the snapshot on access (text is decoded only when read)."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._table.value(name, self._row)
+
+    def __repr__(self):
+        return f"<{self._table.name} id={self.id}>"
+
+
+class SnapshotTable:
+    """Read-only view of one table in an open snapshot."""
+
+    def __init__(self, name, path, manifest):
+        _model, numeric, categorical, text = SCHEMA[name]
+        self.name = name
+        self.rows = manifest["tables"][name]["rows"]
+        self._numeric = {c: np.load(path / f"{name}.{c}.npy", mmap_mode="r") for c in numeric}
+        self._codes = {c: np.load(path / f"{name}.{c}.codes.npy", mmap_mode="r") for c in categorical}
+        self._vocab = manifest["tables"][name]["vocab"]
+        self._code_of = {c: {v: i for i, v in enumerate(vocab)} for c, vocab in self._vocab.items()}
+        self._offsets = {c: np.load(path / f"{name}.{c}.offsets.npy", mmap_mode="r") for c in text}
+        self._blobs = {}
+        for c in text:
+            with open(path / f"{name}.{c}.bin", "rb") as f:
+                # mmap of an empty file is an error; a table without any text gets an empty bytes object
+                self._blobs[c] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """Numeric column as a read-only (memory-mapped) array."""
+        return self._numeric[name]
+
+    def value(self, name, row):
+        if name in self._numeric:
+            v = self._numeric[name][row]
+            if name == "id":
+                return int(v)
+            return None if np.isnan(v) else float(v)
+        if name in self._codes:
+            code = int(self._codes[name][row])
+            return self._vocab[name][code] if code >= 0 else None
+        if name in self._offsets:
+            start, end = (int(x) for x in self._offsets[name][row])
+            return self._blobs[name][start:end].decode("utf-8") if start >= 0 else None
+        raise AttributeError(f"{self.name} snapshot has no column {name!r}")
+
+    def mask(self, **equals):
+        """Boolean row mask for categorical columns equal to the given values (None = no filter)."""
+        keep = np.ones(self.rows, dtype=bool)
+        for column, wanted in equals.items():
+            if wanted is None:
+                continue
+            code = self._code_of[column].get(wanted)
+            if code is None:
+                return np.zeros(self.rows, dtype=bool)
+            keep &= self._codes[column] == code
+        return keep
+
+    def records(self, mask=None):
+        """SnapshotRecords for the rows in the mask (all rows by default), in id order."""
+        rows = range(self.rows) if mask is None else np.flatnonzero(mask)
+        return [SnapshotRecord(self, int(r)) for r in rows]
+
+
+class CatalogSnapshot:
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "manifest.json", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog snapshot format in {self.path}")
+        self.hash = self.manifest["hash"]
+        self.tables = {name: SnapshotTable(name, self.path, self.manifest) for name in SCHEMA}
+
+    @property
+    def recipes(self):
+        return self.tables["recipes"]
+
+    @property
+    def workouts(self):
+        return self.tables["workouts"]
+
+
+def _columns(session, name):
+    """Column name -> list of values for the whole table, in id order (one query)."""
+    model, numeric, categorical, text = SCHEMA[name]
+    names = numeric + categorical + text
+    rows = session.query(*(getattr(model, c) for c in names)).order_by(model.id).all()
+    return {c: [r[i] for r in rows] for i, c in enumerate(names)}, len(rows)
+
+
+def _write_table(out, name, columns, n, digest):
+    _model, numeric, categorical, text = SCHEMA[name]
+    vocabs = {}
+    for c in numeric:
+        dtype = np.int64 if c == "id" else np.float64
+        arr = np.array([np.nan if v is None else v for v in columns[c]], dtype=dtype) if n else np.empty(0, dtype)
+        np.save(out / f"{name}.{c}.npy", arr)
+        digest.update(arr.tobytes())
+    for c in categorical:
+        vocab = sorted({v for v in columns[c] if v is not None})
+        index = {v: i for i, v in enumerate(vocab)}
+        codes = np.array([-1 if v is None else index[v] for v in columns[c]], dtype=np.int32)
+        np.save(out / f"{name}.{c}.codes.npy", codes)
+        vocabs[c] = vocab
+        digest.update(json.dumps(vocab).encode("utf-8"))
+        digest.update(codes.tobytes())
+    for c in text:
+        offsets = np.full((n, 2), -1, dtype=np.int64)
+        pos = 0
+        with open(out / f"{name}.{c}.bin", "wb") as f:
+            for i, v in enumerate(columns[c]):
+                if v is None:
+                    continue
+                data = v.encode("utf-8")
+                f.write(data)
+                digest.update(data)
+                offsets[i] = (pos, pos + len(data))
+                pos += len(data)
+        np.save(out / f"{name}.{c}.offsets.npy", offsets)
+        digest.update(offsets.tobytes())
+    return {"rows": n, "vocab": vocabs}
+
+
+def _pointer(directory, db_key):
+    return directory / f"CURRENT-{db_key}"
+
+
+def build_snapshot(session, directory=None):
+    """
+    Write a snapshot of the catalog in the session's database and point CURRENT at it. Returns its path.
+    When the catalog is unchanged (same hash) the existing snapshot is reused.
+    """
+    directory = Path(directory or snapshot_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+    db_key = database_key(session.get_bind())
+    with span("catalog_snapshot.build"):
+        tmp = Path(tempfile.mkdtemp(prefix=".building-", dir=directory))
+        try:
+            digest = hashlib.sha256(f"format{FORMAT_VERSION}:{db_key}".encode("ascii"))
+            tables = {}
+            for name in SCHEMA:
+                columns, n = _columns(session, name)
+                tables[name] = _write_table(tmp, name, columns, n, digest)
+            catalog_hash = digest.hexdigest()[:16]
+            manifest = {"format": FORMAT_VERSION, "hash": catalog_hash, "database": db_key,
+                        "built_at": time.time(), "tables": tables}
+            with open(tmp / "manifest.json", "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            final = directory / catalog_hash
+            if final.exists():
+                shutil.rmtree(tmp)
+            else:
+                try:
+                    os.replace(tmp, final)
+                except OSError:
+                    # Another process renamed the same snapshot into place first
+                    shutil.rmtree(tmp, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        pointer_tmp = directory / f".CURRENT-{db_key}.{os.getpid()}"
+        pointer_tmp.write_text(catalog_hash, encoding="ascii")
+        os.replace(pointer_tmp, _pointer(directory, db_key))
+    _prune(directory, db_key, keep=catalog_hash)
+    return final
+
+
+def _prune(directory, db_key, keep):
+    """Remove old snapshots of this database beyond KEEP_SNAPSHOTS (never the one just written)."""
+    snapshots = []
+    for path in directory.iterdir():
+        manifest = path / "manifest.json"
+        if path.name == keep or not manifest.is_file():
+            continue
+        try:
+            if json.loads(manifest.read_text(encoding="utf-8")).get("database") == db_key:
+                snapshots.append((manifest.stat().st_mtime, path))
+        except (OSError, ValueError):
+            continue
+    for _mtime, path in sorted(snapshots, reverse=True)[KEEP_SNAPSHOTS - 1:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def open_snapshot(db_key, directory=None):
+    """The current snapshot for this database, or None when none has been built."""
+    directory = Path(directory or snapshot_dir())
+    try:
+        catalog_hash = _pointer(directory, db_key).read_text(encoding="ascii").strip()
+        return CatalogSnapshot(directory / catalog_hash)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+_snapshot = None
+_checked_at = 0.0
+_catalog_version = None
+_lock = threading.Lock()
+
+
+def get_snapshot(session):
+    """
+    Process-wide snapshot for the session's database (opened once, re-checked every CHECK_INTERVAL_S), built
+    from the database when missing or invalidated. None when snapshots are disabled or cannot be written.
+    """
+    global _snapshot, _checked_at, _catalog_version
+    if not snapshots_enabled():
+        return None
+    now = time.monotonic()
+    with _lock:
+        if _checked_at and now - _checked_at < CHECK_INTERVAL_S:
+            return _snapshot
+        db_key = database_key(session.get_bind())
+        version = get_cache().version(CATALOG_NAMESPACE)
+        stale = _catalog_version is not None and version != _catalog_version
+        if stale:
+            # refresh() builds before it invalidates, so the pointer normally names the new snapshot already;
+            # only a missing pointer, or one still naming our snapshot (the reload ran where it could not write
+            # this directory, e.g. on another host), needs a rebuild here
+            current = open_snapshot(db_key)
+            if current is not None and _snapshot is not None and current.hash == _snapshot.hash:
+                current = None
+        else:
+            current = open_snapshot(db_key) if _snapshot is None or _pointer_moved(db_key) else _snapshot
+        if current is None:
+            try:
+                current = CatalogSnapshot(build_snapshot(session))
+            except OSError:
+                current = None
+        _snapshot, _checked_at, _catalog_version = current, now, version
+        return _snapshot
+
+
+def _pointer_moved(db_key):
+    try:
+        return _pointer(snapshot_dir(), db_key).read_text(encoding="ascii").strip() != _snapshot.hash
+    except OSError:
+        return True
+
+
+def reset():
+    """Forget the open snapshot (the next get_snapshot opens or builds it again)."""
+    global _snapshot, _checked_at, _catalog_version
+    with _lock:
+        _snapshot, _checked_at, _catalog_version = None, 0.0, None
+
+
+def refresh(session):
+    """
+    Call after changing the recipe or workout tables: rebuild the snapshot, drop this process's open copy and
+    invalidate the "catalog" cache namespace so other workers rebuild or reopen theirs.
+    """
+    if snapshots_enabled():
+        try:
+            build_snapshot(session)
+        except OSError:
+            pass  # read-only checkout: workers build their own on next use
+    reset()
+    get_cache().invalidate(CATALOG_NAMESPACE)
@@ -1,8 +1,12 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import DATABASE_URL
+from app.tracing import instrument_engine
+from app import query_counter
 
 engine = create_engine(DATABASE_URL)
+instrument_engine(engine)
+query_counter.install(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -0,0 +1,77 @@
+"""Downsampling for time-series charts: keep the visual shape of a long series within a point budget.
+
+lttb_indices (Largest-Triangle-Three-Buckets) keeps the points that matter most visually; minmax_indices
+keeps each bucket's lowest and highest point and is cheaper. Both return sorted indices into the input, so
+several columns (e.g. logged weight and trend) can be thinned with the same selection.
+"""
+import numpy as np
+
+# Assumed plot width when the real one is unknown (wide layout, use_container_width)
+DEFAULT_CHART_WIDTH_PX = 900
+
+
+def point_budget(n_points, width_px=DEFAULT_CHART_WIDTH_PX, window_days=None, px_per_point=3, min_points=60):
+    """
+    Number of points worth sending for a chart this wide: about one per px_per_point pixels, never more
+    than the series has, and never more than one per day of the visible window.
+    """
+    budget = max(min_points, int(width_px) // px_per_point)
+    if window_days is not None:
+        budget = min(budget, int(window_days) + 1)
+    return min(n_points, budget)
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the n_out points Largest-Triangle-Three-Buckets keeps (first and last always included)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1], dtype=int)
+    # Interior points are split into n_out - 2 buckets; each picks the point forming the largest triangle
+    # with the previously kept point and the average of the next bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            nxt_lo, nxt_hi = edges[b + 1], edges[b + 2]
+        else:
+            nxt_lo, nxt_hi = n - 1, n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(area.argmax())
+        out[b + 1] = prev
+    return out
+
+
+def minmax_indices(y, n_out):
+    """Indices of each bucket's minimum and maximum (at most n_out points, first and last included)."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 4:
+        return np.array([0, n - 1], dtype=int)
+    # First and last are kept anyway, so the interior gets the other n_out - 2 points, two per bucket
+    edges = np.linspace(1, n - 1, (n_out - 2) // 2 + 1).astype(int)
+    keep = {0, n - 1}
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            keep.add(lo + int(y[lo:hi].argmin()))
+            keep.add(lo + int(y[lo:hi].argmax()))
+    return np.array(sorted(keep), dtype=int)
+
+
+def downsample_indices(x, y, n_out, method="lttb"):
+    """Indices to keep for a series of len(x) points thinned to about n_out ("lttb" or "minmax")."""
+    if method == "minmax":
+        return minmax_indices(y, n_out)
+    if method != "lttb":
+        raise ValueError(f"Unknown downsampling method: {method!r} (expected lttb or minmax)")
+    return lttb_indices(x, y, n_out)
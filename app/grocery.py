@@ -0,0 +1,131 @@
+"""Grocery list helpers: parse LLM grocery strings, merge duplicates and total quantities."""
+import re
+
+from app.tracing import traced
+
+
+def sum_quantity_strings(qtys):
+    """
+    Given a list of quantity strings (e.g. ["200ml", "100ml", "50ml"]), return a single total
+    when all use the same unit (e.g. "350ml"). Otherwise return "qty1 + qty2 + ...".
+    """
+    if not qtys:
+        return "—"
+    parsed = []
+    for q in qtys:
+        q = str(q).strip()
+        if not q:
+            continue
+        # Match optional number (int or decimal) at start, rest is unit
+        m = re.match(r"^\s*([\d.]+)\s*(.*)$", q)
+        if m:
+            try:
+                num = float(m.group(1))
+                unit = (m.group(2) or "").strip()
+                parsed.append((num, unit))
+            except ValueError:
+                parsed.append((1, q))
+        else:
+            parsed.append((1, q))
+    if not parsed:
+        return "—"
+    units = [p[1].lower() for p in parsed]
+    if all(u == units[0] for u in units):
+        total_num = sum(p[0] for p in parsed)
+        unit = parsed[0][1]
+        if unit:
+            return f"{total_num:g} {unit}".strip()
+        return f"{total_num:g}"
+    return " + ".join(qtys)
+
+
+# Pantry items typically bought in larger packs and reused across weeks (for fallback when LLM doesn't set reusable)
+_PANTRY_KEYWORDS = (
+    "oil", "bread", "paste", "atta", "flour", "rice", "dal", "lentil", "masala", "powder",
+    "spice", "asafoetida", "besan", "chana", "cumin", "turmeric", "coriander", "pepper",
+    "cloves", "cardamom", "cinnamon", "mustard", "fenugreek", "biryani", "garam", "chilli",
+    "ginger", "garlic", "sugar", "salt", "vinegar", "sauce", "jam", "honey", "ghee",
+)
+
+
+def infer_reusable(display_name):
+    """Treat as reusable if item name suggests pantry/staple (for old plans or when LLM omits flag)."""
+    lower = display_name.lower()
+    return any(kw in lower for kw in _PANTRY_KEYWORDS)
+
+
+@traced("grocery.parse_and_merge")
+def parse_and_merge_grocery_items(grocery_strings):
+    """
+    Parse grocery strings: "Item name | quantity | approx_cost_rupees | reusable" or 2/3 part variants.
+    Merge by item name (case-insensitive): collect quantities, sum costs; item is reusable if any entry says so.
+    Returns list of (display_name, total_quantity_str, total_cost, is_reusable).
+    """
+    merged = {}  # key -> (display_name, [quantities], total_cost, is_reusable)
+    for s in grocery_strings:
+        s = str(s).strip()
+        if not s:
+            continue
+        if "|" in s:
+            parts = [p.strip() for p in s.split("|", 3)]  # up to 4 parts
+            name = parts[0] if parts else s
+            if len(parts) >= 4:
+                qty = parts[1]
+                cost_str = parts[2]
+                reusable_str = (parts[3] or "").lower()
+                is_reusable = reusable_str in ("yes", "true", "1", "y")
+            elif len(parts) == 3:
+                qty = parts[1]
+                cost_str = parts[2]
+                is_reusable = False
+            elif len(parts) == 2:
+                qty = ""
+                cost_str = parts[1]
+                is_reusable = False
+            else:
+                qty, cost_str, is_reusable = "", "", False
+            try:
+                cost = int(re.sub(r"[^\d]", "", cost_str)) if cost_str else 0
+            except (ValueError, TypeError):
+                cost = 0
+        else:
+            name, qty, cost, is_reusable = s, "", 0, False
+        if not name:
+            continue
+        key = name.lower().strip()
+        if key not in merged:
+            merged[key] = (name, [], 0, False)
+        disp, qtys, total, any_reusable = merged[key]
+        if qty:
+            qtys.append(qty)
+        merged[key] = (disp, qtys, total + cost, any_reusable or is_reusable)
+    out = []
+    for (disp, qtys, total, is_reusable) in merged.values():
+        total_qty = sum_quantity_strings(qtys)
+        # Fallback: infer reusable from name if LLM didn't set it (e.g. old plans)
+        if not is_reusable and infer_reusable(disp):
+            is_reusable = True
+        out.append((disp, total_qty, total, is_reusable))
+    out.sort(key=lambda x: x[0].lower())
+    return out
+
+
+def parse_ingredients_to_list(ingredients_text):
+    """Split recipe ingredients (comma/newline/and-separated) into a sorted, deduplicated list."""
+    if not ingredients_text or not str(ingredients_text).strip():
+        return []
+    text = str(ingredients_text).strip()
+    # Split on newlines, commas, and " and " (keep tokens)
+    parts = re.split(r"[\n,]+|\s+and\s+", text, flags=re.IGNORECASE)
+    seen = set()
+    out = []
+    for p in parts:
+        p = p.strip()
+        if not p or len(p) < 2:
+            continue
+        key = p.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(p)
+    return sorted(out, key=lambda x: x.lower())
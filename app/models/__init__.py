@@ -2,4 +2,10 @@ from .user import*
 from .meal_plan import*
 from .workout_plan import*
 from .recipes import*
-from .progress_log import*
\ No newline at end of file
+from .progress_log import*
+from .pantry_item import*
+from .grocery_acceptance import*
+from .tdee_estimate import*
+from .generation_job import*
+from .llm_usage import*
+from .bootstrap_marker import*
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class BootstrapMarker(Base):
+    """Readiness marker: one row per completed startup step (see app/bootstrap.py)."""
+    __tablename__ = "bootstrap_markers"
+
+    name = Column(String(40), primary_key=True)
+    version = Column(Integer, nullable=False)
+    completed_at = Column(DateTime, default=datetime.utcnow)
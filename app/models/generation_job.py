@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from app.database import Base
+
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+    # An Idempotency-Key is scoped to one user and job kind
+    __table_args__ = (Index("uq_generation_jobs_idempotency", "user_id", "kind", "idempotency_key", unique=True),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True)
+    kind = Column(String(20))  # "meal" or "workout"
+    status = Column(String(20), default="queued", index=True)  # queued, running, succeeded, failed
+    progress = Column(Integer, default=0)  # 0-100
+    idempotency_key = Column(String(100), index=True, nullable=True)
+    flight_key = Column(String(100), index=True, nullable=True)  # kind:user_id:profile_version
+    result_plan_id = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
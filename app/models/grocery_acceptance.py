@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, DateTime, Index
+from datetime import datetime
+from app.database import Base
+
+
+class GroceryAcceptance(Base):
+    """A meal plan's grocery list the user marked as bought; one row per (user, plan) so it is applied once."""
+    __tablename__ = "grocery_acceptances"
+    __table_args__ = (Index("uq_grocery_acceptances_user_plan", "user_id", "meal_plan_id", unique=True),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)
+    meal_plan_id = Column(Integer, nullable=False)
+    accepted_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean
+from datetime import datetime
+from app.database import Base
+
+
+class LlmUsage(Base):
+    __tablename__ = "llm_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    user_id = Column(Integer, index=True, nullable=True)
+    kind = Column(String(20), nullable=True)  # "meal", "workout" or None for untracked calls
+    model = Column(String(60))
+    backend = Column(String(40))  # GeminiBackend, RecordReplayBackend, SyntheticBackend
+    prompt_chars = Column(Integer)
+    prompt_tokens = Column(Integer)  # from the API's usage metadata, else estimated (chars / 4)
+    output_chars = Column(Integer)
+    output_tokens = Column(Integer)
+    latency_ms = Column(Float)
+    outcome = Column(String(20), index=True)  # ok, empty, parse_failed, rate_limited, error
+    error = Column(Text, nullable=True)
+    billable = Column(Boolean, default=False)  # a real API call (not replayed / synthetic)
+    cost_usd = Column(Float, default=0.0)
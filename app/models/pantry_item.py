@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class PantryItem(Base):
+    __tablename__ = "pantry_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True)
+    item_key = Column(String)  # lower-cased item name, used for matching grocery entries
+    name = Column(String)
+    quantity = Column(Float, default=0)  # in base unit (g, ml or pieces)
+    unit = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
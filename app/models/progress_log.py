@@ -1,12 +1,14 @@
-from sqlalchemy import Column, Integer, Float, Date, DateTime 
+from sqlalchemy import Column, Integer, Float, Date, DateTime, Index 
 from datetime import datetime 
 from app.database import Base 
 
 class ProgressLog(Base): 
     __tablename__ = "progress_logs" 
+    __table_args__ = (Index("ix_progress_logs_user_date", "user_id", "logged_at"),)
 
     id = Column(Integer, primary_key=True, index=True) 
     user_id = Column(Integer) 
     weight_kg = Column(Float) 
+    trend_kg = Column(Float, nullable=True)  # exponentially smoothed weight up to and including this log
     logged_at = Column(Date) 
     created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
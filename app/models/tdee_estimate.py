@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class TdeeEstimate(Base):
+    __tablename__ = "tdee_estimates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, unique=True, index=True)
+    tdee = Column(Float)  # current adaptive estimate, kcal/day
+    variance = Column(Float)  # uncertainty of the estimate, (kcal/day)^2
+    trend_weight_kg = Column(Float)  # exponentially smoothed weight at last_logged_at
+    last_logged_at = Column(Date)
+    num_updates = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,83 @@
+"""PDF export for meal plans and grocery lists (ReportLab, imported on first export)."""
+from io import BytesIO
+
+from app.ai_engine.meal_plan_generator import SLOT_ORDER
+from app.tracing import traced
+
+
+def _pdf_escape(s):
+    """Escape for ReportLab Paragraph (XML-like)."""
+    if not s:
+        return ""
+    return str(s).replace("&", "&amp;").replace("<", "&lt;")
+
+
+@traced("pdf.meal_plan")
+def build_meal_plan_pdf(plan_obj):
+    """Return PDF bytes for the 7-day meal plan."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    buffer = BytesIO()
+    styles = getSampleStyleSheet()
+    style_title = ParagraphStyle(name="CustomTitle", parent=styles["Heading1"], fontSize=16, spaceAfter=12)
+    style_heading = ParagraphStyle(name="CustomHeading", parent=styles["Heading2"], fontSize=12, spaceAfter=6)
+    style_body = ParagraphStyle(name="CustomBody", parent=styles["Normal"], fontSize=9, spaceAfter=4)
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=0.75 * inch, rightMargin=0.75 * inch, topMargin=0.75 * inch, bottomMargin=0.75 * inch)
+    story = []
+    cost = plan_obj.get("total_weekly_cost", 0)
+    story.append(Paragraph(_pdf_escape("7-Day Meal Plan"), style_title))
+    story.append(Paragraph(_pdf_escape(f"Weekly cost: Rs. {cost:.0f}"), style_body))
+    story.append(Spacer(1, 12))
+    for d in plan_obj.get("days", []):
+        day_num = d.get("day", 0)
+        date_str = d.get("date", "")
+        story.append(Paragraph(_pdf_escape(f"Day {day_num} — {date_str}"), style_heading))
+        meals_by_slot = {m.get("slot"): m for m in d.get("meals", [])}
+        for _slot_key, label in SLOT_ORDER:
+            m = meals_by_slot.get(_slot_key)
+            if m:
+                name = m.get("name") or m.get("recipe_name") or "Meal"
+                cal = m.get("calories") or 0
+                recipe = (m.get("recipe_detail") or m.get("description") or "").strip()
+                story.append(Paragraph(_pdf_escape(f"{label}: {name} — {cal} kcal"), style_body))
+                if recipe:
+                    for line in recipe.split("\n")[:15]:
+                        if line.strip():
+                            story.append(Paragraph(_pdf_escape(line.strip()), style_body))
+            else:
+                story.append(Paragraph(_pdf_escape(f"{label}: —"), style_body))
+        story.append(Spacer(1, 8))
+    doc.build(story)
+    return buffer.getvalue()
+
+
+@traced("pdf.grocery")
+def build_grocery_pdf(grocery_tuples, total_cost):
+    """Return PDF bytes for the grocery list."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    buffer = BytesIO()
+    styles = getSampleStyleSheet()
+    style_title = ParagraphStyle(name="GroceryTitle", parent=styles["Heading1"], fontSize=16, spaceAfter=12)
+    style_body = ParagraphStyle(name="GroceryBody", parent=styles["Normal"], fontSize=10, spaceAfter=4)
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=0.75 * inch, rightMargin=0.75 * inch, topMargin=0.75 * inch, bottomMargin=0.75 * inch)
+    story = []
+    story.append(Paragraph(_pdf_escape("Grocery List (Whole Week)"), style_title))
+    story.append(Paragraph(_pdf_escape("Items marked with [R] can be reused for future weeks."), style_body))
+    story.append(Spacer(1, 8))
+    for display_name, total_qty, approx_cost, is_reusable in grocery_tuples:
+        prefix = "[R] " if is_reusable else ""
+        qty_show = total_qty if (total_qty and total_qty != "—") else "—"
+        cost_str = f"Rs. {approx_cost:.0f}" if approx_cost else "—"
+        story.append(Paragraph(_pdf_escape(f"• {prefix}{display_name} — {qty_show} — {cost_str}"), style_body))
+    if total_cost > 0:
+        story.append(Spacer(1, 8))
+        story.append(Paragraph(_pdf_escape(f"Total approx grocery cost: Rs. {total_cost:.0f}"), style_body))
+    doc.build(story)
+    return buffer.getvalue()
@@ -0,0 +1,162 @@
+"""SQL query counter for development: statements per rerun/request, grouped by normalized SQL.
+
+install(engine) hooks the engine once (app/database.py does this). Statements are only collected inside
+capture_queries() / start_capture(), so outside development runs the hook costs one context-variable lookup.
+query_budget() fails a flow that runs more statements than allowed (use it in benchmarks and tests).
+"""
+import contextvars
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+_active = contextvars.ContextVar("query_logs", default=())
+_global_logs = ()  # captures that see statements from every thread (e.g. an AppTest script thread)
+_global_lock = threading.Lock()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A flow ran more SQL statements than its budget allows."""
+
+
+def normalize_sql(statement):
+    """Collapse whitespace and replace literals, bind parameters and IN lists with ? so variants group together."""
+    sql = _STRING.sub("?", statement)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _freeze(parameters):
+    try:
+        if isinstance(parameters, dict):
+            return tuple(sorted((k, repr(v)) for k, v in parameters.items()))
+        return tuple(repr(p) for p in parameters or ())
+    except TypeError:
+        return (repr(parameters),)
+
+
+class QueryLog:
+    """Statements executed while this log was active."""
+
+    def __init__(self, name=None):
+        self.name = name
+        self.queries = []  # (normalized, statement, frozen params, seconds)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_seconds(self):
+        return sum(q[3] for q in self.queries)
+
+    def by_statement(self):
+        """[(normalized_sql, count, total_seconds)] most frequent first."""
+        counts, seconds = Counter(), Counter()
+        for normalized, _stmt, _params, elapsed in self.queries:
+            counts[normalized] += 1
+            seconds[normalized] += elapsed
+        return [(sql, n, seconds[sql]) for sql, n in counts.most_common()]
+
+    def duplicates(self):
+        """Identical statements (same SQL and parameters) executed more than once: [(sql, params, count)]."""
+        counts = Counter((q[0], q[2]) for q in self.queries)
+        return [(sql, params, n) for (sql, params), n in counts.most_common() if n > 1]
+
+    def n_plus_one(self, threshold=5):
+        """Statements repeated at least `threshold` times with different parameters (one query per row)."""
+        variants = {}
+        for normalized, _stmt, params, _elapsed in self.queries:
+            variants.setdefault(normalized, set()).add(params)
+        return [(sql, n) for sql, n, _s in self.by_statement() if n >= threshold and len(variants[sql]) > 1]
+
+    def report(self, limit=10):
+        lines = [f"{self.count} SQL statements ({self.total_seconds * 1e3:.1f} ms)" + (f" in {self.name}" if self.name else "")]
+        for sql, n, seconds in self.by_statement()[:limit]:
+            lines.append(f"  {n:>4} × {seconds * 1e3:7.1f} ms  {sql[:160]}")
+        for sql, params, n in self.duplicates()[:limit]:
+            lines.append(f"  repeated {n}× with the same parameters: {sql[:120]} {params}")
+        for sql, n in self.n_plus_one():
+            lines.append(f"  possible N+1 ({n} similar statements): {sql[:120]}")
+        return "\n".join(lines)
+
+
+def start_capture(name=None, all_threads=False):
+    """
+    Start collecting statements in this context (or, with all_threads, in the whole process);
+    returns the QueryLog. Pair with stop_capture().
+    """
+    global _global_logs
+    log = QueryLog(name)
+    if all_threads:
+        with _global_lock:
+            _global_logs = _global_logs + (log,)
+    else:
+        _active.set(_active.get() + (log,))
+    return log
+
+
+def stop_capture(log):
+    global _global_logs
+    with _global_lock:
+        _global_logs = tuple(other for other in _global_logs if other is not log)
+    _active.set(tuple(other for other in _active.get() if other is not log))
+    return log
+
+
+def clear_captures():
+    """Drop captures left open in this context (e.g. a Streamlit rerun cut short by st.stop)."""
+    _active.set(())
+
+
+@contextmanager
+def capture_queries(name=None, all_threads=False):
+    """Collect the statements run inside the block (nested captures each see them)."""
+    log = start_capture(name, all_threads)
+    try:
+        yield log
+    finally:
+        stop_capture(log)
+
+
+@contextmanager
+def query_budget(max_queries, name=None, allow_duplicates=True):
+    """
+    Raise QueryBudgetExceeded if the block runs more than max_queries statements
+    (or any identical statement twice when allow_duplicates is False).
+    """
+    with capture_queries(name) as log:
+        yield log
+    if log.count > max_queries:
+        raise QueryBudgetExceeded(f"Query budget {max_queries} exceeded: {log.report()}")
+    if not allow_duplicates and log.duplicates():
+        raise QueryBudgetExceeded(f"Duplicate statements: {log.report()}")
+
+
+def install(engine):
+    """Hook the engine so active captures see every statement."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _active.get() or _global_logs:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        logs = _active.get() + _global_logs
+        if not logs:
+            return
+        elapsed = time.perf_counter() - getattr(context, "_query_started", time.perf_counter())
+        entry = (normalize_sql(statement), statement, _freeze(parameters), elapsed)
+        for log in logs:
+            log.queries.append(entry)
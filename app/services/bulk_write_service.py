@@ -0,0 +1,188 @@
+"""Batched writes: many plans in one INSERT, and a buffer that coalesces writes from concurrent requests.
+
+create_plans_bulk is the plan counterpart of progress_service.log_weights_bulk. WriteBuffer collects weight logs
+and plans submitted by many threads (API requests) for a short window and writes each window in one transaction
+through those two functions. WRITE_BUFFER_MS > 0 enables the process-wide buffer (get_write_buffer); the API's
+weight-log endpoint then goes through it.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models.meal_plan import MealPlan
+from app.models.workout_plan import WorkoutPlan
+from app.services.progress_service import log_weights_bulk
+from app.tracing import traced
+
+_MODELS = {"meal": MealPlan, "workout": WorkoutPlan}
+
+
+@traced()
+def create_plans_bulk(session, kind, plans, commit=True):
+    """
+    Save many plans of one kind ("meal" or "workout") with one multi-row INSERT ... RETURNING. Each plan is a
+    dict with user_id and plan_json (dict or JSON string; malformed text raises ValueError before anything is
+    written), plus calorie_target and weekly_cost for meal plans.
+    Rows get created_at one microsecond apart, in the order given, so "latest plan" stays well defined.
+    Returns the new ids in the order given.
+    """
+    model = _MODELS[kind]
+    plans = list(plans)
+    if not plans:
+        return []
+    now = datetime.utcnow()
+    rows = []
+    for i, plan in enumerate(plans):
+        plan_json = plan["plan_json"]
+        if not isinstance(plan_json, dict):
+            json.loads(plan_json)  # reject malformed text up front, as create_meal_plan does
+        row = {
+            "user_id": plan["user_id"],
+            "plan_json": json.dumps(plan_json) if isinstance(plan_json, dict) else plan_json,
+            "created_at": now + timedelta(microseconds=i),
+        }
+        if kind == "meal":
+            row["calorie_target"] = float(plan["calorie_target"])
+            row["weekly_cost"] = float(plan["weekly_cost"])
+        rows.append(row)
+    # RETURNING order is not guaranteed, so ids are matched back through the (unique) created_at
+    inserted = session.execute(insert(model).returning(model.id, model.created_at), rows).all()
+    position = {row["created_at"]: i for i, row in enumerate(rows)}
+    ids = [None] * len(rows)
+    for plan_id, created_at in inserted:
+        ids[position[created_at]] = plan_id
+    if commit:
+        session.commit()
+    return ids
+
+
+class WriteBuffer:
+    """
+    Coalesces writes from many threads into one transaction per window_s (or per max_batch writes). Callers get
+    a Future resolving to the WeightLogRow or plan id. When a batch fails its writes are retried one by one,
+    so a bad write fails only its own Future.
+    """
+
+    def __init__(self, window_s=0.005, max_batch=1000, session_factory=None):
+        if session_factory is None:
+            from app.database import SessionLocal
+
+            session_factory = SessionLocal
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self.batches = self.writes = 0
+        self._session_factory = session_factory
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def log_weight(self, user_id, weight_kg, date):
+        return self._submit(("weight", user_id, (date, weight_kg)))
+
+    def create_plan(self, kind, user_id, plan_json, calorie_target=None, weekly_cost=None):
+        plan = {"user_id": user_id, "plan_json": plan_json}
+        if kind == "meal":
+            plan.update(calorie_target=calorie_target, weekly_cost=weekly_cost)
+        return self._submit(("plan", kind, plan))
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _submit(self, op):
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-buffer", daemon=True)
+                self._thread.start()
+        self._queue.put((op, future))
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window_s
+            closing = False
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if closing:
+                return
+
+    def _write(self, batch):
+        try:
+            results = self._apply([op for op, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            for item in batch:
+                self._write([item])
+            return
+        self.batches += 1
+        self.writes += len(batch)
+        for (_op, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _apply(self, ops):
+        """Write ops in one transaction; returns one result per op."""
+        weights, plans = {}, {}
+        for i, (what, key, value) in enumerate(ops):
+            (weights if what == "weight" else plans).setdefault(key, []).append((i, value))
+        results = [None] * len(ops)
+        session = self._session_factory()
+        try:
+            for user_id, items in weights.items():
+                rows = log_weights_bulk(session, user_id, [v for _, v in items], commit=False)
+                for (i, _), row in zip(items, rows):
+                    results[i] = row
+            for kind, items in plans.items():
+                ids = create_plans_bulk(session, kind, [v for _, v in items], commit=False)
+                for (i, _), plan_id in zip(items, ids):
+                    results[i] = plan_id
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        return results
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_write_buffer():
+    """Process-wide WriteBuffer when WRITE_BUFFER_MS > 0, else None (write directly)."""
+    global _buffer
+    window_ms = float(os.getenv("WRITE_BUFFER_MS") or 0)
+    if window_ms <= 0:
+        return None
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBuffer(window_s=window_ms / 1000)
+        return _buffer
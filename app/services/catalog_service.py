@@ -0,0 +1,91 @@
+"""Catalog reads for plan generation: served from the memory-mapped catalog snapshot, else the database.
+
+Both functions take the same filters as recipe_service.get_recipes_filtered / workout_service.get_workouts_filtered
+and return rows with the same attributes: SnapshotRecords from the snapshot, CatalogRows from the database. Neither
+loads the long text columns up front; they are read only for the rows a prompt actually uses.
+"""
+import numpy as np
+
+from app.catalog_snapshot import get_snapshot
+from app.services.recipe_service import RECIPE_TEXT_COLUMNS, get_recipe_summaries, get_recipe_texts
+from app.services.workout_service import WORKOUT_TEXT_COLUMNS, get_workout_summaries, get_workout_texts
+from app.tracing import traced
+
+# Recipes whose text is fetched together on first access: about what fits in the prompt's recipe context
+RECIPE_TEXT_BATCH = 16
+
+
+class _LazyText:
+    """Long text columns for one result list, fetched in batches starting at the first row read."""
+
+    def __init__(self, session, ids, fetch, columns, batch):
+        self.columns = columns
+        self._session = session
+        self._ids = ids
+        self._position = {row_id: i for i, row_id in enumerate(ids)}
+        self._fetch = fetch
+        self._batch = batch
+        self._values = {}
+
+    def get(self, row_id, column):
+        if row_id not in self._values:
+            start = self._position[row_id]
+            ids = [i for i in self._ids[start:start + self._batch] if i not in self._values]
+            fetched = self._fetch(self._session, ids)
+            for i in ids:
+                self._values[i] = fetched.get(i)
+        values = self._values[row_id]
+        return None if values is None else values[self.columns.index(column)]
+
+
+class CatalogRow:
+    """A summary row from the database; text columns are fetched on first access (with the rows after it)."""
+
+    __slots__ = ("_row", "_text")
+
+    def __init__(self, row, text):
+        self._row = row
+        self._text = text
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._text.columns:
+            return self._text.get(self._row.id, name)
+        return getattr(self._row, name)
+
+    def __repr__(self):
+        return f"<CatalogRow id={self._row.id}>"
+
+
+def _with_lazy_text(session, rows, fetch, columns, batch):
+    text = _LazyText(session, [r.id for r in rows], fetch, columns, batch)
+    return [CatalogRow(r, text) for r in rows]
+
+
+@traced()
+def find_recipes(session, diet_type=None, cuisine=None, max_cost_per_serving=None, meal_type=None):
+    """Recipes matching the filters (None means no filter for that field), in id order."""
+    snapshot = get_snapshot(session)
+    if snapshot is None:
+        rows = get_recipe_summaries(session, diet_type, cuisine, max_cost_per_serving, meal_type)
+        return _with_lazy_text(session, rows, get_recipe_texts, RECIPE_TEXT_COLUMNS, RECIPE_TEXT_BATCH)
+    table = snapshot.recipes
+    mask = table.mask(diet_type=diet_type or None, cuisine=cuisine or None, meal_type=meal_type or None)
+    if max_cost_per_serving is not None:
+        # NaN (NULL cost) compares False, as NULL <= x does in SQL
+        with np.errstate(invalid="ignore"):
+            mask &= table.column("cost_per_serving") <= max_cost_per_serving
+    return table.records(mask)
+
+
+@traced()
+def find_workouts(session, goal=None, equipment=None, difficulty=None):
+    """Workouts matching the filters (None means no filter), in id order."""
+    snapshot = get_snapshot(session)
+    if snapshot is None:
+        rows = get_workout_summaries(session, goal, equipment, difficulty)
+        # The workout prompt lists every candidate with its instructions: one fetch for the whole list
+        return _with_lazy_text(session, rows, get_workout_texts, WORKOUT_TEXT_COLUMNS, max(1, len(rows)))
+    table = snapshot.workouts
+    return table.records(table.mask(goal=goal or None, equipment_required=equipment, difficulty=difficulty or None))
@@ -0,0 +1,70 @@
+"""Job runner: execute queued plan-generation jobs on a background thread pool.
+
+The UI and API call enqueue_job() and poll the job row; the LLM call no longer ties up the request
+thread and survives browser disconnects. Standalone workers (scripts/run_job_worker.py) can drain the
+same table from other processes; claim_job makes sure each job runs once.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.database import SessionLocal
+from app.services.job_service import get_job, submit_job, claim_job, set_job_progress, finish_job
+from app.services.single_flight import generate_plan_once
+from app.ai_engine.meal_plan_generator import generate_and_save_meal_plan
+from app.ai_engine.workout_plan_generator import generate_and_save_workout_plan
+from app.tracing import trace
+
+GENERATORS = {
+    "meal": generate_and_save_meal_plan,
+    "workout": generate_and_save_workout_plan,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide worker pool (size from JOB_WORKERS, default 4)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("JOB_WORKERS", "4")),
+                thread_name_prefix="plan-job",
+            )
+        return _executor
+
+
+def execute_claimed_job(session, job):
+    """Run a job this worker has already claimed and record the outcome."""
+    with trace("job.run", job_id=job.id, kind=job.kind):
+        try:
+            set_job_progress(session, job.id, 30)
+            saved = generate_plan_once(session, job.user_id, job.kind, GENERATORS[job.kind])
+            if not saved:
+                finish_job(session, job.id, error="Could not generate plan (no data or invalid AI response).")
+                return
+            plan_id, _plan = saved
+            finish_job(session, job.id, result_plan_id=plan_id)
+        except Exception as e:
+            session.rollback()
+            finish_job(session, job.id, error=str(e) or e.__class__.__name__)
+
+
+def run_job(job_id):
+    """Claim and run one job by id in its own session. Does nothing if another worker got it first."""
+    db = SessionLocal()
+    try:
+        if claim_job(db, job_id):
+            execute_claimed_job(db, get_job(db, job_id))
+    finally:
+        db.close()
+
+
+def enqueue_job(session, user_id, kind, idempotency_key=None):
+    """Submit a job and schedule it on the local pool. Returns the (possibly pre-existing) job."""
+    job = submit_job(session, user_id, kind, idempotency_key)
+    if job.status == "queued":
+        get_executor().submit(run_job, job.id)
+    return job
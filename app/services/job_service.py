@@ -0,0 +1,169 @@
+"""Job service: queue meal/workout plan generation and track its state in the generation_jobs table."""
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from app.models.generation_job import GenerationJob
+from app.services.user_service import get_user_by_id
+from app.services.single_flight import advisory_lock, flight_key, profile_version
+
+JOB_KINDS = ("meal", "workout")
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def get_job(session, job_id):
+    """Return the GenerationJob with this id, or None."""
+    return session.query(GenerationJob).filter(GenerationJob.id == job_id).first()
+
+
+def get_job_by_idempotency_key(session, user_id, kind, idempotency_key):
+    """
+    Return the user's job of this kind created with this idempotency key, or None. Keys are scoped to
+    (user, kind), like the uq_generation_jobs_idempotency index: other users' keys are never looked at.
+    """
+    if not idempotency_key:
+        return None
+    return (
+        session.query(GenerationJob)
+        .filter(
+            GenerationJob.user_id == user_id,
+            GenerationJob.kind == kind,
+            GenerationJob.idempotency_key == idempotency_key,
+        )
+        .first()
+    )
+
+
+def get_latest_job(session, user_id, kind):
+    """Return the user's most recent job of this kind, or None."""
+    return (
+        session.query(GenerationJob)
+        .filter(GenerationJob.user_id == user_id, GenerationJob.kind == kind)
+        .order_by(GenerationJob.created_at.desc(), GenerationJob.id.desc())
+        .first()
+    )
+
+
+def get_active_job_for_flight(session, key):
+    """Return a queued/running job with this single-flight key, or None."""
+    return (
+        session.query(GenerationJob)
+        .filter(GenerationJob.flight_key == key, GenerationJob.status.in_(ACTIVE_STATUSES))
+        .order_by(GenerationJob.id.asc())
+        .first()
+    )
+
+
+def submit_job(session, user_id, kind, idempotency_key=None):
+    """
+    Queue a generation job and return it. Submitting again with the same idempotency_key returns
+    the original job instead of creating another one (safe to retry after a dropped connection); keys are
+    per user and kind, so the same key for another user or kind is a separate request.
+    While a job for the same user, kind and profile version is still queued or running, that job
+    is returned too (double clicks and second tabs share one generation).
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind!r}")
+    existing = get_job_by_idempotency_key(session, user_id, kind, idempotency_key)
+    if existing:
+        return existing
+    user = get_user_by_id(session, user_id)
+    key = flight_key(user_id, kind, profile_version(user)) if user else None
+    with advisory_lock(session, f"submit:{key}"):
+        active = get_active_job_for_flight(session, key) if key else None
+        if active:
+            return active
+        job = GenerationJob(
+            user_id=user_id,
+            kind=kind,
+            status="queued",
+            progress=0,
+            idempotency_key=idempotency_key,
+            flight_key=key,
+        )
+        session.add(job)
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another request inserted the same key between our lookup and commit
+            session.rollback()
+            return get_job_by_idempotency_key(session, user_id, kind, idempotency_key)
+    session.refresh(job)
+    return job
+
+
+def claim_job(session, job_id):
+    """Atomically move a queued job to running. Returns True if this caller owns the job now."""
+    claimed = (
+        session.query(GenerationJob)
+        .filter(GenerationJob.id == job_id, GenerationJob.status == "queued")
+        .update({"status": "running", "progress": 10, "started_at": datetime.utcnow()}, synchronize_session=False)
+    )
+    session.commit()
+    return claimed == 1
+
+
+def claim_next_job(session):
+    """Claim the oldest queued job (any worker process may call this). Returns the job or None."""
+    while True:
+        row = (
+            session.query(GenerationJob.id)
+            .filter(GenerationJob.status == "queued")
+            .order_by(GenerationJob.created_at.asc(), GenerationJob.id.asc())
+            .first()
+        )
+        if row is None:
+            return None
+        if claim_job(session, row[0]):
+            return get_job(session, row[0])
+        # Lost the race to another worker; try the next one
+
+
+def set_job_progress(session, job_id, progress):
+    """Record progress (0-100) for a running job."""
+    session.query(GenerationJob).filter(GenerationJob.id == job_id).update(
+        {"progress": int(progress)}, synchronize_session=False
+    )
+    session.commit()
+
+
+def finish_job(session, job_id, result_plan_id=None, error=None):
+    """Mark a job succeeded (with the saved plan id) or failed (with an error message)."""
+    session.query(GenerationJob).filter(GenerationJob.id == job_id).update(
+        {
+            "status": "failed" if error else "succeeded",
+            "progress": 100,
+            "result_plan_id": result_plan_id,
+            "error": error,
+            "finished_at": datetime.utcnow(),
+        },
+        synchronize_session=False,
+    )
+    session.commit()
+
+
+def requeue_stale_jobs(session, older_than_minutes=10):
+    """Put jobs stuck in running (e.g. worker crashed) back in the queue. Returns how many were requeued."""
+    cutoff = datetime.utcnow() - timedelta(minutes=older_than_minutes)
+    count = (
+        session.query(GenerationJob)
+        .filter(GenerationJob.status == "running", GenerationJob.started_at < cutoff)
+        .update({"status": "queued", "progress": 0, "started_at": None}, synchronize_session=False)
+    )
+    session.commit()
+    return count
+
+
+def job_to_dict(job):
+    """Plain-data view of a job for the UI and API."""
+    return {
+        "id": job.id,
+        "user_id": job.user_id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "result_plan_id": job.result_plan_id,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
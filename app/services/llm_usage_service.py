@@ -0,0 +1,89 @@
+"""LLM usage service: aggregate the llm_usage ledger (cost per user, latency percentiles, failure rates)."""
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import case, func
+
+from app.models.llm_usage import LlmUsage
+
+
+def _since_filter(query, since):
+    return query.filter(LlmUsage.created_at >= since) if since is not None else query
+
+
+def days_ago(days):
+    """Start of a reporting window `days` days back."""
+    return datetime.utcnow() - timedelta(days=days)
+
+
+def usage_totals(session, since=None):
+    """Calls, outcomes, tokens and cost over the window."""
+    row = _since_filter(session.query(
+        func.count(LlmUsage.id),
+        func.sum(case((LlmUsage.outcome == "ok", 1), else_=0)),
+        func.sum(case((LlmUsage.outcome == "parse_failed", 1), else_=0)),
+        func.sum(case((LlmUsage.outcome == "rate_limited", 1), else_=0)),
+        func.sum(case((LlmUsage.outcome == "error", 1), else_=0)),
+        func.sum(LlmUsage.prompt_tokens),
+        func.sum(LlmUsage.output_tokens),
+        func.sum(LlmUsage.cost_usd),
+    ), since).one()
+    keys = ("calls", "ok", "parse_failed", "rate_limited", "errors", "prompt_tokens", "output_tokens", "cost_usd")
+    return {k: (v or 0) for k, v in zip(keys, row)}
+
+
+def cost_per_user(session, since=None, limit=20):
+    """Top users by cost: [{user_id, calls, prompt_tokens, output_tokens, cost_usd}], most expensive first."""
+    cost = func.sum(LlmUsage.cost_usd)
+    rows = (
+        _since_filter(session.query(
+            LlmUsage.user_id,
+            func.count(LlmUsage.id),
+            func.sum(LlmUsage.prompt_tokens),
+            func.sum(LlmUsage.output_tokens),
+            cost,
+        ), since)
+        .group_by(LlmUsage.user_id)
+        .order_by(cost.desc(), func.count(LlmUsage.id).desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {"user_id": u, "calls": n, "prompt_tokens": p or 0, "output_tokens": o or 0, "cost_usd": c or 0.0}
+        for u, n, p, o, c in rows
+    ]
+
+
+def latency_percentiles(session, since=None, kind=None, percentiles=(50, 95, 99)):
+    """
+    Latency percentiles (ms) of calls that returned a response, or None when there are none. PostgreSQL
+    computes them in the query (percentile_cont); other databases stream the latencies into NumPy, which
+    interpolates the same way.
+    """
+    query = _since_filter(session.query(LlmUsage.latency_ms), since).filter(
+        LlmUsage.outcome.in_(("ok", "parse_failed", "empty")), LlmUsage.latency_ms.isnot(None)
+    )
+    if kind:
+        query = query.filter(LlmUsage.kind == kind)
+    if session.get_bind().dialect.name == "postgresql":
+        row = query.with_entities(
+            *(func.percentile_cont(p / 100).within_group(LlmUsage.latency_ms) for p in percentiles)
+        ).one()
+        if row[0] is None:
+            return None
+        return {f"p{p}": float(v) for p, v in zip(percentiles, row)}
+    values = np.fromiter((r[0] for r in query), dtype=float)
+    if values.size == 0:
+        return None
+    return {f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))}
+
+
+def parse_failure_rate(session, since=None):
+    """Per plan kind: responses received, how many failed to parse, and the rate."""
+    answered = func.sum(case((LlmUsage.outcome.in_(("ok", "parse_failed")), 1), else_=0))
+    failed = func.sum(case((LlmUsage.outcome == "parse_failed", 1), else_=0))
+    rows = _since_filter(session.query(LlmUsage.kind, answered, failed), since).group_by(LlmUsage.kind).all()
+    return {
+        kind or "other": {"responses": a or 0, "parse_failed": f or 0, "rate": (f or 0) / a if a else 0.0}
+        for kind, a, f in rows
+    }
@@ -1,10 +1,15 @@
 """Meal plan service: create and get meal plans."""
+import hashlib
 import json
 from app.models.meal_plan import MealPlan
+from app.tracing import traced
 
 
+@traced()
 def create_meal_plan(session, user_id, calorie_target, plan_json, weekly_cost):
-    """Save a new meal plan. plan_json can be a dict; it is stored as JSON string."""
+    """Save a new meal plan. plan_json can be a dict; it is stored as JSON string (text must be valid JSON)."""
+    if not isinstance(plan_json, dict):
+        json.loads(plan_json)  # reject malformed text up front: the API embeds stored plan_json verbatim
     plan = MealPlan(
         user_id=user_id,
         calorie_target=float(calorie_target),
@@ -17,6 +22,7 @@ def create_meal_plan(session, user_id, calorie_target, plan_json, weekly_cost):
     return plan
 
 
+@traced()
 def get_latest_meal_plan(session, user_id):
     """Return the most recent meal plan for this user, or None."""
     plan = (
@@ -25,4 +31,28 @@ def get_latest_meal_plan(session, user_id):
         .order_by(MealPlan.created_at.desc())
         .first()
     )
-    return plan
\ No newline at end of file
+    return plan
+
+
+def get_latest_meal_plan_id(session, user_id):
+    """Return the id of the most recent meal plan (without loading plan_json), or None.
+    Plans are never modified after insert, so the id doubles as a cheap version for caching."""
+    row = (
+        session.query(MealPlan.id)
+        .filter(MealPlan.user_id == user_id)
+        .order_by(MealPlan.created_at.desc())
+        .first()
+    )
+    return row[0] if row else None
+
+
+def plan_content_hash(plan_json):
+    """Stable short hash of a stored plan_json string (or dict), used as the plan's content version."""
+    if isinstance(plan_json, dict):
+        plan_json = json.dumps(plan_json)
+    return hashlib.sha1((plan_json or "").encode("utf-8")).hexdigest()[:16]
+
+
+def get_meal_plan_by_id(session, plan_id):
+    """Return the MealPlan with this id, or None."""
+    return session.query(MealPlan).filter(MealPlan.id == plan_id).first()
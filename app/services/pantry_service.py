@@ -0,0 +1,202 @@
+"""Pantry service: track reusable stock per user and subtract it from new grocery lists."""
+import re
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from app.models.grocery_acceptance import GroceryAcceptance
+from app.models.pantry_item import PantryItem
+from app.tracing import traced
+
+# Unit aliases -> (base unit, multiplier to base). Mass is stored in g, volume in ml, counts in pieces.
+_UNITS = {
+    "g": ("g", 1.0), "gm": ("g", 1.0), "gms": ("g", 1.0), "gram": ("g", 1.0), "grams": ("g", 1.0),
+    "kg": ("g", 1000.0), "kgs": ("g", 1000.0), "kilo": ("g", 1000.0), "kilogram": ("g", 1000.0),
+    "mg": ("g", 0.001),
+    "ml": ("ml", 1.0), "l": ("ml", 1000.0), "ltr": ("ml", 1000.0), "litre": ("ml", 1000.0),
+    "litres": ("ml", 1000.0), "liter": ("ml", 1000.0), "liters": ("ml", 1000.0),
+    "tsp": ("ml", 5.0), "tbsp": ("ml", 15.0), "cup": ("ml", 240.0), "cups": ("ml", 240.0),
+    "": ("pieces", 1.0), "piece": ("pieces", 1.0), "pieces": ("pieces", 1.0), "pcs": ("pieces", 1.0),
+    "pc": ("pieces", 1.0), "nos": ("pieces", 1.0), "dozen": ("pieces", 12.0),
+}
+
+# Rough amount of a pantry staple used by one meal that mentions it, per base unit
+PER_MEAL_USE = {"g": 10.0, "ml": 10.0, "pieces": 1.0}
+
+
+def parse_quantity(qty):
+    """
+    Parse a grocery quantity string (e.g. "0.5 kg", "200g", "1 litre", "200g + 100g") into (amount, base_unit).
+    Returns None when the quantity is missing or mixes units that cannot be added.
+    """
+    if not qty or str(qty).strip() in ("", "—"):
+        return None
+    total, base = 0.0, None
+    for part in str(qty).split("+"):
+        m = re.match(r"^\s*([\d.]+)\s*([a-zA-Z]*)", part)
+        if not m:
+            return None
+        try:
+            num = float(m.group(1))
+        except ValueError:
+            return None
+        unit = m.group(2).lower()
+        part_base, mult = _UNITS.get(unit, (unit, 1.0))
+        if base is not None and part_base != base:
+            return None
+        base = part_base
+        total += num * mult
+    return (total, base) if base is not None else None
+
+
+def _format_quantity(amount, unit):
+    """Format a base-unit amount back into a shopper-friendly string."""
+    if unit == "g" and amount >= 1000:
+        return f"{amount / 1000:g} kg"
+    if unit == "ml" and amount >= 1000:
+        return f"{amount / 1000:g} litre"
+    return f"{round(amount, 1):g} {unit}".strip()
+
+
+@traced()
+def get_pantry(session, user_id):
+    """Return {item_key: PantryItem} for items this user currently has in stock."""
+    items = (
+        session.query(PantryItem)
+        .filter(PantryItem.user_id == user_id, PantryItem.quantity > 0)
+        .all()
+    )
+    return {p.item_key: p for p in items}
+
+
+def get_pantry_item_names(session, user_id):
+    """Return sorted display names of stocked pantry items (used to shorten the meal plan prompt)."""
+    return sorted((p.name for p in get_pantry(session, user_id).values()), key=str.lower)
+
+
+def subtract_pantry(grocery_tuples, pantry):
+    """
+    Subtract pantry stock from merged grocery tuples (display_name, total_qty, cost, is_reusable).
+    Items fully covered by stock are dropped; partially covered ones keep the remaining quantity
+    and a proportional cost. pantry is the dict returned by get_pantry.
+    """
+    if not pantry:
+        return list(grocery_tuples)
+    out = []
+    for display_name, total_qty, cost, is_reusable in grocery_tuples:
+        stock = pantry.get(display_name.lower().strip())
+        if stock is None:
+            out.append((display_name, total_qty, cost, is_reusable))
+            continue
+        need = parse_quantity(total_qty)
+        if need is None or need[1] != stock.unit:
+            # Stocked but quantities can't be compared: trust the pantry for reusable items
+            if not is_reusable:
+                out.append((display_name, total_qty, cost, is_reusable))
+            continue
+        remaining = need[0] - (stock.quantity or 0)
+        if remaining <= 0:
+            continue
+        share = remaining / need[0] if need[0] else 1
+        out.append((display_name, _format_quantity(remaining, need[1]), round(cost * share), is_reusable))
+    return out
+
+
+def add_grocery_list_to_pantry(session, user_id, grocery_tuples):
+    """
+    Record an accepted (bought) grocery list: reusable items are added to the user's pantry stock.
+    Returns the number of pantry items updated.
+    """
+    updated = _add_stock(session, user_id, grocery_tuples)
+    session.commit()
+    return updated
+
+
+def _add_stock(session, user_id, grocery_tuples):
+    pantry = {p.item_key: p for p in session.query(PantryItem).filter(PantryItem.user_id == user_id).all()}
+    now = datetime.utcnow()
+    updated = 0
+    for display_name, total_qty, _cost, is_reusable in grocery_tuples:
+        if not is_reusable:
+            continue
+        parsed = parse_quantity(total_qty)
+        if parsed is None:
+            continue
+        amount, unit = parsed
+        key = display_name.lower().strip()
+        item = pantry.get(key)
+        if item is None:
+            item = PantryItem(user_id=user_id, item_key=key, name=display_name, quantity=0, unit=unit)
+            session.add(item)
+            pantry[key] = item
+        elif item.unit != unit:
+            # Unit changed (e.g. pieces -> g): replace stock rather than mixing units
+            item.quantity, item.unit = 0, unit
+        item.quantity = (item.quantity or 0) + amount
+        item.updated_at = now
+        updated += 1
+    return updated
+
+
+def estimate_plan_consumption(plan, item_keys):
+    """
+    Estimate how much of each pantry item the plan uses: one PER_MEAL_USE portion for every meal
+    whose name or recipe_detail mentions the item. Returns {item_key: meal_count}.
+    """
+    counts = dict.fromkeys(item_keys, 0)
+    if not counts:
+        return counts
+    for d in (plan or {}).get("days", []):
+        for m in d.get("meals", []):
+            text = f"{m.get('name') or ''} {m.get('recipe_detail') or ''}".lower()
+            for key in counts:
+                if key in text:
+                    counts[key] += 1
+    return counts
+
+
+def consume_plan_from_pantry(session, user_id, plan):
+    """Decrement pantry stock by the estimated consumption of the plan's recipes. Returns updated pantry."""
+    _consume_stock(session, user_id, plan)
+    session.commit()
+    return get_pantry(session, user_id)
+
+
+def _consume_stock(session, user_id, plan):
+    pantry = get_pantry(session, user_id)
+    usage = estimate_plan_consumption(plan, pantry.keys())
+    now = datetime.utcnow()
+    for key, meals in usage.items():
+        if not meals:
+            continue
+        item = pantry[key]
+        item.quantity = max(0.0, (item.quantity or 0) - meals * PER_MEAL_USE.get(item.unit, 1.0))
+        item.updated_at = now
+
+
+def is_grocery_list_accepted(session, user_id, meal_plan_id):
+    """True if the user already marked this meal plan's groceries as bought."""
+    return session.query(
+        session.query(GroceryAcceptance)
+        .filter(GroceryAcceptance.user_id == user_id, GroceryAcceptance.meal_plan_id == meal_plan_id)
+        .exists()
+    ).scalar()
+
+
+def accept_grocery_list(session, user_id, meal_plan_id, grocery_tuples, plan):
+    """
+    Apply a bought grocery list once per (user, meal plan): add its reusable items to the pantry and
+    consume the plan's estimated usage, in one transaction with the acceptance row. Returns False (and
+    changes nothing) if the plan was already accepted, e.g. from another tab or session.
+    """
+    session.add(GroceryAcceptance(user_id=user_id, meal_plan_id=meal_plan_id))
+    try:
+        session.flush()
+    except IntegrityError:
+        session.rollback()
+        return False
+    _add_stock(session, user_id, grocery_tuples)
+    session.flush()  # new pantry rows must be visible to the consumption estimate
+    _consume_stock(session, user_id, plan)
+    session.commit()
+    return True
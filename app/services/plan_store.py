@@ -0,0 +1,146 @@
+"""Process-wide store of parsed plans, shared read-only by every Streamlit session.
+
+Sessions keep only plan ids (st.session_state["meal_plan_id"] / ["workout_plan_id"]); the parsed plan lives
+here once per process, keyed by (kind, plan id), in an LRU bounded by an estimate of its in-memory size.
+Plans are never modified after insert, so an id always maps to the same content and entries never go stale.
+Plans are frozen (mappings become read-only, lists become tuples) so one session cannot change another's copy.
+
+PLAN_STORE_MAX_MB sets the memory bound (default 64). When a shared cache is configured (CACHE_BACKEND, see
+app.cache), get_plan also looks there before the database, so a plan parsed by one worker is a cache read for
+the others; PLAN_CACHE_TTL_S sets how long it is kept there (default one day).
+"""
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+from app.cache import get_cache
+from app.models.meal_plan import MealPlan
+from app.models.workout_plan import WorkoutPlan
+
+_MODELS = {"meal": MealPlan, "workout": WorkoutPlan}
+_SHARED_NAMESPACE = "plan"
+_SHARED_TTL_S = float(os.getenv("PLAN_CACHE_TTL_S") or 86400)
+
+
+def deep_sizeof(obj):
+    """Approximate bytes held by a parsed JSON value (containers plus their contents)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k) + deep_sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_sizeof(v) for v in obj)
+    return size
+
+
+def freeze(obj):
+    """Read-only copy of a parsed JSON value: dicts become mappingproxies, lists become tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+class PlanStore:
+    """Thread-safe LRU of frozen plans with byte accounting."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()  # key -> (plan, nbytes)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, plan, nbytes):
+        """Store plan (already frozen) and return the shared copy; a concurrent insert of the same key wins."""
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing[0]
+            if nbytes > self.max_bytes:
+                return plan
+            self._entries[key] = (plan, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _key, (_plan, evicted_bytes) = self._entries.popitem(last=False)
+                self.bytes -= evicted_bytes
+                self.evictions += 1
+            return plan
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            }
+
+
+_store = PlanStore(int(float(os.getenv("PLAN_STORE_MAX_MB") or 64) * 1024 * 1024))
+
+
+def get_store():
+    return _store
+
+
+def _store_parsed(kind, plan_id, parsed):
+    return _store.put((kind, plan_id), freeze(parsed), deep_sizeof(parsed))
+
+
+def load_latest_plan(session, kind, user_id):
+    """
+    Id of the user's most recent plan of this kind ("meal" or "workout"), or None; its parsed plan is put
+    in the store (one query: id and plan_json together, parsed only when the store does not have it yet).
+    """
+    model = _MODELS[kind]
+    row = (
+        session.query(model.id, model.plan_json)
+        .filter(model.user_id == user_id)
+        .order_by(model.created_at.desc())
+        .first()
+    )
+    if not row or not row[1]:
+        return None
+    if _store.get((kind, row[0])) is None:
+        parsed = json.loads(row[1])
+        get_cache().set(_SHARED_NAMESPACE, f"{kind}:{row[0]}", parsed, ttl=_SHARED_TTL_S)
+        _store_parsed(kind, row[0], parsed)
+    return row[0]
+
+
+def get_plan(session, kind, plan_id):
+    """Frozen parsed plan for this id (from the store, else the shared cache, else loaded and parsed once), or None."""
+    if plan_id is None:
+        return None
+    plan = _store.get((kind, plan_id))
+    if plan is not None:
+        return plan
+    cache = get_cache()
+    shared_key = f"{kind}:{plan_id}"
+    parsed = cache.get(_SHARED_NAMESPACE, shared_key)
+    if parsed is None:
+        model = _MODELS[kind]
+        row = session.query(model.plan_json).filter(model.id == plan_id).first()
+        if not row or not row[0]:
+            return None
+        parsed = json.loads(row[0])
+        cache.set(_SHARED_NAMESPACE, shared_key, parsed, ttl=_SHARED_TTL_S)
+    return _store_parsed(kind, plan_id, parsed)
@@ -1,32 +1,169 @@
 """Progress service: log weight and get weight history."""
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, update
+
 from app.models.progress_log import ProgressLog
+from app.services.tdee_service import update_tdee_estimate, update_tdee_estimate_bulk
+from app.ai_engine.adaptive_tdee import smooth_weight
+from app.tracing import traced
+
+# A weight log written by log_weights_bulk (same attributes as the ProgressLog columns it covers)
+WeightLogRow = namedtuple("WeightLogRow", "id logged_at weight_kg trend_kg")
+
 
+def _next_trend(prev_log, weight_kg, date):
+    """Smoothed weight for a log on `date`, continuing from prev_log (None for the first log)."""
+    if prev_log is None:
+        return float(weight_kg)
+    prev_trend = prev_log.trend_kg if prev_log.trend_kg is not None else prev_log.weight_kg
+    return smooth_weight(prev_trend, weight_kg, (date - prev_log.logged_at).days)
 
+
+def _recompute_trend_after(session, user_id, seed_log):
+    """Recompute trend_kg for logs that come after seed_log (out-of-order insert); earlier rows are untouched."""
+    later = (
+        session.query(ProgressLog)
+        .filter(ProgressLog.user_id == user_id, ProgressLog.logged_at > seed_log.logged_at)
+        .order_by(ProgressLog.logged_at.asc(), ProgressLog.id.asc())
+        .all()
+    )
+    prev = seed_log
+    for log in later:
+        log.trend_kg = _next_trend(prev, log.weight_kg, log.logged_at)
+        prev = log
+    return len(later)
+
+
+@traced()
 def log_weight(session, user_id, weight_kg, date):
-    """Add a weight log for the user on the given date. date can be date or datetime."""
+    """Add a weight log for the user on the given date. date can be date or datetime.
+    Stores the smoothed trend with the row (O(1) when appending; backfilled dates recompute only
+    the later logs) and updates the user's adaptive TDEE estimate in the same transaction."""
     if hasattr(date, "date"):
         date = date.date()
-    log = ProgressLog(user_id=user_id, weight_kg=float(weight_kg), logged_at=date)
+    prev = (
+        session.query(ProgressLog)
+        .filter(ProgressLog.user_id == user_id, ProgressLog.logged_at <= date)
+        .order_by(ProgressLog.logged_at.desc(), ProgressLog.id.desc())
+        .first()
+    )
+    log = ProgressLog(
+        user_id=user_id,
+        weight_kg=float(weight_kg),
+        trend_kg=_next_trend(prev, weight_kg, date),
+        logged_at=date,
+    )
     session.add(log)
+    session.flush()
+    _recompute_trend_after(session, user_id, log)
+    update_tdee_estimate(session, user_id, weight_kg, date, commit=False)
     session.commit()
     session.refresh(log)
     return log
 
 
+@traced()
+def log_weights_bulk(session, user_id, entries, commit=True):
+    """
+    Add many (date, weight_kg) logs for one user in one transaction. New rows go in with one multi-row
+    INSERT ... RETURNING; trend_kg is computed in a single pass over the new rows and the existing rows
+    after the earliest new date (changed ones are updated in one executemany); the TDEE estimate is folded
+    forward once over the batch. Returns WeightLogRows in the order given.
+    """
+    entries = [(d.date() if hasattr(d, "date") else d, float(w)) for d, w in entries]
+    if not entries:
+        return []
+    order = sorted(range(len(entries)), key=lambda i: entries[i][0])
+    first = entries[order[0]][0]
+    seed = (
+        session.query(ProgressLog.logged_at, ProgressLog.weight_kg, ProgressLog.trend_kg)
+        .filter(ProgressLog.user_id == user_id, ProgressLog.logged_at < first)
+        .order_by(ProgressLog.logged_at.desc(), ProgressLog.id.desc())
+        .first()
+    )
+    existing = (
+        session.query(ProgressLog.id, ProgressLog.logged_at, ProgressLog.weight_kg, ProgressLog.trend_kg)
+        .filter(ProgressLog.user_id == user_id, ProgressLog.logged_at >= first)
+        .order_by(ProgressLog.logged_at.asc(), ProgressLog.id.asc())
+        .all()
+    )
+    # Walk existing and new rows in date order; on the same date existing rows come first, as with log_weight
+    timeline = sorted(
+        [(row.logged_at, 0, k) for k, row in enumerate(existing)] + [(entries[i][0], 1, i) for i in order]
+    )
+    prev_date = seed.logged_at if seed else None
+    prev_trend = (seed.trend_kg if seed.trend_kg is not None else seed.weight_kg) if seed else None
+    new_trends, changed = {}, []
+    for logged_at, is_new, k in timeline:
+        weight = entries[k][1] if is_new else existing[k].weight_kg
+        trend = float(weight) if prev_date is None else smooth_weight(prev_trend, weight, (logged_at - prev_date).days)
+        if is_new:
+            new_trends[k] = trend
+        elif existing[k].trend_kg != trend:
+            changed.append({"id": existing[k].id, "trend_kg": trend})
+        prev_date, prev_trend = logged_at, trend
+    # RETURNING order is not guaranteed across databases (and asking SQLAlchemy to sort it falls back to one
+    # INSERT per row on SQLite), so rows are matched back through created_at, one microsecond apart per row
+    now = datetime.utcnow()
+    created = {now + timedelta(microseconds=n): i for n, i in enumerate(order)}
+    inserted = session.execute(
+        insert(ProgressLog).returning(ProgressLog.id, ProgressLog.created_at),
+        [{"user_id": user_id, "weight_kg": entries[i][1], "trend_kg": new_trends[i], "logged_at": entries[i][0],
+          "created_at": created_at} for created_at, i in created.items()],
+    ).all()
+    if changed:
+        session.execute(update(ProgressLog), changed)
+    update_tdee_estimate_bulk(session, user_id, [(entries[i][0], entries[i][1]) for i in order], commit=False)
+    if commit:
+        session.commit()
+    rows = [None] * len(entries)
+    for log_id, created_at in inserted:
+        i = created[created_at]
+        rows[i] = WeightLogRow(log_id, entries[i][0], entries[i][1], new_trends[i])
+    return rows
+
+
+@traced()
 def get_weight_logs(session, user_id):
     """Return all weight logs for this user, ordered by date (oldest first)."""
     return (
         session.query(ProgressLog)
         .filter(ProgressLog.user_id == user_id)
-        .order_by(ProgressLog.logged_at.asc())
+        .order_by(ProgressLog.logged_at.asc(), ProgressLog.id.asc())
         .all()
     )
 
-def get_latest_weight_log(session, user_id): 
-    """Return the most recent weight log for this user, or None if none.""" 
-    return ( 
-        session.query(ProgressLog) 
-        .filter(ProgressLog.user_id == user_id) 
-        .order_by(ProgressLog.logged_at.desc()) 
-        .first() 
-    )
\ No newline at end of file
+def get_latest_weight_log(session, user_id):
+    """Return the most recent weight log for this user, or None if none."""
+    return (
+        session.query(ProgressLog)
+        .filter(ProgressLog.user_id == user_id)
+        .order_by(ProgressLog.logged_at.desc(), ProgressLog.id.desc())
+        .first()
+    )
+
+
+def get_weight_log_bounds(session, user_id):
+    """(first date, last date, number of logs) for this user in one aggregate query; dates are None without logs."""
+    first, last, count = (
+        session.query(func.min(ProgressLog.logged_at), func.max(ProgressLog.logged_at), func.count(ProgressLog.id))
+        .filter(ProgressLog.user_id == user_id)
+        .one()
+    )
+    return first, last, count
+
+
+@traced()
+def get_weight_series(session, user_id, start=None, end=None):
+    """(logged_at, weight_kg, trend_kg) tuples for logs between start and end (inclusive, None = open),
+    oldest first. Only the charted columns are loaded, not full ProgressLog rows."""
+    query = session.query(ProgressLog.logged_at, ProgressLog.weight_kg, ProgressLog.trend_kg).filter(
+        ProgressLog.user_id == user_id
+    )
+    if start is not None:
+        query = query.filter(ProgressLog.logged_at >= start)
+    if end is not None:
+        query = query.filter(ProgressLog.logged_at <= end)
+    return query.order_by(ProgressLog.logged_at.asc(), ProgressLog.id.asc()).all()
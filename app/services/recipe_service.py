@@ -1,12 +1,35 @@
 """Recipe service: get all or filtered recipes."""
 from app.models.recipes import Recipe
+from app.tracing import traced
 
+# Everything needed to filter recipes and write their prompt line. The long Text columns (ingredients,
+# instructions) are left out and fetched with get_recipe_texts for the recipes actually used.
+RECIPE_SUMMARY_COLUMNS = (
+    Recipe.id, Recipe.name, Recipe.calories_per_serving, Recipe.protein_g, Recipe.carbs_g, Recipe.fat_g,
+    Recipe.diet_type, Recipe.cost_per_serving, Recipe.cuisine, Recipe.meal_type,
+)
+RECIPE_TEXT_COLUMNS = ("ingredients", "instructions")
 
+
+def _apply_filters(query, diet_type, cuisine, max_cost_per_serving, meal_type):
+    if diet_type:
+        query = query.filter(Recipe.diet_type == diet_type)
+    if cuisine:
+        query = query.filter(Recipe.cuisine == cuisine)
+    if max_cost_per_serving is not None:
+        query = query.filter(Recipe.cost_per_serving <= max_cost_per_serving)
+    if meal_type and hasattr(Recipe, "meal_type") and Recipe.meal_type is not None:
+        query = query.filter(Recipe.meal_type == meal_type)
+    return query
+
+
+@traced()
 def get_all_recipes(session):
     """Return all recipes from the database."""
     return session.query(Recipe).all()
 
 
+@traced()
 def get_recipes_filtered(
     session,
     diet_type=None,
@@ -15,13 +38,24 @@ def get_recipes_filtered(
     meal_type=None,
 ):
     """Return recipes that match the given filters. None means no filter for that field."""
-    query = session.query(Recipe)
-    if diet_type:
-        query = query.filter(Recipe.diet_type == diet_type)
-    if cuisine:
-        query = query.filter(Recipe.cuisine == cuisine)
-    if max_cost_per_serving is not None:
-        query = query.filter(Recipe.cost_per_serving <= max_cost_per_serving)
-    if meal_type and hasattr(Recipe, "meal_type") and Recipe.meal_type is not None:
-        query = query.filter(Recipe.meal_type == meal_type)
-    return query.all()
\ No newline at end of file
+    return _apply_filters(session.query(Recipe), diet_type, cuisine, max_cost_per_serving, meal_type).all()
+
+
+@traced()
+def get_recipe_summaries(session, diet_type=None, cuisine=None, max_cost_per_serving=None, meal_type=None):
+    """Same filters as get_recipes_filtered, but rows (named tuples) of RECIPE_SUMMARY_COLUMNS in id order."""
+    query = session.query(*RECIPE_SUMMARY_COLUMNS)
+    return _apply_filters(query, diet_type, cuisine, max_cost_per_serving, meal_type).order_by(Recipe.id).all()
+
+
+@traced()
+def get_recipe_texts(session, recipe_ids):
+    """{recipe id: (ingredients, instructions)} for these recipes (one query)."""
+    if not recipe_ids:
+        return {}
+    rows = (
+        session.query(Recipe.id, Recipe.ingredients, Recipe.instructions)
+        .filter(Recipe.id.in_(list(recipe_ids)))
+        .all()
+    )
+    return {r[0]: (r[1], r[2]) for r in rows}
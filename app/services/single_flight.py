@@ -0,0 +1,150 @@
+"""Single-flight plan generation: concurrent identical requests share one LLM call.
+
+Requests are keyed by (user_id, plan kind, profile version). Within a process, followers wait for the
+leader's result. Across processes, a Postgres advisory lock (held until the leader's transaction commits the
+plan) serializes the key; whoever waited on the lock reuses the plan saved while it waited instead of
+generating (and inserting) a second one.
+"""
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.models.meal_plan import MealPlan
+from app.models.workout_plan import WorkoutPlan
+from app.services.user_service import get_user_by_id
+
+# User fields that change what a generated plan looks like
+_PROFILE_FIELDS = (
+    "age", "gender", "height_cm", "weight_kg", "goal", "dietary_preference",
+    "cuisine", "budget", "equipment", "workout_minutes_per_day",
+)
+
+
+def profile_version(user):
+    """Short hash of the profile fields used for plan generation; changes when preferences change."""
+    data = {f: getattr(user, f, None) for f in _PROFILE_FIELDS}
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def flight_key(user_id, kind, version):
+    return f"{kind}:{user_id}:{version}"
+
+
+def _lock_id(key):
+    """Signed 64-bit id for pg_advisory_xact_lock."""
+    return int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], "big", signed=True)
+
+
+_local_locks = {}  # key -> [Lock, holders]; entries are removed when no thread holds or waits on them
+_local_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _local_lock(key):
+    """Per-key lock within this process (so unrelated keys never block each other)."""
+    with _local_locks_guard:
+        entry = _local_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _local_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _local_locks[key]
+
+
+@contextmanager
+def advisory_lock(session, key):
+    """
+    Hold a lock for key across threads and, on Postgres, across processes. The Postgres lock is a
+    transaction-level advisory lock taken on the session's own connection (no second pooled connection), so
+    it lasts until the session's transaction ends: the commit that saves the result, or a rollback. On other
+    databases (e.g. SQLite in development) only the in-process lock applies.
+    """
+    with _local_lock(key):
+        if session.get_bind().dialect.name == "postgresql":
+            session.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _lock_id(key)})
+        yield
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """In-process coalescing: the first caller for a key runs fn; concurrent callers get its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Return (result, shared). shared is True when this caller reused another caller's run."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+_flights = SingleFlight()
+
+
+def _plan_saved_since(session, user_id, kind, since):
+    """(plan_id, parsed plan) of this kind saved at or after `since` (by another process), or None."""
+    model = MealPlan if kind == "meal" else WorkoutPlan
+    plan = (
+        session.query(model)
+        .filter(model.user_id == user_id, model.created_at >= since)
+        .order_by(model.created_at.desc(), model.id.desc())
+        .first()
+    )
+    return (plan.id, json.loads(plan.plan_json)) if plan and plan.plan_json else None
+
+
+def generate_plan_once(session, user_id, kind, generate):
+    """
+    Run generate(session, user_id) at most once at a time per (user, kind, profile version).
+    Returns (plan_id, plan dict) of the saved plan (shared with concurrent identical requests), or None
+    if the user is missing or generation failed.
+    """
+    user = get_user_by_id(session, user_id)
+    if not user:
+        return None
+    key = flight_key(user_id, kind, profile_version(user))
+    requested_at = datetime.utcnow()
+
+    def run():
+        with advisory_lock(session, key):
+            # Another process may have finished the same generation while we waited for the lock
+            existing = _plan_saved_since(session, user_id, kind, requested_at)
+            if existing is not None:
+                return existing
+            return generate(session, user_id)
+
+    saved, _shared = _flights.do(key, run)
+    return saved
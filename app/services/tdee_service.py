@@ -0,0 +1,80 @@
+"""Adaptive TDEE service: keep one estimator row per user, updated on every weight log."""
+from datetime import datetime
+
+from app.models.meal_plan import MealPlan
+from app.models.tdee_estimate import TdeeEstimate
+from app.services.user_service import get_user_by_id
+from app.ai_engine.adaptive_tdee import update_estimate
+from app.ai_engine.calorie_engine import get_all_metrics
+from app.tracing import traced
+
+# Number of weight-change observations before the adaptive value replaces the formula TDEE
+MIN_UPDATES = 2
+
+
+def get_tdee_estimate(session, user_id):
+    """Return the TdeeEstimate row for this user, or None if no weight has been logged yet."""
+    return session.query(TdeeEstimate).filter(TdeeEstimate.user_id == user_id).first()
+
+
+@traced()
+def get_adaptive_tdee(session, user_id):
+    """Return the current adaptive TDEE (kcal/day) once it has enough observations, else None."""
+    estimate = get_tdee_estimate(session, user_id)
+    if estimate is None or (estimate.num_updates or 0) < MIN_UPDATES:
+        return None
+    return round(estimate.tdee, 0)
+
+
+def _latest_plan_intake(session, user_id):
+    """Calorie target of the latest meal plan (what the user is eating), or None."""
+    row = (
+        session.query(MealPlan.calorie_target)
+        .filter(MealPlan.user_id == user_id)
+        .order_by(MealPlan.created_at.desc())
+        .first()
+    )
+    return row[0] if row and row[0] else None
+
+
+@traced()
+def update_tdee_estimate(session, user_id, weight_kg, logged_at, commit=True):
+    """Fold one weight log into the user's estimator (O(1)). Returns the TdeeEstimate or None if no user."""
+    return update_tdee_estimate_bulk(session, user_id, [(logged_at, weight_kg)], commit=commit)
+
+
+@traced()
+def update_tdee_estimate_bulk(session, user_id, weighings, commit=True):
+    """
+    Fold (logged_at, weight_kg) pairs, oldest first, into the user's estimator with one read and one write of
+    the estimate row (same result as calling update_tdee_estimate for each). Returns the TdeeEstimate or None.
+    """
+    if not weighings:
+        return get_tdee_estimate(session, user_id)
+    user = get_user_by_id(session, user_id)
+    if not user:
+        return None
+    estimate = get_tdee_estimate(session, user_id)
+    state = {}
+    if estimate is not None:
+        state = {
+            "tdee": estimate.tdee,
+            "variance": estimate.variance,
+            "trend_weight_kg": estimate.trend_weight_kg,
+            "last_logged_at": estimate.last_logged_at,
+            "num_updates": estimate.num_updates,
+        }
+    plan_intake = _latest_plan_intake(session, user_id)
+    for logged_at, weight_kg in weighings:
+        metrics = get_all_metrics(user, weight_kg_override=float(weight_kg))
+        intake = plan_intake if plan_intake is not None else metrics["calorie_target"]
+        state = update_estimate(state, weight_kg, logged_at, intake, metrics["tdee"])
+    if estimate is None:
+        estimate = TdeeEstimate(user_id=user_id)
+        session.add(estimate)
+    for key, value in state.items():
+        setattr(estimate, key, value)
+    estimate.updated_at = datetime.utcnow()
+    if commit:
+        session.commit()
+    return estimate
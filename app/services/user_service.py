@@ -3,6 +3,7 @@ import secrets
 import string
 
 from app.models.user import User
+from app.tracing import traced
 
 
 def get_user_by_id(session, user_id):
@@ -10,6 +11,7 @@ def get_user_by_id(session, user_id):
     return session.query(User).filter(User.id == user_id).first()
 
 
+@traced()
 def get_user_by_profile_code(session, profile_code):
     """Return the User with the given profile_code, or None if not found."""
     if not profile_code or not str(profile_code).strip():
@@ -24,16 +26,20 @@ def get_user_by_email(session, email):
     return session.query(User).filter(User.email.ilike(str(email).strip())).first()
 
 
-def _generate_profile_code(session, length=8):
-    """Return a unique uppercase alphanumeric code."""
+def _generate_profile_code(session, length=8, batch=10):
+    """Return a unique uppercase alphanumeric code (checks a batch of candidates per query)."""
     alphabet = string.ascii_uppercase + string.digits
-    for _ in range(50):
-        code = "".join(secrets.choice(alphabet) for _ in range(length))
-        if session.query(User).filter(User.profile_code == code).first() is None:
-            return code
+    for _ in range(5):
+        candidates = ["".join(secrets.choice(alphabet) for _ in range(length)) for _ in range(batch)]
+        taken = {row[0] for row in session.query(User.profile_code).filter(User.profile_code.in_(candidates))}
+        # First free one in draw order: picking by sort order would skew codes toward leading digits
+        free = [c for c in candidates if c not in taken]
+        if free:
+            return free[0]
     raise RuntimeError("Could not generate unique profile_code")
 
 
+@traced()
 def create_user(
     session,
     name,
@@ -0,0 +1,338 @@
+"""Import weight history exported from other apps and wearables (CSV, JSON array or JSON Lines).
+
+The file is read as a stream and written in chunks, so memory stays bounded whatever its size (apart from the
+set of days seen, one entry per calendar day). Days the user has already logged, and repeated days in the file,
+are skipped: the first reading of a day wins. Imported rows are inserted without a trend. Once every chunk is in,
+trend_kg is recomputed in one pass from the earliest imported day, walking the later logs page by page, and
+the adaptive TDEE estimate is updated once. Everything runs in one transaction.
+
+Recognised columns / keys: a date ("date", "logged_at", "timestamp", "dateTime", "time", ISO or m/d/y text or
+epoch seconds / milliseconds) and a weight ("weight_kg", "weight", "value", "body mass", ...). A record's unit
+comes from its "unit" field, else from the weight column's name ("weight_kg", "Weight (lbs)"), else from the
+`unit` argument; weights with no unit anywhere are kg.
+"""
+import codecs
+import csv
+import io
+import json
+import re
+from datetime import datetime, timezone
+from itertools import islice
+
+from sqlalchemy import insert, update
+
+from app.ai_engine.adaptive_tdee import smooth_weight
+from app.models.progress_log import ProgressLog
+from app.services.tdee_service import update_tdee_estimate_bulk
+from app.tracing import traced
+
+KG_PER_LB = 0.45359237
+# Same bounds as the Progress form and the API
+MIN_WEIGHT_KG, MAX_WEIGHT_KG = 30.0, 300.0
+DEFAULT_CHUNK_SIZE = 5000
+
+_DATE_KEYS = ("logged_at", "date", "datetime", "timestamp", "time", "day", "start", "startdate", "measured_at")
+_WEIGHT_KEYS = ("weight_kg", "weight", "weight (kg)", "weight(kg)", "weight_lb", "weight_lbs", "weight (lb)",
+                "weight (lbs)", "weight(lb)", "weight(lbs)", "body mass", "bodymass", "value", "kg", "lb", "lbs")
+_DATE_FORMATS = ("%m/%d/%y", "%m/%d/%Y", "%d.%m.%Y", "%Y/%m/%d")
+# {"weight": [ ... — an export wrapping its records in one array
+_WRAPPED_ARRAY = re.compile(r'\{\s*"[^"]*"\s*:\s*\[')
+
+
+class WeightImportError(ValueError):
+    """The file is not a CSV / JSON weight export this importer understands."""
+
+
+def _norm(key):
+    return str(key).strip().lower().replace("-", "").replace("_", "") if key is not None else ""
+
+
+def _pick(keys, wanted):
+    """The first of `keys` matching a name in `wanted` (compared without case, '_' or '-')."""
+    normalized = {_norm(k): k for k in keys}
+    for name in wanted:
+        if _norm(name) in normalized:
+            return normalized[_norm(name)]
+    return None
+
+
+def _unit_in(text):
+    """"lb" or "kg" when the text names a unit (a unit field value or a column name), else None."""
+    text = _norm(text)
+    if "lb" in text or "pound" in text:
+        return "lb"
+    if "kg" in text or "kilo" in text:
+        return "kg"
+    return None
+
+
+def parse_date(value):
+    """date from ISO text, m/d/y style text or epoch seconds / milliseconds; None if unparseable."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        seconds = value / 1000 if value > 1e11 else value
+        return datetime.fromtimestamp(seconds, tz=timezone.utc).date()
+    text = str(value).strip()
+    if text.isdigit():
+        return parse_date(int(text))
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).date()
+    except ValueError:
+        pass
+    head = text.split()[0]
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(head, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _weight_kg(value, pounds):
+    try:
+        weight = float(str(value).strip().replace(",", ".")) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        return None
+    if pounds:
+        weight *= KG_PER_LB
+    return weight if MIN_WEIGHT_KG <= weight <= MAX_WEIGHT_KG else None
+
+
+def _iter_csv(stream, unit):
+    reader = csv.DictReader(stream)
+    date_key = _pick(reader.fieldnames or (), _DATE_KEYS)
+    weight_key = _pick(reader.fieldnames or (), _WEIGHT_KEYS)
+    if date_key is None or weight_key is None:
+        raise WeightImportError(f"CSV needs a date and a weight column; found {reader.fieldnames}")
+    unit_key = _pick(reader.fieldnames, ("unit", "units"))
+    column_unit = _unit_in(weight_key) or unit
+    for row in reader:
+        row_unit = _unit_in(row.get(unit_key)) if unit_key else None
+        yield parse_date(row.get(date_key)), _weight_kg(row.get(weight_key), (row_unit or column_unit) == "lb")
+
+
+def _record(obj, unit):
+    if not isinstance(obj, dict):
+        return None, None
+    date_key, weight_key = _pick(obj, _DATE_KEYS), _pick(obj, _WEIGHT_KEYS)
+    if date_key is None or weight_key is None:
+        return None, None
+    unit_key = _pick(obj, ("unit", "units"))
+    record_unit = (_unit_in(obj[unit_key]) if unit_key else None) or _unit_in(weight_key) or unit
+    return parse_date(obj[date_key]), _weight_kg(obj[weight_key], record_unit == "lb")
+
+
+def _iter_json_values(stream, read_size=1 << 16):
+    """Top-level values of a JSON array, a JSON Lines file, or an object wrapping one array (e.g.
+    {"weight": [...]}), decoded one at a time from `stream`."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    depth_entered = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = stream.read(read_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    fill()
+    skip(" \t\r\n\ufeff")
+    wrapped = _WRAPPED_ARRAY.match(buf, pos)
+    if wrapped:
+        pos = wrapped.end() - 1
+    if buf[pos:pos + 1] == "[":
+        pos += 1
+        depth_entered = True
+    while True:
+        skip(" \t\r\n," if depth_entered else " \t\r\n")
+        if pos >= len(buf) and eof:
+            return
+        if depth_entered and buf[pos:pos + 1] == "]":
+            return
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # A bare number or literal at the end of the buffer may continue in the next read
+                if end < len(buf) or eof or isinstance(value, (dict, list, str)):
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise WeightImportError("Invalid JSON in weight export") from None
+            fill()
+        pos = end
+        yield value
+
+
+def _iter_json(stream, unit):
+    for value in _iter_json_values(stream):
+        yield _record(value, unit)
+
+
+def iter_weight_records(fileobj, fmt=None, unit=None):
+    """
+    Yield (date, weight_kg) for every record in a CSV / JSON export; either is None for a record that cannot
+    be used (no date, not a number, outside 30-300 kg). fileobj may be text or binary; fmt is "csv", "json" or
+    None to detect from the first character. unit ("kg" / "lb") applies only to weights the file gives no
+    unit for.
+    """
+    if unit not in (None, "kg", "lb"):
+        raise ValueError(f"Unknown unit: {unit!r} (expected kg or lb)")
+    stream = fileobj
+    if not isinstance(fileobj, io.TextIOBase) and "b" in getattr(fileobj, "mode", "b"):
+        stream = codecs.getreader("utf-8-sig")(fileobj)
+    if fmt is None:
+        first = stream.read(1)
+        while first.isspace() or first == "\ufeff":
+            first = stream.read(1)
+        fmt = "json" if first in ("[", "{") else "csv"
+        stream = _Prefixed(first, stream)
+    if fmt == "csv":
+        return _iter_csv(stream, unit)
+    if fmt == "json":
+        return _iter_json(stream, unit)
+    raise ValueError(f"Unknown format: {fmt!r} (expected csv or json)")
+
+
+class _Prefixed(io.TextIOBase):
+    """A text stream with already-read characters put back in front."""
+
+    def __init__(self, prefix, stream):
+        self._prefix = prefix
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        prefix, self._prefix = self._prefix, ""
+        if size is None or size < 0:
+            return prefix + self._stream.read()
+        return prefix + self._stream.read(max(0, size - len(prefix)))
+
+    def readline(self, size=-1):
+        prefix, self._prefix = self._prefix, ""
+        if "\n" in prefix:
+            line, rest = prefix.split("\n", 1)
+            self._prefix = rest
+            return line + "\n"
+        return prefix + self._stream.readline()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+
+def _existing_days(session, user_id, days):
+    """The days among `days` that the user already has a log for (one range query)."""
+    rows = (
+        session.query(ProgressLog.logged_at)
+        .filter(ProgressLog.user_id == user_id, ProgressLog.logged_at.between(min(days), max(days)))
+        .distinct()
+        .all()
+    )
+    return {r[0] for r in rows} & set(days)
+
+
+def _retrend_from(session, user_id, start, page_size):
+    """
+    Recompute trend_kg for every log on or after `start`, continuing from the last log before it, one page of
+    rows at a time. Returns the (logged_at, weight_kg) of rows that had no trend yet (the imported ones), oldest first.
+    """
+    seed = (
+        session.query(ProgressLog.logged_at, ProgressLog.weight_kg, ProgressLog.trend_kg)
+        .filter(ProgressLog.user_id == user_id, ProgressLog.logged_at < start)
+        .order_by(ProgressLog.logged_at.desc(), ProgressLog.id.desc())
+        .first()
+    )
+    prev_date = seed.logged_at if seed else None
+    prev_trend = (seed.trend_kg if seed.trend_kg is not None else seed.weight_kg) if seed else None
+    imported = []
+    after = (start, 0)
+    while True:
+        page = (
+            session.query(ProgressLog.id, ProgressLog.logged_at, ProgressLog.weight_kg, ProgressLog.trend_kg)
+            .filter(
+                ProgressLog.user_id == user_id,
+                (ProgressLog.logged_at > after[0]) | ((ProgressLog.logged_at == after[0]) & (ProgressLog.id > after[1])),
+            )
+            .order_by(ProgressLog.logged_at.asc(), ProgressLog.id.asc())
+            .limit(page_size)
+            .all()
+        )
+        if not page:
+            return imported
+        changed = []
+        for log_id, logged_at, weight_kg, trend_kg in page:
+            trend = float(weight_kg) if prev_date is None else smooth_weight(prev_trend, weight_kg, (logged_at - prev_date).days)
+            if trend_kg is None:
+                imported.append((logged_at, weight_kg))
+            if trend_kg != trend:
+                changed.append({"id": log_id, "trend_kg": trend})
+            prev_date, prev_trend = logged_at, trend
+        if changed:
+            session.execute(update(ProgressLog), changed)
+        after = (page[-1].logged_at, page[-1].id)
+
+
+@traced()
+def import_weight_history(session, user_id, fileobj, fmt=None, unit=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream a weight export into the user's progress logs (see module docstring). Returns counts:
+    {"read", "imported", "duplicates", "invalid", "first", "last"} (first / last: imported date range or None).
+    Raises WeightImportError for an unrecognised file; nothing is written then.
+    """
+    records = iter_weight_records(fileobj, fmt, unit)
+    seen = set()
+    stats = {"read": 0, "imported": 0, "duplicates": 0, "invalid": 0, "first": None, "last": None}
+    try:
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            stats["read"] += len(chunk)
+            fresh = {}
+            for day, weight in chunk:
+                if day is None or weight is None:
+                    stats["invalid"] += 1
+                elif day in seen or day in fresh:
+                    stats["duplicates"] += 1
+                else:
+                    fresh[day] = weight
+            if not fresh:
+                continue
+            existing = _existing_days(session, user_id, list(fresh))
+            stats["duplicates"] += len(existing)
+            rows = [{"user_id": user_id, "weight_kg": w, "trend_kg": None, "logged_at": d}
+                    for d, w in fresh.items() if d not in existing]
+            seen.update(fresh)
+            if rows:
+                session.execute(insert(ProgressLog), rows)
+                stats["imported"] += len(rows)
+                first, last = min(r["logged_at"] for r in rows), max(r["logged_at"] for r in rows)
+                stats["first"] = min(stats["first"] or first, first)
+                stats["last"] = max(stats["last"] or last, last)
+        if stats["imported"]:
+            imported = _retrend_from(session, user_id, stats["first"], chunk_size)
+            update_tdee_estimate_bulk(session, user_id, imported, commit=False)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return stats
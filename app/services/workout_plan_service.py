@@ -1,10 +1,14 @@
 """Workout plan service: create and get workout plans."""
 import json
 from app.models.workout_plan import WorkoutPlan
+from app.tracing import traced
 
 
+@traced()
 def create_workout_plan(session, user_id, plan_json):
-    """Save a new workout plan. plan_json can be a dict; stored as JSON string."""
+    """Save a new workout plan. plan_json can be a dict; stored as JSON string (text must be valid JSON)."""
+    if not isinstance(plan_json, dict):
+        json.loads(plan_json)  # reject malformed text up front: the API embeds stored plan_json verbatim
     plan = WorkoutPlan(
         user_id=user_id,
         plan_json=json.dumps(plan_json) if isinstance(plan_json, dict) else plan_json,
@@ -15,6 +19,7 @@ def create_workout_plan(session, user_id, plan_json):
     return plan
 
 
+@traced()
 def get_latest_workout_plan(session, user_id):
     """Return the most recent workout plan for this user, or None."""
     plan = (
@@ -23,4 +28,20 @@ def get_latest_workout_plan(session, user_id):
         .order_by(WorkoutPlan.created_at.desc())
         .first()
     )
-    return plan
\ No newline at end of file
+    return plan
+
+
+def get_latest_workout_plan_id(session, user_id):
+    """Return the id of the most recent workout plan (without loading plan_json), or None."""
+    row = (
+        session.query(WorkoutPlan.id)
+        .filter(WorkoutPlan.user_id == user_id)
+        .order_by(WorkoutPlan.created_at.desc())
+        .first()
+    )
+    return row[0] if row else None
+
+
+def get_workout_plan_by_id(session, plan_id):
+    """Return the WorkoutPlan with this id, or None."""
+    return session.query(WorkoutPlan).filter(WorkoutPlan.id == plan_id).first()
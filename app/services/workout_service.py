@@ -1,19 +1,53 @@
 """Workout service: get all or filtered workouts."""
 from app.models.workout import Workout
+from app.tracing import traced
 
+# Everything needed to filter workouts and write their prompt line except suggested_instructions (Text),
+# which get_workout_texts fetches for the workouts actually used
+WORKOUT_SUMMARY_COLUMNS = (
+    Workout.id, Workout.exercise_name, Workout.category, Workout.calories_burn_per_30min,
+    Workout.difficulty, Workout.goal, Workout.equipment_required,
+)
+WORKOUT_TEXT_COLUMNS = ("suggested_instructions",)
 
-def get_all_workouts(session):
-    """Return all workouts from the database."""
-    return session.query(Workout).all()
 
-
-def get_workouts_filtered(session, goal=None, equipment=None, difficulty=None):
-    """Return workouts that match the given filters. None means no filter."""
-    query = session.query(Workout)
+def _apply_filters(query, goal, equipment, difficulty):
     if goal:
         query = query.filter(Workout.goal == goal)
     if equipment is not None:
         query = query.filter(Workout.equipment_required == equipment)
     if difficulty:
         query = query.filter(Workout.difficulty == difficulty)
-    return query.all()
\ No newline at end of file
+    return query
+
+
+@traced()
+def get_all_workouts(session):
+    """Return all workouts from the database."""
+    return session.query(Workout).all()
+
+
+@traced()
+def get_workouts_filtered(session, goal=None, equipment=None, difficulty=None):
+    """Return workouts that match the given filters. None means no filter."""
+    return _apply_filters(session.query(Workout), goal, equipment, difficulty).all()
+
+
+@traced()
+def get_workout_summaries(session, goal=None, equipment=None, difficulty=None):
+    """Same filters as get_workouts_filtered, but rows (named tuples) of WORKOUT_SUMMARY_COLUMNS in id order."""
+    query = session.query(*WORKOUT_SUMMARY_COLUMNS)
+    return _apply_filters(query, goal, equipment, difficulty).order_by(Workout.id).all()
+
+
+@traced()
+def get_workout_texts(session, workout_ids):
+    """{workout id: (suggested_instructions,)} for these workouts (one query)."""
+    if not workout_ids:
+        return {}
+    rows = (
+        session.query(Workout.id, Workout.suggested_instructions)
+        .filter(Workout.id.in_(list(workout_ids)))
+        .all()
+    )
+    return {r[0]: (r[1],) for r in rows}
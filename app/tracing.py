@@ -0,0 +1,241 @@
+"""Lightweight tracing: nested spans per rerun / job, exported as OTLP JSON lines.
+
+A trace is started with start_trace() or `with trace(...)` (one per Streamlit rerun, background job, ...).
+Inside it, `with span(name)` and @traced record nested timings; DB statements are recorded automatically
+once instrument_engine() is applied. Outside a trace, spans cost one context-variable lookup.
+
+Environment:
+  TRACE_EXPORT_PATH   append finished traces to this file (one OTLP/JSON ExportTraceServiceRequest per line)
+  TRACE_SAMPLE_RATE   fraction of traces recorded when exporting (default 1.0; forced traces always count)
+"""
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+SERVICE_NAME = "health-companion"
+
+_current = contextvars.ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+
+
+def _sample_rate():
+    if not os.getenv("TRACE_EXPORT_PATH"):
+        return 0.0
+    return float(os.getenv("TRACE_SAMPLE_RATE") or 1.0)
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent", "name", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, trace, parent, name, attributes):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent = parent
+        self.name = name
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+
+class Trace:
+    """All spans recorded under one root span."""
+
+    def __init__(self, name, attributes):
+        self.trace_id = os.urandom(16).hex()
+        self._lock = threading.Lock()
+        self.spans = []
+        self.root = self.add(None, name, attributes)
+
+    def add(self, parent, name, attributes):
+        s = Span(self, parent, name, attributes)
+        with self._lock:
+            self.spans.append(s)
+        return s
+
+    @property
+    def duration_ms(self):
+        end = self.root.end_ns or time.time_ns()
+        return (end - self.root.start_ns) / 1e6
+
+    def rows(self):
+        """Spans as waterfall rows (start offset and duration in ms, depth), in start order."""
+        t0 = self.root.start_ns
+        now = time.time_ns()
+        depth = {}
+        out = []
+        for s in sorted(self.spans, key=lambda s: s.start_ns):
+            depth[s.span_id] = depth.get(s.parent.span_id, -1) + 1 if s.parent else 0
+            end = s.end_ns or now
+            out.append({
+                "span": "  " * depth[s.span_id] + s.name,
+                "name": s.name,
+                "depth": depth[s.span_id],
+                "start_ms": (s.start_ns - t0) / 1e6,
+                "duration_ms": (end - s.start_ns) / 1e6,
+                "status": s.status,
+                "attributes": s.attributes,
+            })
+        return out
+
+    def to_otlp(self):
+        """OTLP/JSON ExportTraceServiceRequest for this trace."""
+        now = time.time_ns()
+        spans = []
+        for s in self.spans:
+            item = {
+                "traceId": self.trace_id,
+                "spanId": s.span_id,
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns or now),
+                "attributes": [{"key": k, "value": {"stringValue": str(v)}} for k, v in s.attributes.items()],
+                "status": {"code": 2 if s.status == "error" else 1},
+            }
+            if s.parent is not None:
+                item["parentSpanId"] = s.parent.span_id
+            spans.append(item)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": spans}],
+        }]}
+
+
+def export_trace(t):
+    """Append the trace to TRACE_EXPORT_PATH (no-op when unset)."""
+    path = os.getenv("TRACE_EXPORT_PATH")
+    if not path:
+        return
+    line = json.dumps(t.to_otlp(), separators=(",", ":"))
+    with _export_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def current_span():
+    return _current.get()
+
+
+def start_trace(name, force=False, **attributes):
+    """
+    Begin a trace in the current context and return it (None when not sampled). A trace left open
+    in this context (e.g. a Streamlit rerun cut short by st.stop) is finished first.
+    """
+    dangling = _current.get()
+    if dangling is not None:
+        dangling.trace.root.status = "stopped"
+        end_trace(dangling.trace)
+    if not force and random.random() >= _sample_rate():
+        return None
+    t = Trace(name, attributes)
+    _current.set(t.root)
+    return t
+
+
+def end_trace(t):
+    """Finish the trace, close any spans still open and export it."""
+    if t is None:
+        return
+    for s in t.spans:
+        s.end()
+    if _current.get() is not None and _current.get().trace is t:
+        _current.set(None)
+    export_trace(t)
+
+
+@contextmanager
+def trace(name, force=False, **attributes):
+    """Run the block as a trace, or as a child span when a trace is already active."""
+    if _current.get() is not None:
+        with span(name, **attributes) as s:
+            yield s.trace
+        return
+    t = start_trace(name, force=force, **attributes)
+    try:
+        yield t
+    except Exception:
+        if t is not None:
+            t.root.status = "error"
+        raise
+    finally:
+        end_trace(t)
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time the block as a child of the current span. Yields the Span, or None outside a trace."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    s = parent.trace.add(parent, name, attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except Exception as e:
+        s.status = "error"
+        s.attributes["error"] = f"{e.__class__.__name__}: {str(e)[:200]}"
+        raise
+    finally:
+        s.end()
+        _current.reset(token)
+
+
+def set_attributes(**attributes):
+    """Add attributes to the current span (no-op outside a trace)."""
+    s = _current.get()
+    if s is not None:
+        s.attributes.update(attributes)
+
+
+def traced(name=None):
+    """Decorator: record each call as a span named `name` (default: module.function)."""
+    def decorator(fn):
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_engine(engine):
+    """Record every SQL statement executed inside a trace as a db.<verb> span."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        parent = _current.get()
+        if parent is None:
+            return
+        verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "query"
+        context._trace_span = parent.trace.add(parent, f"db.{verb}", {"db.statement": statement[:300]})
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        s = getattr(context, "_trace_span", None)
+        if s is not None:
+            s.end()
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                s.attributes["db.rowcount"] = cursor.rowcount
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        s = getattr(exception_context.execution_context, "_trace_span", None)
+        if s is not None:
+            s.status = "error"
+            s.end()
@@ -0,0 +1,166 @@
+"""Synthetic, seeded inputs for the benchmarks: recipes, workouts, plans, grocery strings and DB rows."""
+import json
+import random
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from app.ai_engine.meal_plan_generator import SLOT_ORDER
+
+_DISHES = ["Poha", "Upma", "Dal Tadka", "Rajma Chawal", "Paneer Bhurji", "Veg Pulao", "Chana Masala",
+           "Egg Curry", "Oats Porridge", "Idli Sambar", "Aloo Paratha", "Curd Rice", "Moong Chilla"]
+_INGREDIENTS = [
+    ("Rice", "kg"), ("Atta", "kg"), ("Toor Dal", "g"), ("Moong Dal", "g"), ("Paneer", "g"), ("Milk", "litre"),
+    ("Curd", "g"), ("Onion", "kg"), ("Tomato", "kg"), ("Potato", "kg"), ("Banana", "pieces"), ("Eggs", "pieces"),
+    ("Cooking Oil", "litre"), ("Salt", "g"), ("Turmeric", "g"), ("Cumin Seeds", "g"), ("Green Chilli", "g"),
+    ("Oats", "g"), ("Peanuts", "g"), ("Spinach", "g"), ("Bread", "pieces"), ("Ginger Garlic Paste", "g"),
+]
+_DIETS = ["Veg", "Non-Veg", "Vegan", "Eggetarian"]
+_CUISINES = ["North Indian", "South Indian", "Continental", None]
+_MEAL_TYPES = ["Breakfast", "Lunch", "Dinner", "Snack"]
+
+
+def _quantity(rng, unit):
+    if unit == "kg":
+        return f"{rng.choice([0.25, 0.5, 1, 2])} kg"
+    if unit == "litre":
+        return f"{rng.choice([0.5, 1])} litre"
+    if unit == "pieces":
+        return f"{rng.randint(2, 12)} pieces"
+    return f"{rng.choice([50, 100, 200, 250, 500])}g"
+
+
+def make_recipes(n, seed=0):
+    """n recipe-like objects (duck-typed like Recipe rows) with ingredients and instructions."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        ingredients = rng.sample(_INGREDIENTS, 5)
+        out.append(SimpleNamespace(
+            id=i + 1,
+            name=f"{rng.choice(_DISHES)} #{i}",
+            calories_per_serving=float(rng.randint(120, 650)),
+            protein_g=float(rng.randint(3, 35)),
+            carbs_g=float(rng.randint(10, 90)),
+            fat_g=float(rng.randint(2, 30)),
+            diet_type=rng.choice(_DIETS),
+            cost_per_serving=float(rng.randint(15, 120)),
+            cuisine=rng.choice(_CUISINES),
+            meal_type=rng.choice(_MEAL_TYPES),
+            ingredients=", ".join(f"{name} {_quantity(rng, unit)}" for name, unit in ingredients),
+            instructions="1. Wash and chop. 2. Heat oil, add spices. 3. Cook until done, about 15 minutes. 4. Serve hot.",
+        ))
+    return out
+
+
+def make_workouts(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(
+            id=i + 1,
+            exercise_name=f"{rng.choice(['Squats', 'Push-ups', 'Plank', 'Burpees', 'Lunges', 'Jumping Jacks'])} #{i}",
+            category=rng.choice(["Strength", "Cardio", "Core", "Mobility"]),
+            calories_burn_per_30min=float(rng.randint(80, 400)),
+            difficulty=rng.choice(["Beginner", "Intermediate", "Advanced"]),
+            goal=rng.choice(["Weight Loss", "Muscle Gain", "Maintain Weight"]),
+            equipment_required=rng.choice(["None", "Dumbbells", "Resistance Band"]),
+            suggested_instructions="Keep your core tight. 3 sets of 12 reps with 45 s rest.",
+        )
+        for i in range(n)
+    ]
+
+
+def make_user():
+    return SimpleNamespace(
+        id=1, name="Bench", age=21, gender="Male", height_cm=172.0, weight_kg=74.0, goal="Lose Weight",
+        dietary_preference="Veg", cuisine="North Indian", budget=1500.0, equipment="None",
+        workout_minutes_per_day=30, profile_code="BENCH001", email=None,
+    )
+
+
+def make_grocery_strings(n, seed=0):
+    """n "Item | qty | cost | reusable" strings with realistic duplicates and mixed units."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        name, unit = rng.choice(_INGREDIENTS)
+        if rng.random() < 0.3:
+            name = name.lower()
+        out.append(f"{name} | {_quantity(rng, unit)} | {rng.randint(10, 200)} | {rng.choice(['yes', 'no'])}")
+    return out
+
+
+def make_quantity_strings(n, seed=0):
+    rng = random.Random(seed)
+    units = ["kg", "g", "pieces", "litre"]
+    return [_quantity(rng, rng.choice(units)) for _ in range(n)]
+
+
+def make_meal_plan(num_days=7, seed=0):
+    """Plan dict shaped like generate_meal_plan output."""
+    rng = random.Random(seed)
+    start = date(2026, 1, 5)
+    days = []
+    for d in range(num_days):
+        meals = []
+        for slot, label in SLOT_ORDER:
+            ingredients = rng.sample(_INGREDIENTS, 4)
+            meals.append({
+                "slot": slot,
+                "time": label.split("(")[-1].rstrip(")"),
+                "name": rng.choice(_DISHES),
+                "recipe_detail": "Ingredients: " + ", ".join(f"{n} {_quantity(rng, u)}" for n, u in ingredients)
+                + ". Method: soak, cook with spices for 15 minutes & serve <hot>.",
+                "calories": rng.randint(80, 600),
+            })
+        days.append({"day": d + 1, "date": (start + timedelta(days=d)).isoformat(), "meals": meals, "grocery_list": []})
+    return {
+        "days": days,
+        "weekly_grocery_list": make_grocery_strings(60, seed),
+        "total_weekly_cost": 1450,
+    }
+
+
+def seed_database(session, scale, seed=0):
+    """
+    Replace table contents with synthetic rows: `scale` recipes, workouts, meal plans and weight logs
+    (plans and logs spread over scale // 100 + 1 users; user 1 gets the largest share). Returns user 1's profile code.
+    """
+    from app.database import Base, engine
+    from app.models.meal_plan import MealPlan
+    from app.models.progress_log import ProgressLog
+    from app.models.recipes import Recipe
+    from app.models.user import User
+    from app.models.workout import Workout
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    n_users = scale // 100 + 1
+    user = make_user()
+    session.execute(User.__table__.insert(), [
+        {k: getattr(user, k) for k in ("age", "gender", "height_cm", "weight_kg", "goal", "dietary_preference",
+                                       "cuisine", "budget", "equipment", "workout_minutes_per_day")}
+        | {"id": i + 1, "name": f"User {i + 1}", "profile_code": f"BENCH{i + 1:03d}"}
+        for i in range(n_users)
+    ])
+    session.execute(Recipe.__table__.insert(), [vars(r) for r in make_recipes(scale, seed)])
+    session.execute(Workout.__table__.insert(), [vars(w) for w in make_workouts(scale, seed)])
+    plan_json = json.dumps(make_meal_plan(seed=seed))
+    now = datetime(2026, 1, 1)
+    session.execute(MealPlan.__table__.insert(), [
+        {"user_id": 1 if i % 2 == 0 else rng.randint(2, n_users) if n_users > 1 else 1,
+         "calorie_target": 2000.0, "plan_json": plan_json, "weekly_cost": 1450.0,
+         "created_at": now + timedelta(minutes=i)}
+        for i in range(scale)
+    ])
+    start = date(2020, 1, 1)
+    session.execute(ProgressLog.__table__.insert(), [
+        {"user_id": 1, "weight_kg": 80 - i * 0.01 + rng.uniform(-0.8, 0.8), "trend_kg": 80 - i * 0.01,
+         "logged_at": start + timedelta(days=i)}
+        for i in range(scale)
+    ])
+    session.commit()
+    from app import catalog_snapshot
+
+    catalog_snapshot.refresh(session)
+    return "BENCH001"
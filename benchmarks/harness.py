@@ -0,0 +1,113 @@
+"""Benchmark harness: registry, auto-calibrated timing, JSON baselines and comparison reports."""
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+# (name, setup, scaled). setup(ctx) returns the zero-argument callable to time.
+BENCHMARKS = []
+
+
+def benchmark(name, scaled=False):
+    """Register a benchmark. Scaled benchmarks run once per --scales entry (ctx.scale is the size)."""
+    def decorator(setup):
+        BENCHMARKS.append((name, setup, scaled))
+        return setup
+    return decorator
+
+
+def time_callable(fn, min_time=0.2, repeat=5):
+    """
+    Time fn like timeit: pick a loop count so one repeat takes about min_time / repeat seconds,
+    then take `repeat` samples. Returns per-call seconds statistics.
+    """
+    target = min_time / repeat
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * target / max(elapsed, 1e-9)))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+
+def environment_info():
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def save_results(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment_info(), "results": results}, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def format_seconds(s):
+    if s >= 1:
+        return f"{s:.2f} s"
+    if s >= 1e-3:
+        return f"{s * 1e3:.2f} ms"
+    return f"{s * 1e6:.1f} µs"
+
+
+def format_results(results):
+    width = max((len(k) for k in results), default=10)
+    lines = [f"{'benchmark':<{width}}  {'median':>10}  {'min':>10}  {'loops':>7}"]
+    for name, r in results.items():
+        lines.append(f"{name:<{width}}  {format_seconds(r['median']):>10}  {format_seconds(r['min']):>10}  {r['number']:>7}")
+    return "\n".join(lines)
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """
+    Compare medians. Returns (report text, regressions) where regressions lists benchmark names
+    that got slower by more than `threshold` (0.10 = 10%).
+    """
+    names = [n for n in current if n in baseline]
+    width = max((len(n) for n in names), default=10)
+    lines = [f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}"]
+    regressions = []
+    for name in names:
+        old, new = baseline[name]["median"], current[name]["median"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        lines.append(f"{name:<{width}}  {format_seconds(old):>10}  {format_seconds(new):>10}  {change:>+7.1%}{flag}")
+    missing = sorted(set(baseline) - set(current))
+    added = sorted(set(current) - set(baseline))
+    if missing:
+        shown = ", ".join(missing[:8]) + (f" and {len(missing) - 8} more" if len(missing) > 8 else "")
+        lines.append(f"Not run this time: {shown}")
+    if added:
+        lines.append(f"New (no baseline): {', '.join(added)}")
+    return "\n".join(lines), regressions
@@ -0,0 +1,93 @@
+"""
+Import-time budget: import everything app/app.py imports in a fresh interpreter and fail (exit status 1)
+when a dependency that should load lazily (PDF, charting, LLM SDK) is pulled in at import time, or when
+the total import time exceeds the budget. Run after adding imports to the app or its services:
+
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --verbose      # slowest imports
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+_APP_PATH = _ROOT / "app" / "app.py"
+
+# Loaded on first use (PDF download, chart render, real Gemini call); importing the app must not load them
+LAZY_MODULES = ("reportlab", "altair", "google.generativeai", "pandas")
+# Median cumulative import time of the app's imports (streamlit included), in milliseconds. Raise it only
+# together with the change that needs it.
+MAX_IMPORT_MS = 900
+
+
+def app_imports(path=_APP_PATH):
+    """Modules imported at the top level of the Streamlit script."""
+    modules = []
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return modules
+
+
+def measure(modules):
+    """Import modules in a fresh interpreter. Returns (total ms, [(ms, module)] for top-level imports, loaded lazy modules)."""
+    code = (
+        "import sys\n"
+        + "".join(f"import {m}\n" for m in modules)
+        + f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+    )
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{Path(tempfile.gettempdir()) / 'student_fit_import_budget.db'}")
+    env.setdefault("GEMINI_API_KEY", "offline-benchmark")
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    timings = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not name.startswith("  "):  # top level: its cumulative time includes everything it imported
+            timings.append((int(cumulative_us) / 1e3, name.strip()))
+    loaded = [m for m in out.stdout.strip().split(",") if m]
+    return sum(ms for ms, _ in timings), sorted(timings, reverse=True), loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to time (median is used)")
+    parser.add_argument("--max-ms", type=float, default=MAX_IMPORT_MS, help="Import-time budget in ms")
+    parser.add_argument("--verbose", action="store_true", help="Print the slowest top-level imports")
+    args = parser.parse_args(argv)
+
+    modules = app_imports()
+    runs = [measure(modules) for _ in range(max(1, args.runs))]
+    total_ms = statistics.median(total for total, _, _ in runs)
+    _total, timings, loaded = runs[-1]
+
+    failures = []
+    if loaded:
+        failures.append(f"loaded at import time (should be lazy): {', '.join(loaded)}")
+    if total_ms > args.max_ms:
+        failures.append(f"import time {total_ms:.0f} ms > budget {args.max_ms:.0f} ms")
+
+    status = "FAIL" if failures else "ok"
+    print(f"{status:4}  app imports  {total_ms:7.0f} ms / {args.max_ms:.0f} ms  ({len(modules)} modules, {len(runs)} runs)")
+    for failure in failures:
+        print(f"      {failure}")
+    if args.verbose or failures:
+        for ms, name in timings[:15]:
+            print(f"      {ms:8.1f} ms  {name}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
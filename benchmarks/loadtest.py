@@ -0,0 +1,409 @@
+"""
+Load test: N concurrent simulated students against the service layer and/or the Streamlit app (AppTest).
+
+Each virtual user restores their profile by code, opens the dashboard, logs weight, views the progress
+chart and every few iterations generates a meal or workout plan through the synthetic LLM backend.
+Reports p50/p95/p99 latency per step, throughput, connection-pool waits and memory per app session.
+
+    python -m benchmarks.loadtest --users 20 --duration 30
+    python -m benchmarks.loadtest --mode apptest --users 5 --duration 20
+    python -m benchmarks.loadtest --database-url postgresql://.../staging --users 50 --json load.json
+
+Without --database-url a temporary SQLite file is used; SQLite serializes writers, so use a staging
+Postgres database for capacity numbers.
+"""
+import argparse
+import json
+import os
+import pickle
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+_APP_PATH = Path(__file__).resolve().parents[1] / "app" / "app.py"
+
+
+def _rss_bytes():
+    """Current resident set size of this process (Linux /proc; peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Recorder:
+    """Thread-safe latency samples and error counts per step."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_examples = {}
+
+    def measure(self, step, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        except Exception as e:
+            with self._lock:
+                self.errors[step] += 1
+                self.error_examples.setdefault(step, f"{e.__class__.__name__}: {str(e)[:200]}")
+            return None
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.samples[step].append(elapsed)
+
+    def summary(self):
+        out = {}
+        for step, values in sorted(self.samples.items()):
+            arr = np.asarray(values)
+            p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+            out[step] = {
+                "count": int(arr.size),
+                "errors": self.errors.get(step, 0),
+                "p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(arr.max()),
+            }
+        return out
+
+
+class PoolMonitor:
+    """Times every connection checkout from the engine's pool and tracks peak concurrent use."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.pool = engine.pool
+        self._lock = threading.Lock()
+        self.waits = []
+        self.timeouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        original_connect = self.pool.connect
+
+        def timed_connect():
+            start = time.perf_counter()
+            try:
+                return original_connect()
+            except Exception as e:
+                if e.__class__.__name__ == "TimeoutError":
+                    with self._lock:
+                        self.timeouts += 1
+                raise
+            finally:
+                with self._lock:
+                    self.waits.append(time.perf_counter() - start)
+
+        self.pool.connect = timed_connect
+        event.listen(self.pool, "checkout", self._on_checkout)
+        event.listen(self.pool, "checkin", self._on_checkin)
+
+    def _on_checkout(self, *args):
+        with self._lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def _on_checkin(self, *args):
+        with self._lock:
+            self.in_use -= 1
+
+    def summary(self):
+        waits = np.asarray(self.waits or [0.0])
+        p50, p95, p99 = np.percentile(waits, [50, 95, 99])
+        return {
+            "pool": self.pool.status(),
+            "checkouts": len(self.waits),
+            "peak_in_use": self.peak_in_use,
+            "timeouts": self.timeouts,
+            "wait_p50": float(p50), "wait_p95": float(p95), "wait_p99": float(p99), "wait_max": float(waits.max()),
+        }
+
+
+def seed(session, n_users, history_days=60, seed_value=0):
+    """Create tables, a recipe/workout catalog if empty, and n_users load-test users with weight history."""
+    from app.database import Base, engine
+    from app.models.progress_log import ProgressLog
+    from app.models.recipes import Recipe
+    from app.models.workout import Workout
+    from app.services.user_service import create_user
+    from benchmarks.fixtures import make_recipes, make_workouts
+
+    Base.metadata.create_all(bind=engine)
+    if session.query(Recipe.id).first() is None:
+        session.execute(Recipe.__table__.insert(), [vars(r) for r in make_recipes(500, seed_value)])
+    if session.query(Workout.id).first() is None:
+        session.execute(Workout.__table__.insert(), [vars(w) for w in make_workouts(200, seed_value)])
+    session.commit()
+    rng = random.Random(seed_value)
+    users = []
+    start = date.today() - timedelta(days=history_days)
+    for i in range(n_users):
+        weight = rng.uniform(55, 95)
+        user = create_user(
+            session, f"loadtest-{i}", rng.randint(18, 26), rng.choice(["Male", "Female"]),
+            rng.uniform(155, 190), weight, rng.choice(["Weight Loss", "Muscle Gain", "Maintain Weight"]),
+            rng.choice(["Veg", "Non-Veg"]), rng.choice([500, 1000, 1500]), "None", 30,
+        )
+        session.execute(ProgressLog.__table__.insert(), [
+            {"user_id": user.id, "weight_kg": weight - d * 0.03 + rng.uniform(-0.5, 0.5),
+             "trend_kg": weight - d * 0.03, "logged_at": start + timedelta(days=d)}
+            for d in range(history_days)
+        ])
+        session.commit()
+        users.append((user.id, user.profile_code, weight))
+    return users
+
+
+def _progress_chart(session, user_id):
+    """What the Progress tab does before handing the frame to Altair (full date range, downsampled)."""
+    import pandas as pd
+    from app.downsample import downsample_indices, point_budget
+    from app.services.progress_service import get_weight_log_bounds, get_weight_series
+
+    start, end, _count = get_weight_log_bounds(session, user_id)
+    df = pd.DataFrame(get_weight_series(session, user_id, start, end), columns=["date", "weight_kg", "trend_kg"])
+    df["trend_kg"] = df["trend_kg"].fillna(df["weight_kg"])
+    df["date"] = pd.to_datetime(df["date"])
+    budget = point_budget(len(df), window_days=(end - start).days if start else None)
+    if budget < len(df):
+        days = (df["date"] - df["date"].iloc[0]).dt.days.to_numpy()
+        df = df.iloc[downsample_indices(days, df["weight_kg"].to_numpy(), budget)]
+    return df
+
+
+def _dashboard(session, user_id):
+    from app.ai_engine.calorie_engine import get_all_metrics
+    from app.services.meal_plan_service import get_latest_meal_plan
+    from app.services.progress_service import get_latest_weight_log
+    from app.services.tdee_service import get_adaptive_tdee
+    from app.services.user_service import get_user_by_id
+
+    user = get_user_by_id(session, user_id)
+    latest = get_latest_weight_log(session, user_id)
+    metrics = get_all_metrics(
+        user, weight_kg_override=latest.trend_kg if latest else None,
+        tdee_override=get_adaptive_tdee(session, user_id),
+    )
+    get_latest_meal_plan(session, user_id)
+    return metrics
+
+
+def service_user(index, user, recorder, stop, args):
+    """One virtual user looping over the service-layer flow until stop is set."""
+    from app.ai_engine.meal_plan_generator import generate_and_save_meal_plan
+    from app.ai_engine.workout_plan_generator import generate_and_save_workout_plan
+    from app.database import SessionLocal
+    from app.services.progress_service import log_weight
+    from app.services.single_flight import generate_plan_once
+    from app.services.user_service import get_user_by_profile_code
+
+    user_id, code, weight = user
+    rng = random.Random(index)
+    day = date.today()
+    iteration = 0
+    while not stop.is_set():
+        session = SessionLocal()
+        try:
+            recorder.measure("svc.restore_profile", get_user_by_profile_code, session, code)
+            recorder.measure("svc.dashboard", _dashboard, session, user_id)
+            weight += rng.uniform(-0.4, 0.3)
+            day += timedelta(days=1)
+            recorder.measure("svc.log_weight", log_weight, session, user_id, weight, day)
+            recorder.measure("svc.progress_chart", _progress_chart, session, user_id)
+            if args.generate_every and iteration % args.generate_every == args.generate_every - 1:
+                if (iteration // args.generate_every) % 2 == 0:
+                    recorder.measure("svc.generate_meal_plan", generate_plan_once,
+                                     session, user_id, "meal", generate_and_save_meal_plan)
+                else:
+                    recorder.measure("svc.generate_workout_plan", generate_plan_once,
+                                     session, user_id, "workout", generate_and_save_workout_plan)
+            recorder.measure("svc.flow", lambda: None)  # one sample per completed iteration
+        finally:
+            session.close()
+        iteration += 1
+        stop.wait(args.think)
+
+
+def apptest_user(index, user, recorder, stop, args, sessions):
+    """One virtual user driving app/app.py through AppTest (full script reruns, all tabs)."""
+    from streamlit.testing.v1 import AppTest
+
+    _user_id, code, weight = user
+    at = AppTest.from_file(str(_APP_PATH), default_timeout=120)
+    at.query_params["code"] = code
+    recorder.measure("app.first_load", at.run)
+    sessions.append(at)
+    iteration = 0
+    while not stop.is_set():
+        recorder.measure("app.rerun", at.run)
+        form_inputs = [n for n in at.number_input if n.label == "Weight (kg)"]
+        submit = [b for b in at.button if b.label == "Log weight"]
+        if form_inputs and submit:
+            form_inputs[-1].set_value(round(weight - iteration * 0.1, 1))
+            recorder.measure("app.log_weight", lambda: submit[0].click().run())
+        if args.generate_every and iteration % args.generate_every == args.generate_every - 1:
+            generate = [b for b in at.button if b.label == "Generate my meal plan"]
+            if generate:
+                recorder.measure("app.generate_meal_plan_click", lambda: generate[0].click().run())
+        iteration += 1
+        stop.wait(args.think)
+
+
+def _session_state_bytes(at):
+    try:
+        return len(pickle.dumps(at.session_state.to_dict()))
+    except Exception:
+        return len(repr(at.session_state.to_dict()).encode())
+
+
+def _fmt_ms(s):
+    return f"{s * 1e3:9.1f}"
+
+
+def print_report(result):
+    print(f"\n{result['mode']} | {result['users']} users | {result['duration_s']:.1f} s")
+    print(f"{'step':<30} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for step, s in result["steps"].items():
+        print(f"{step:<30} {s['count']:>6} {s['errors']:>6} {_fmt_ms(s['p50'])} {_fmt_ms(s['p95'])} "
+              f"{_fmt_ms(s['p99'])} {_fmt_ms(s['max'])}")
+    print(f"Throughput: {result['flows_per_s']:.2f} flows/s, {result['steps_per_s']:.1f} steps/s")
+    pool = result["pool"]
+    print(f"Pool: {pool['pool']}; peak in use {pool['peak_in_use']}, {pool['checkouts']} checkouts, "
+          f"wait p50 {pool['wait_p50'] * 1e3:.2f} ms / p95 {pool['wait_p95'] * 1e3:.2f} ms / "
+          f"max {pool['wait_max'] * 1e3:.1f} ms, timeouts {pool['timeouts']}")
+    mem = result["memory"]
+    print(f"Memory: RSS {mem['rss_start_mb']:.0f} -> {mem['rss_end_mb']:.0f} MB", end="")
+    if mem.get("per_session_mb") is not None:
+        print(f", ~{mem['per_session_mb']:.1f} MB per app session, session_state ~{mem['session_state_kb']:.1f} KB")
+    else:
+        print()
+    for step, example in result["error_examples"].items():
+        print(f"  first error in {step}: {example}")
+
+
+def run_load(mode, users, args, engine):
+    recorder = Recorder()
+    monitor = PoolMonitor(engine)
+    stop = threading.Event()
+    sessions = []
+    rss_start = _rss_bytes()
+    threads = []
+    for i, user in enumerate(users):
+        if mode == "services":
+            target, extra = service_user, ()
+        else:
+            target, extra = apptest_user, (sessions,)
+        t = threading.Thread(target=target, args=(i, user, recorder, stop, args) + extra, daemon=True)
+        threads.append(t)
+        t.start()
+        if args.ramp_up:
+            time.sleep(args.ramp_up / len(users))
+    started = time.perf_counter()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join(timeout=max(30.0, args.llm_latency * 4))
+    elapsed = time.perf_counter() - started
+    rss_end = _rss_bytes()
+    steps = recorder.summary()
+    flows = steps.pop("svc.flow", None) if mode == "services" else steps.get("app.rerun")
+    total_steps = sum(s["count"] for s in steps.values())
+    memory = {"rss_start_mb": rss_start / 2**20, "rss_end_mb": rss_end / 2**20, "per_session_mb": None}
+    if sessions:
+        memory["per_session_mb"] = (rss_end - rss_start) / len(sessions) / 2**20
+        memory["session_state_kb"] = float(np.mean([_session_state_bytes(at) for at in sessions])) / 1024
+    return {
+        "mode": mode,
+        "users": len(users),
+        "duration_s": elapsed,
+        "steps": steps,
+        "flows_per_s": (flows["count"] if flows else 0) / elapsed,
+        "steps_per_s": total_steps / elapsed,
+        "pool": monitor.summary(),
+        "memory": memory,
+        "error_examples": dict(recorder.error_examples),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("services", "apptest", "both"), default="services")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load per mode")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which users start")
+    parser.add_argument("--think", type=float, default=0.2, help="Pause between iterations per user (s)")
+    parser.add_argument("--generate-every", type=int, default=5, help="Generate a plan every N iterations (0 = never)")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Synthetic LLM base latency (s)")
+    parser.add_argument("--llm-tokens-per-s", type=float, default=400.0, help="Synthetic LLM output rate")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-429-rate", type=float, default=0.0)
+    parser.add_argument("--database-url", help="Run against this database instead of a temporary SQLite file")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    db_path = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        db_path = Path(tempfile.gettempdir()) / "student_fit_loadtest.db"
+        db_path.unlink(missing_ok=True)
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+        # Catalog snapshots of the throwaway database stay out of data/
+        os.environ.setdefault("CATALOG_SNAPSHOT_DIR", str(Path(tempfile.gettempdir()) / "student_fit_catalog_snapshot"))
+    os.environ.setdefault("GEMINI_API_KEY", "offline-loadtest")
+    # The app builds its backend from the environment; AppTest runs the script in this process
+    os.environ["LLM_BACKEND"] = "synthetic"
+
+    from app.database import SessionLocal, engine
+    if not args.database_url and engine.dialect.name != "sqlite":
+        sys.exit("app.config picked up a DATABASE_URL from Streamlit secrets; pass --database-url explicitly.")
+    import app.models  # noqa: F401  (register all tables)
+    from app.ai_engine.gemini_client import set_backend
+    from app.ai_engine.llm_backends import SyntheticBackend
+    from app.ai_engine.usage_ledger import get_ledger
+
+    set_backend(SyntheticBackend(
+        latency_s=args.llm_latency, latency_jitter_s=args.llm_latency * 0.5,
+        tokens_per_s=args.llm_tokens_per_s, error_rate=args.llm_error_rate,
+        rate_limit_rate=args.llm_429_rate, seed=0,
+    ))
+    session = SessionLocal()
+    try:
+        print(f"Seeding {args.users} users ...", flush=True)
+        users = seed(session, args.users)
+    finally:
+        session.close()
+
+    modes = ("services", "apptest") if args.mode == "both" else (args.mode,)
+    results = []
+    try:
+        for mode in modes:
+            print(f"Running {mode} load for {args.duration:.0f} s ...", flush=True)
+            result = run_load(mode, users, args, engine)
+            print_report(result)
+            results.append(result)
+    finally:
+        # The usage ledger is part of the measured write load; write what it still holds while the
+        # database exists (its exit-time flush would run after the file is gone)
+        get_ledger().flush(10.0)
+        engine.dispose()
+        if db_path is not None:
+            db_path.unlink(missing_ok=True)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2, default=str)
+        print(f"\nWrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Query budgets: run the main flows on a seeded temporary SQLite database and fail (exit status 1)
+when any flow executes more SQL statements than allowed, or repeats an identical statement where
+that is not expected. Run after changing services or app/app.py:
+
+    python -m benchmarks.query_budgets
+    python -m benchmarks.query_budgets --verbose      # grouped statements for every flow
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+_DB_PATH = Path(tempfile.gettempdir()) / "student_fit_query_budgets.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+# Catalog snapshots of the throwaway database stay out of data/
+os.environ.setdefault("CATALOG_SNAPSHOT_DIR", str(Path(tempfile.gettempdir()) / "student_fit_catalog_snapshot"))
+os.environ["LLM_BACKEND"] = "synthetic"
+# The usage ledger writes from a background thread; keep it out of timings and query counts
+os.environ["LLM_USAGE_LEDGER"] = "0"
+
+# flow name -> (max statements, identical statements allowed). Raise a budget only together with the
+# change that needs it, so the diff shows the extra queries.
+BUDGETS = {
+    "restore_profile": (1, False),
+    "create_user": (3, False),
+    "dashboard": (4, False),
+    "log_weight": (8, False),
+    "log_weights_bulk": (8, False),  # 30 backfilled logs: same statements as one log_weight
+    # 2,000 CSV rows in chunks of 1,000: a day lookup and an INSERT per chunk, then the trend pass (a page read
+    # and an UPDATE per 1,000 logs) and the TDEE update once
+    "import_weights": (16, True),
+    "progress_chart": (2, False),  # date bounds for the zoom slider, then the visible window
+    "generate_meal_plan": (5, False),
+    "generate_workout_plan": (3, False),
+    # The user row is loaded by submit_job, generate_plan_once and the generator; the job row by
+    # claim, run and finish
+    "submit_and_run_job": (18, True),
+    # First render of a session includes one grocery-acceptance check for the shown meal plan
+    "app_rerun": (13, True),
+}
+
+
+def _flows(session, user_id, code):
+    from app.ai_engine.meal_plan_generator import generate_and_save_meal_plan
+    from app.ai_engine.workout_plan_generator import generate_and_save_workout_plan
+    from app.services.job_runner import run_job
+    from app.services.job_service import submit_job
+    from app.services.progress_service import log_weight, log_weights_bulk
+    from app.services.user_service import create_user, get_user_by_profile_code
+    from app.services.weight_import_service import import_weight_history
+    from benchmarks.loadtest import _dashboard, _progress_chart
+
+    yield "restore_profile", lambda: get_user_by_profile_code(session, code)
+    yield "create_user", lambda: create_user(session, "Budget", 21, "Female", 160, 58, "Maintain Weight",
+                                             "Veg", 800, "None", 30)
+    yield "dashboard", lambda: _dashboard(session, user_id)
+    yield "log_weight", lambda: log_weight(session, user_id, 71.2, date.today() - timedelta(days=3))
+    yield "log_weights_bulk", lambda: log_weights_bulk(
+        session, user_id, [(date.today() - timedelta(days=60 + d), 72.0 - d * 0.05) for d in range(30)]
+    )
+    export = "date,weight_kg\n" + "".join(
+        f"{date.today() - timedelta(days=100 + d)},{73.0 - d * 0.002:.2f}\n" for d in range(2000)
+    )
+    yield "import_weights", lambda: import_weight_history(session, user_id, io.StringIO(export), chunk_size=1000)
+    yield "progress_chart", lambda: _progress_chart(session, user_id)
+    yield "generate_meal_plan", lambda: generate_and_save_meal_plan(session, user_id)
+    yield "generate_workout_plan", lambda: generate_and_save_workout_plan(session, user_id)
+    yield "submit_and_run_job", lambda: run_job(submit_job(session, user_id, "meal").id)
+
+
+def _app_rerun(code):
+    """One full rerun of app/app.py for a restored profile (all four tabs render)."""
+    from streamlit.testing.v1 import AppTest
+    from benchmarks.loadtest import _APP_PATH
+
+    at = AppTest.from_file(str(_APP_PATH), default_timeout=120)
+    at.query_params["code"] = code
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return at
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="Print grouped statements for every flow")
+    parser.add_argument("--skip-app", action="store_true", help="Skip the AppTest rerun flow")
+    args = parser.parse_args(argv)
+
+    from app.database import SessionLocal, engine
+    if engine.dialect.name != "sqlite":
+        sys.exit("app.config picked up a DATABASE_URL from Streamlit secrets; refusing to seed it.")
+    import app.models  # noqa: F401  (register all tables)
+    from app.ai_engine.gemini_client import set_backend
+    from app.ai_engine.llm_backends import SyntheticBackend
+    from app.query_counter import capture_queries
+    from benchmarks.fixtures import seed_database
+
+    set_backend(SyntheticBackend(seed=0))
+    session = SessionLocal()
+    failures = []
+    try:
+        code = seed_database(session, 200)
+        flows = list(_flows(session, 1, code))
+        if not args.skip_app:
+            flows.append(("app_rerun", lambda: _app_rerun(code)))
+        print(f"{'flow':<24} {'queries':>7} {'budget':>6}")
+        for name, fn in flows:
+            budget, allow_duplicates = BUDGETS[name]
+            # Start each flow with an empty identity map so lookups are not served from a previous flow
+            session.expire_all()
+            # AppTest runs the script on its own thread, so that flow needs a process-wide capture
+            with capture_queries(name, all_threads=name == "app_rerun") as log:
+                fn()
+            problems = []
+            if log.count > budget:
+                problems.append(f"over budget by {log.count - budget}")
+            if not allow_duplicates and log.duplicates():
+                problems.append("repeated identical statements")
+            if log.n_plus_one():
+                problems.append("possible N+1")
+            status = "FAIL " + ", ".join(problems) if problems else "ok"
+            print(f"{name:<24} {log.count:>7} {budget:>6}  {status}")
+            if problems or args.verbose:
+                print(log.report())
+            if problems:
+                failures.append(name)
+    finally:
+        session.close()
+        engine.dispose()
+        _DB_PATH.unlink(missing_ok=True)
+    if failures:
+        print(f"\nQuery budget failures: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Run the microbenchmarks offline (temporary SQLite database, canned LLM responses).
+
+    python -m benchmarks.run --scales 1k,10k --save benchmarks/results/baseline.json
+    python -m benchmarks.run --scales 1k,10k --compare benchmarks/results/baseline.json
+    python -m benchmarks.run --filter grocery --quick
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Configure the database before any app module creates its engine
+_DB_PATH = Path(tempfile.gettempdir()) / "student_fit_benchmarks.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+# Catalog snapshots of the throwaway database stay out of data/
+os.environ.setdefault("CATALOG_SNAPSHOT_DIR", str(Path(tempfile.gettempdir()) / "student_fit_catalog_snapshot"))
+# The usage ledger writes from a background thread; keep it out of timings and query counts
+os.environ["LLM_USAGE_LEDGER"] = "0"
+
+# Benchmarks with these prefixes need the database seeded at each scale
+_DB_PREFIXES = ("db.", "pipeline.")
+
+
+def _parse_scales(text):
+    scales = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        mult = 1
+        if part.endswith("k"):
+            part, mult = part[:-1], 1000
+        elif part.endswith("m"):
+            part, mult = part[:-1], 1_000_000
+        scales.append(int(float(part) * mult))
+    return scales
+
+
+def _label(scale):
+    if scale >= 1_000_000 and scale % 1_000_000 == 0:
+        return f"{scale // 1_000_000}m"
+    if scale >= 1000 and scale % 1000 == 0:
+        return f"{scale // 1000}k"
+    return str(scale)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1k,10k", help="Sizes for scaled benchmarks, e.g. 1k,10k,100k")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="Fewer, shorter samples (noisier)")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a saved JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown that counts as a regression (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    from app.database import SessionLocal, engine
+    if engine.dialect.name != "sqlite":
+        # app.config prefers Streamlit secrets; never seed synthetic rows into a real database
+        sys.exit(f"Refusing to benchmark against {engine.url.render_as_string(hide_password=True)}; "
+                 "remove .streamlit/secrets.toml DATABASE_URL or run from a clean checkout.")
+    import app.models  # noqa: F401  (register all tables)
+    from benchmarks import suite
+    from benchmarks.fixtures import seed_database
+    from benchmarks.harness import (
+        BENCHMARKS, compare_results, format_results, load_results, save_results, time_callable,
+    )
+
+    suite.install_fake_llm()
+    min_time, repeat = (0.05, 3) if args.quick else (0.2, 5)
+    selected = [b for b in BENCHMARKS if args.filter in b[0]]
+    results = {}
+
+    def run(name, setup, ctx):
+        fn = setup(ctx)
+        results[name] = time_callable(fn, min_time=min_time, repeat=repeat)
+        print(f"  {name}: {results[name]['median'] * 1e3:.3f} ms", flush=True)
+
+    session = SessionLocal()
+    try:
+        print("Fixed-size benchmarks")
+        for name, setup, scaled in selected:
+            if not scaled:
+                run(name, setup, SimpleNamespace(session=session, scale=None))
+        for scale in _parse_scales(args.scales):
+            scaled_benchmarks = [b for b in selected if b[2]]
+            if not scaled_benchmarks:
+                break
+            print(f"Scale {_label(scale)}")
+            ctx = SimpleNamespace(session=session, scale=scale)
+            if any(name.startswith(_DB_PREFIXES) for name, _, _ in scaled_benchmarks):
+                ctx.profile_code = seed_database(session, scale)
+            for name, setup, _ in scaled_benchmarks:
+                run(f"{name}[{_label(scale)}]", setup, ctx)
+                session.expunge_all()
+    finally:
+        session.close()
+        engine.dispose()
+        _DB_PATH.unlink(missing_ok=True)
+
+    print()
+    print(format_results(results))
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        save_results(results, args.save)
+        print(f"\nSaved {len(results)} results to {args.save}")
+    if args.compare:
+        report, regressions = compare_results(load_results(args.compare), results, args.threshold)
+        print(f"\nCompared with {args.compare}:\n{report}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
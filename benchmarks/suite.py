@@ -0,0 +1,217 @@
+"""Benchmark definitions for the app's hot paths. Imported by benchmarks.run after the database is configured."""
+from datetime import date, timedelta
+from itertools import count
+
+import numpy as np
+
+from app.ai_engine.gemini_client import set_backend
+from app.ai_engine.llm_backends import SyntheticBackend
+from app.ai_engine.calorie_engine import get_all_metrics, get_all_metrics_batch
+from app.ai_engine.meal_plan_generator import (
+    build_meal_plan_prompt, generate_and_save_meal_plan, generate_meal_plan, recipes_to_context,
+)
+from app.ai_engine.workout_plan_generator import build_workout_plan_prompt, generate_workout_plan
+from app.catalog_snapshot import CatalogSnapshot, build_snapshot
+from app.downsample import downsample_indices, point_budget
+from app.grocery import parse_and_merge_grocery_items, sum_quantity_strings
+from app.pdf_export import build_grocery_pdf, build_meal_plan_pdf
+from app.services.catalog_service import find_recipes
+from app.services.meal_plan_service import get_latest_meal_plan
+from app.services.progress_service import get_latest_weight_log, get_weight_logs, log_weight, log_weights_bulk
+from app.services.recipe_service import get_all_recipes, get_recipe_summaries, get_recipes_filtered
+from app.services.user_service import get_user_by_profile_code
+from app.services.workout_service import get_all_workouts
+from benchmarks import fixtures
+from benchmarks.harness import benchmark
+
+
+def install_fake_llm():
+    """Route every LLM call to the synthetic backend (fenced JSON, no delay) so nothing touches the network."""
+    set_backend(SyntheticBackend(seed=0, fenced=True))
+
+
+# ---- Pure functions (fixed size) ----
+
+@benchmark("grocery.parse_and_merge[60]")
+def _grocery_week(ctx):
+    items = fixtures.make_grocery_strings(60)
+    return lambda: parse_and_merge_grocery_items(items)
+
+
+@benchmark("prompt.build_meal_plan[200 recipes]")
+def _meal_prompt(ctx):
+    user, recipes = fixtures.make_user(), fixtures.make_recipes(200)
+    return lambda: build_meal_plan_prompt(user, recipes, 2000, 1500, pantry_items=["Rice", "Salt"])
+
+
+@benchmark("prompt.build_workout_plan[50 workouts]")
+def _workout_prompt(ctx):
+    user, workouts = fixtures.make_user(), fixtures.make_workouts(50)
+    return lambda: build_workout_plan_prompt(user, workouts, 30)
+
+
+@benchmark("llm.generate_meal_plan[synthetic]")
+def _generate_meal(ctx):
+    user, recipes = fixtures.make_user(), fixtures.make_recipes(200)
+    return lambda: generate_meal_plan(user, recipes, 2000, 1500)
+
+
+@benchmark("llm.generate_workout_plan[synthetic]")
+def _generate_workout(ctx):
+    user, workouts = fixtures.make_user(), fixtures.make_workouts(50)
+    return lambda: generate_workout_plan(user, workouts, 30)
+
+
+@benchmark("metrics.get_all_metrics")
+def _metrics(ctx):
+    user = fixtures.make_user()
+    return lambda: get_all_metrics(user)
+
+
+@benchmark("pdf.meal_plan[7 days]")
+def _pdf_plan(ctx):
+    plan = fixtures.make_meal_plan()
+    return lambda: build_meal_plan_pdf(plan)
+
+
+@benchmark("pdf.grocery[60]")
+def _pdf_grocery(ctx):
+    items = parse_and_merge_grocery_items(fixtures.make_grocery_strings(60))
+    return lambda: build_grocery_pdf(items, sum(c for _, _, c, _ in items))
+
+
+# ---- Pure functions (scaled) ----
+
+@benchmark("grocery.parse_and_merge", scaled=True)
+def _grocery_scaled(ctx):
+    items = fixtures.make_grocery_strings(ctx.scale)
+    return lambda: parse_and_merge_grocery_items(items)
+
+
+@benchmark("grocery.sum_quantity_strings", scaled=True)
+def _sum_quantities(ctx):
+    qtys = fixtures.make_quantity_strings(ctx.scale)
+    return lambda: sum_quantity_strings(qtys)
+
+
+@benchmark("prompt.recipes_to_context", scaled=True)
+def _recipe_context(ctx):
+    recipes = fixtures.make_recipes(ctx.scale)
+    return lambda: recipes_to_context(recipes)
+
+
+@benchmark("metrics.get_all_metrics_batch", scaled=True)
+def _metrics_batch(ctx):
+    rng = np.random.default_rng(0)
+    n = ctx.scale
+    weight, height = rng.uniform(45, 120, n), rng.uniform(150, 195, n)
+    age = rng.integers(17, 35, n)
+    gender = rng.choice(["Male", "Female"], n)
+    goal = rng.choice(["Lose Weight", "Gain Muscle", "Maintain Weight"], n)
+    return lambda: get_all_metrics_batch(weight, height, age, gender, goal, target_kg=70.0)
+
+
+
+@benchmark("chart.downsample_lttb", scaled=True)
+def _downsample(ctx):
+    rng = np.random.default_rng(0)
+    days = np.arange(ctx.scale, dtype=float)
+    weight = 80 - days * 0.004 + rng.normal(0, 0.4, ctx.scale)
+    return lambda: downsample_indices(days, weight, point_budget(ctx.scale))
+
+
+# ---- Service queries (scaled; the database is re-seeded with ctx.scale rows per table) ----
+
+@benchmark("db.get_all_recipes", scaled=True)
+def _all_recipes(ctx):
+    return lambda: get_all_recipes(ctx.session)
+
+
+@benchmark("db.get_recipes_filtered", scaled=True)
+def _filtered_recipes(ctx):
+    return lambda: get_recipes_filtered(ctx.session, diet_type="Veg", max_cost_per_serving=60)
+
+
+@benchmark("db.get_recipe_summaries", scaled=True)
+def _recipe_summaries(ctx):
+    """Same filters as db.get_recipes_filtered, without loading ingredients / instructions."""
+    return lambda: get_recipe_summaries(ctx.session, diet_type="Veg", max_cost_per_serving=60)
+
+
+@benchmark("db.catalog_snapshot_open", scaled=True)
+def _snapshot_open(ctx):
+    """Worker warm-up: map an existing snapshot of both catalog tables."""
+    path = build_snapshot(ctx.session)
+    return lambda: CatalogSnapshot(path)
+
+
+@benchmark("db.find_recipes[snapshot]", scaled=True)
+def _snapshot_recipes(ctx):
+    return lambda: find_recipes(ctx.session, diet_type="Veg", max_cost_per_serving=60)
+
+
+@benchmark("db.get_all_workouts", scaled=True)
+def _all_workouts(ctx):
+    return lambda: get_all_workouts(ctx.session)
+
+
+def _fresh_weeks(user_id_start):
+    """Yields (user_id, 100 consecutive dates) for user ids without logs (or a users row), one per call."""
+    for user_id in count(user_id_start):
+        start = date(2030, 1, 1)
+        yield user_id, [start + timedelta(days=d) for d in range(100)]
+
+
+@benchmark("db.log_weight_x100", scaled=True)
+def _log_weight_loop(ctx):
+    """Baseline for db.log_weights_bulk_100: the same 100 logs through log_weight, one transaction each."""
+    users = _fresh_weeks(10_000)
+
+    def run():
+        user_id, days = next(users)
+        for i, day in enumerate(days):
+            log_weight(ctx.session, user_id, 80 - i * 0.02, day)
+    return run
+
+
+@benchmark("db.log_weights_bulk_100", scaled=True)
+def _log_weights_bulk(ctx):
+    users = _fresh_weeks(20_000)
+
+    def run():
+        user_id, days = next(users)
+        log_weights_bulk(ctx.session, user_id, [(day, 80 - i * 0.02) for i, day in enumerate(days)])
+    return run
+
+
+@benchmark("db.get_weight_logs", scaled=True)
+def _weight_logs(ctx):
+    return lambda: get_weight_logs(ctx.session, 1)
+
+
+@benchmark("db.progress_chart", scaled=True)
+def _progress_chart_frame(ctx):
+    from benchmarks.loadtest import _progress_chart
+
+    return lambda: _progress_chart(ctx.session, 1)
+
+
+@benchmark("db.get_latest_weight_log", scaled=True)
+def _latest_weight(ctx):
+    return lambda: get_latest_weight_log(ctx.session, 1)
+
+
+@benchmark("db.get_latest_meal_plan", scaled=True)
+def _latest_plan(ctx):
+    return lambda: get_latest_meal_plan(ctx.session, 1)
+
+
+@benchmark("db.get_user_by_profile_code", scaled=True)
+def _user_by_code(ctx):
+    return lambda: get_user_by_profile_code(ctx.session, ctx.profile_code)
+
+
+@benchmark("pipeline.generate_and_save_meal_plan", scaled=True)
+def _meal_pipeline(ctx):
+    """Whole request path with the synthetic LLM: profile, metrics, recipe query, prompt, parse, insert."""
+    return lambda: generate_and_save_meal_plan(ctx.session, 1)
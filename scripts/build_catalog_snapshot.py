@@ -0,0 +1,22 @@
+"""Rebuild the memory-mapped catalog snapshot after changing recipes or workouts outside the load scripts.
+Run: uv run python -m scripts.build_catalog_snapshot"""
+from app import catalog_snapshot
+from app.database import SessionLocal
+
+
+def main():
+    db = SessionLocal()
+    try:
+        catalog_snapshot.refresh(db)
+        snapshot = catalog_snapshot.get_snapshot(db)
+        if snapshot is None:
+            print("Catalog snapshots are disabled (CATALOG_SNAPSHOT=0) or the directory is not writable.")
+            return
+        print(f"Catalog snapshot {snapshot.hash}: {len(snapshot.recipes)} recipes, "
+              f"{len(snapshot.workouts)} workouts in {snapshot.path}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""Generate a deterministic synthetic dataset for scale testing: users, recipes, workouts, multi-year weight logs,
+TDEE estimates and meal/workout plan histories, bulk-loaded in batches.
+Run from project root (point DATABASE_URL at a scratch database):
+    uv run python -m scripts.generate_synthetic_data --users 100000 --logs 10000000 [--recipes 5000] [--seed 0]
+
+The same seed and sizes always give the same rows: every user is drawn from its own seeded generator, so batch
+sizes do not change the output. Profiles use the choices of the profile form in app/app.py. trend_kg and the
+tdee_estimates rows are computed here with the functions the services use, so the data reads as if it had been
+logged in the app. Rows are written with multi-row INSERTs (COPY on PostgreSQL with psycopg2), one transaction
+per batch of users.
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+
+from app import catalog_snapshot
+from app.ai_engine.adaptive_tdee import smooth_weight, update_estimate
+from app.ai_engine.calorie_engine import get_all_metrics
+from app.ai_engine.meal_plan_generator import SLOT_ORDER
+from app.database import Base, SessionLocal, engine
+import app.models  # noqa: F401  (register all tables)
+from app.models.meal_plan import MealPlan
+from app.models.progress_log import ProgressLog
+from app.models.recipes import Recipe
+from app.models.tdee_estimate import TdeeEstimate
+from app.models.user import User
+from app.models.workout import Workout
+from app.models.workout_plan import WorkoutPlan
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+# Last day of generated history; fixed so a seed always gives the same dataset
+END_DATE = date(2026, 1, 1)
+
+# Profile form choices (app/app.py) with rough shares for a student population
+GENDERS = [("Male", 0.52), ("Female", 0.45), ("Other", 0.03)]
+DIETS = [("Veg", 0.45), ("Non-veg", 0.45), ("Vegan", 0.10)]
+CUISINES = ["Indian", "Chinese", "Italian", "Mexican", "Thai", "Continental", "Mediterranean", "American",
+            "Greek", "French"]
+EQUIPMENT = [("None", 0.35), ("Yoga Mat", 0.2), ("Dumbbells", 0.12), ("Treadmill", 0.05),
+             ("Resistance Bands", 0.08), ("Gym Machine", 0.1), ("Full Gym", 0.1)]
+WORKOUT_MINUTES = [0, 15, 20, 30, 30, 30, 45, 45, 60, 60, 90, 120]
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Arjun", "Rohan", "Kabir", "Ishaan", "Rahul", "Siddharth", "Karan",
+               "Ananya", "Diya", "Isha", "Priya", "Sneha", "Aditi", "Meera", "Kavya", "Riya", "Tanvi", "Sam", "Alex",
+               "Noah", "Liam", "Emma", "Olivia", "Mia", "Zara", "Omar", "Fatima", "Wei", "Mei", "Yuki", "Lucas"]
+
+# Share of the day's calories per meal slot, in SLOT_ORDER order
+SLOT_SHARES = [0.05, 0.2, 0.1, 0.27, 0.1, 0.23, 0.05]
+GROCERIES = [
+    ("Rice", "1 kg", 70, "yes"), ("Atta", "1 kg", 50, "yes"), ("Toor Dal", "500g", 80, "yes"),
+    ("Cooking Oil", "1 litre", 180, "yes"), ("Salt", "200g", 20, "yes"), ("Turmeric", "50g", 30, "yes"),
+    ("Milk", "3 litre", 180, "no"), ("Curd", "500g", 60, "no"), ("Onion", "1 kg", 40, "no"),
+    ("Tomato", "1 kg", 40, "no"), ("Banana", "12 pieces", 60, "no"), ("Eggs", "12 pieces", 84, "no"),
+    ("Paneer", "200g", 90, "no"), ("Spinach", "500g", 40, "no"), ("Oats", "500g", 90, "yes"),
+    ("Peanuts", "250g", 50, "yes"), ("Bread", "1 loaf", 45, "no"), ("Chicken", "500g", 160, "no"),
+]
+RECIPE_VARIANTS = ["Home Style", "Quick", "High Protein", "Light", "Spicy", "Hostel", "One Pot", "Meal Prep",
+                   "Budget", "Masala"]
+
+
+def _weighted(rng, choices):
+    return rng.choices([c for c, _ in choices], weights=[w for _, w in choices])[0]
+
+
+# Profile codes hold the seed in two digits (see _profile_code)
+MAX_SEED = 99
+
+
+def _profile_code(seed, index):
+    # Twelve characters, so never equal to an eight-character code from user_service
+    if not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"seed must be 0-{MAX_SEED}, got {seed}")
+    return f"S{seed:02d}{index:09d}"
+
+
+def _read_csv(name):
+    with open(DATA_DIR / name, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def make_recipes(n, seed):
+    """n recipe rows: the data/recipes.csv rows first, then variants of them with perturbed macros and cost."""
+    rng = random.Random(f"{seed}:recipes")
+    base = _read_csv("recipes.csv")
+    rows = []
+    for i in range(n):
+        src = base[i % len(base)] if i < len(base) else rng.choice(base)
+        scale = 1.0 if i < len(base) else rng.uniform(0.85, 1.15)
+        name = src["name"].strip()
+        if i >= len(base):
+            name = f"{name} ({rng.choice(RECIPE_VARIANTS)} #{i // len(base)})"
+        rows.append({
+            "name": name,
+            "calories_per_serving": round(float(src["calories"]) * scale),
+            "protein_g": round(float(src["protein_g"]) * scale, 1),
+            "carbs_g": round(float(src["carbs_g"]) * scale, 1),
+            "fat_g": round(float(src["fat_g"]) * scale, 1),
+            # Stored lower-case, as scripts/load_recipes.py does
+            "diet_type": src["diet_type"].strip().lower(),
+            "cost_per_serving": float(round(float(src["cost_per_serving"]) * rng.uniform(0.75, 1.25))),
+            "cuisine": src["cuisine"].strip() or None,
+            "meal_type": src["meal_type"].strip() or None,
+            "ingredients": src["ingredients"].strip() or None,
+            "instructions": src["preparation_steps"].strip() or None,
+        })
+    return rows
+
+
+def make_workouts(n, seed):
+    """n workout rows: the data/workouts.csv rows first, then variants with perturbed calorie burn."""
+    rng = random.Random(f"{seed}:workouts")
+    base = _read_csv("workouts.csv")
+    rows = []
+    for i in range(n):
+        src = base[i % len(base)] if i < len(base) else rng.choice(base)
+        name = src["exercise_name"].strip()
+        if i >= len(base):
+            name = f"{name} (Variation {i // len(base)})"
+        rows.append({
+            "exercise_name": name,
+            "category": src["category"],
+            "calories_burn_per_30min": float(round(float(src["calories_burn_per_30min"])
+                                                   * (1.0 if i < len(base) else rng.uniform(0.85, 1.15)))),
+            "difficulty": src["difficulty"],
+            "goal": src["goal"],
+            "equipment_required": src["equipment_required"],
+            "suggested_instructions": src["suggested_instructions"].strip() or None,
+        })
+    return rows
+
+
+def make_user(seed, index):
+    """One profile as the create-profile form would save it (plus its per-user generator)."""
+    rng = random.Random(f"{seed}:user:{index}")
+    gender = _weighted(rng, GENDERS)
+    age = rng.randint(17, 24) if rng.random() < 0.75 else rng.randint(25, 45)
+    mean_height = {"Male": 172, "Female": 159}.get(gender, 166)
+    height_cm = float(min(max(round(rng.gauss(mean_height, 7)), 145), 205))
+    bmi = min(max(rng.gauss(23.0, 4.0), 16.0), 42.0)
+    weight_kg = min(max(round(bmi * (height_cm / 100) ** 2 * 2) / 2, 35.0), 180.0)
+    if bmi > 25:
+        goal = "Weight Loss" if rng.random() < 0.75 else "Maintain Weight"
+    elif bmi < 20:
+        goal = "Muscle Gain" if rng.random() < 0.6 else "Maintain Weight"
+    else:
+        goal = rng.choice(["Weight Loss", "Maintain Weight", "Muscle Gain"])
+    name = rng.choice(FIRST_NAMES)
+    return rng, {
+        "profile_code": _profile_code(seed, index),
+        "name": name,
+        "age": age,
+        "gender": gender,
+        "height_cm": height_cm,
+        "weight_kg": weight_kg,
+        "goal": goal,
+        "dietary_preference": _weighted(rng, DIETS),
+        "cuisine": "Any" if rng.random() < 0.4 else rng.choice(CUISINES),
+        "budget": float(min(max(round(rng.lognormvariate(math.log(900), 0.45) / 50) * 50, 200), 5000)),
+        "equipment": _weighted(rng, EQUIPMENT),
+        "workout_minutes_per_day": rng.choice(WORKOUT_MINUTES),
+        "email": f"{name.lower()}.{seed}.{index}@example.com" if rng.random() < 0.35 else None,
+    }
+
+
+def make_history(rng, user, n_logs, years, end):
+    """
+    (logged_at, weight_kg) pairs, oldest first: n_logs days (fewer if they do not fit in the window) spread over
+    a stretch of days set by how regularly this user logs, ending at `end` or earlier for users who stopped.
+    Weight follows the goal toward a plateau, plus a seasonal swing and day-to-day scale noise.
+    """
+    adherence = rng.uniform(0.15, 0.95)
+    window = int(years * 365)
+    span = min(window, max(1, math.ceil(n_logs / adherence)))
+    n_logs = min(n_logs, span)
+    stopped_early = rng.random() < 0.4
+    last = end - timedelta(days=rng.randint(0, window - span) if stopped_early else rng.randint(0, 7))
+    first = last - timedelta(days=span - 1)
+    offsets = sorted(rng.sample(range(span), n_logs))
+    w0 = user["weight_kg"]
+    if user["goal"] == "Weight Loss":
+        change, rate = -w0 * rng.uniform(0.03, 0.15), rng.uniform(0.03, 0.1)
+    elif user["goal"] == "Muscle Gain":
+        change, rate = rng.uniform(1.5, 6.0), rng.uniform(0.01, 0.03)
+    else:
+        change, rate = rng.gauss(0, 1.5), 0.01
+    tau = max(abs(change) / rate, 1.0)
+    phase = rng.uniform(0, 2 * math.pi)
+    history = []
+    for offset in offsets:
+        day = first + timedelta(days=offset)
+        weight = w0 + change * (1 - math.exp(-offset / tau))
+        weight += 0.7 * math.sin(2 * math.pi * day.timetuple().tm_yday / 365 + phase) + rng.gauss(0, 0.5)
+        history.append((day, round(min(max(weight, 30.0), 300.0), 1)))
+    return history
+
+
+def make_meal_plan(rng, recipes, calorie_target, budget, start):
+    days = []
+    for d in range(7):
+        meals = []
+        for (slot, label), share in zip(SLOT_ORDER, SLOT_SHARES):
+            name, ingredients = rng.choice(recipes)
+            meals.append({
+                "slot": slot,
+                "time": label.split("(")[-1].rstrip(")"),
+                "name": name,
+                "recipe_detail": f"Ingredients: {ingredients}. Method: prepare, cook and serve warm.",
+                "calories": round(calorie_target * share),
+            })
+        days.append({"day": d + 1, "date": (start + timedelta(days=d)).isoformat(), "meals": meals,
+                     "grocery_list": []})
+    groceries = rng.sample(GROCERIES, k=12)
+    return {
+        "days": days,
+        "weekly_grocery_list": [f"{n} | {q} | {c} | {r}" for n, q, c, r in groceries],
+        "total_weekly_cost": round(min(budget * 0.9, sum(c for _, _, c, _ in groceries))),
+    }
+
+
+def make_workout_plan(rng, workouts, minutes):
+    per_day = max(1, min(len(workouts), minutes // 10, 6))
+    return {"days": [
+        {"day": d + 1, "exercises": [
+            {"exercise_id": workout_id, "name": name, "instructions": instructions,
+             "duration_min": minutes // per_day}
+            for workout_id, name, instructions in rng.sample(workouts, per_day)
+        ] if minutes else []}
+        for d in range(7)
+    ]}
+
+
+class Catalog:
+    """What plans pick from, grouped the way the generators filter it (diet; goal + equipment)."""
+
+    def __init__(self, session):
+        self.recipes, self.workouts = {}, {}
+        self.all_recipes, self.all_workouts = [], []
+        for name, diet, ingredients in session.execute(
+                select(Recipe.name, Recipe.diet_type, Recipe.ingredients).order_by(Recipe.id)):
+            entry = (name, (ingredients or name)[:160])
+            self.all_recipes.append(entry)
+            self.recipes.setdefault((diet or "").lower(), []).append(entry)
+        for row in session.execute(select(Workout.id, Workout.exercise_name, Workout.goal, Workout.equipment_required,
+                                          Workout.suggested_instructions).order_by(Workout.id)):
+            entry = (row.id, row.exercise_name, row.suggested_instructions or "")
+            self.all_workouts.append(entry)
+            self.workouts.setdefault((row.goal, row.equipment_required), []).append(entry)
+            self.workouts.setdefault((None, row.equipment_required), []).append(entry)
+
+    def recipes_for(self, diet):
+        return self.recipes.get(diet.lower()) or self.all_recipes
+
+    def workouts_for(self, goal, equipment):
+        return self.workouts.get((goal, equipment)) or self.workouts.get((None, equipment)) or self.all_workouts
+
+
+def _insert(session, table, rows, use_copy):
+    if not rows:
+        return
+    if use_copy:
+        columns = list(rows[0])
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow(["" if row[c] is None else row[c] for c in columns])
+        buf.seek(0)
+        cursor = session.connection().connection.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+        return
+    session.execute(table.insert(), rows)
+
+
+def generate_users(session, args, catalog, use_copy):
+    """Users in batches of args.batch_users, each with logs, plans and a TDEE estimate; one commit per batch."""
+    mean_logs = args.logs / args.users if args.users else 0
+    totals = {"users": 0, "logs": 0, "meal_plans": 0, "workout_plans": 0}
+    started = time.perf_counter()
+    for batch_start in range(0, args.users, args.batch_users):
+        indexes = range(batch_start, min(batch_start + args.batch_users, args.users))
+        drawn = [make_user(args.seed, i) for i in indexes]
+        histories, plans = [], []
+        for rng, user in drawn:
+            n_logs = max(1, round(mean_logs * rng.lognormvariate(-0.5, 1.0))) if mean_logs else 0
+            history = make_history(rng, user, n_logs, args.years, args.end) if n_logs else []
+            first_day = history[0][0] if history else args.end - timedelta(days=rng.randint(0, int(args.years * 365)))
+            user["created_at"] = datetime.combine(first_day, datetime.min.time()) + timedelta(
+                seconds=rng.randint(6 * 3600, 23 * 3600))
+            histories.append(history)
+            # Plans are regenerated every few weeks while the user is active
+            span = max(1, ((history[-1][0] if history else first_day) - first_day).days)
+            n_plans = max(1, round(args.plans_per_user * rng.uniform(0.25, 1.75))) if args.plans_per_user else 0
+            plans.append(sorted(user["created_at"] + timedelta(seconds=rng.randint(0, span * 86400))
+                                for _ in range(n_plans)))
+        user_rows = [user for _, user in drawn]
+        inserted = session.execute(User.__table__.insert().returning(User.id, User.profile_code), user_rows).all()
+        ids = {code: user_id for user_id, code in inserted}
+
+        log_rows, meal_rows, workout_rows, tdee_rows = [], [], [], []
+        for (rng, user), history, plan_times in zip(drawn, histories, plans):
+            user_id = ids[user["profile_code"]]
+            profile = SimpleNamespace(**user)
+            prev = None
+            for logged_at, weight in history:
+                trend = float(weight) if prev is None else smooth_weight(prev[1], weight, (logged_at - prev[0]).days)
+                prev = (logged_at, trend)
+                log_rows.append({"user_id": user_id, "weight_kg": weight, "trend_kg": trend, "logged_at": logged_at,
+                                 "created_at": datetime.combine(logged_at, datetime.min.time())
+                                 + timedelta(seconds=rng.randint(6 * 3600, 10 * 3600))})
+            intake = None
+            for k, created_at in enumerate(plan_times):
+                # Roughly alternate: most users generate both plan kinds
+                if k % 2 == 0 or rng.random() < 0.2:
+                    weight = next((w for d, w in reversed(history) if d <= created_at.date()), user["weight_kg"])
+                    intake = get_all_metrics(profile, weight_kg_override=weight)["calorie_target"]
+                    plan = make_meal_plan(rng, catalog.recipes_for(user["dietary_preference"]), intake,
+                                          user["budget"], created_at.date() + timedelta(days=1))
+                    meal_rows.append({"user_id": user_id, "calorie_target": float(intake),
+                                      "plan_json": json.dumps(plan), "weekly_cost": float(plan["total_weekly_cost"]),
+                                      "created_at": created_at})
+                elif catalog.all_workouts:
+                    plan = make_workout_plan(rng, catalog.workouts_for(user["goal"], user["equipment"]),
+                                             user["workout_minutes_per_day"])
+                    workout_rows.append({"user_id": user_id, "plan_json": json.dumps(plan), "created_at": created_at})
+            if history:
+                # The fold update_tdee_estimate_bulk runs, against the latest meal plan's target
+                state = {}
+                for logged_at, weight in history:
+                    metrics = get_all_metrics(profile, weight_kg_override=float(weight))
+                    state = update_estimate(state, weight, logged_at, intake if intake is not None
+                                            else metrics["calorie_target"], metrics["tdee"])
+                tdee_rows.append({"user_id": user_id, **state,
+                                  "updated_at": datetime.combine(history[-1][0], datetime.min.time())})
+
+        _insert(session, ProgressLog.__table__, log_rows, use_copy)
+        _insert(session, MealPlan.__table__, meal_rows, use_copy)
+        _insert(session, WorkoutPlan.__table__, workout_rows, use_copy)
+        _insert(session, TdeeEstimate.__table__, tdee_rows, use_copy)
+        session.commit()
+        totals["users"] += len(user_rows)
+        totals["logs"] += len(log_rows)
+        totals["meal_plans"] += len(meal_rows)
+        totals["workout_plans"] += len(workout_rows)
+        elapsed = time.perf_counter() - started
+        print(f"  {totals['users']:,}/{args.users:,} users, {totals['logs']:,} logs "
+              f"({totals['logs'] / elapsed:,.0f} logs/s)", flush=True)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000, help="Users to add")
+    parser.add_argument("--logs", type=int, default=100_000, help="Weight logs to add, about (spread unevenly)")
+    parser.add_argument("--plans-per-user", type=float, default=4, help="Average meal + workout plans per user")
+    parser.add_argument("--recipes", type=int, default=0, help="Recipes to add (data/recipes.csv rows, then variants)")
+    parser.add_argument("--workouts", type=int, default=0, help="Workouts to add (data/workouts.csv rows, then variants)")
+    parser.add_argument("--years", type=float, default=3, help="Length of the logging window")
+    parser.add_argument("--end", type=date.fromisoformat, default=END_DATE, help="Last day of the window (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=0, help=f"0-{MAX_SEED}; part of every generated profile code")
+    parser.add_argument("--batch-users", type=int, default=1000, help="Users written per transaction")
+    parser.add_argument("--no-copy", action="store_true", help="Use INSERTs on PostgreSQL instead of COPY")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first (deletes all data)")
+    args = parser.parse_args()
+    if not 0 <= args.seed <= MAX_SEED:
+        parser.error(f"--seed must be between 0 and {MAX_SEED} (it is encoded in the users' profile codes)")
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2" and not args.no_copy
+    db = SessionLocal()
+    try:
+        prefix = _profile_code(args.seed, 0)[:3]
+        if args.users and db.scalar(select(func.count()).where(User.profile_code.like(f"{prefix}%"))):
+            raise SystemExit(f"Users for seed {args.seed} already exist; pass --reset or another --seed.")
+        started = time.perf_counter()
+        if args.recipes or args.workouts:
+            _insert(db, Recipe.__table__, make_recipes(args.recipes, args.seed), use_copy)
+            _insert(db, Workout.__table__, make_workouts(args.workouts, args.seed), use_copy)
+            db.commit()
+            print(f"Added {args.recipes:,} recipes and {args.workouts:,} workouts.")
+        catalog = Catalog(db)
+        if args.users and args.plans_per_user and not catalog.all_recipes:
+            raise SystemExit("No recipes to build plans from: load the catalog first or pass --recipes.")
+        totals = generate_users(db, args, catalog, use_copy)
+        if args.recipes or args.workouts:
+            # Rebuild the memory-mapped catalog snapshot and tell other workers to reopen it
+            catalog_snapshot.refresh(db)
+        print(f"Added {totals['users']:,} users, {totals['logs']:,} weight logs, {totals['meal_plans']:,} meal plans "
+              f"and {totals['workout_plans']:,} workout plans in {time.perf_counter() - started:,.1f} s.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
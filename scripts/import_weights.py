@@ -0,0 +1,38 @@
+"""Import a weight history export (CSV, JSON array or JSON Lines) into one user's progress logs.
+Run from project root: uv run python -m scripts.import_weights --profile-code CODE export.csv [--unit lb]"""
+import argparse
+
+from app.database import SessionLocal
+from app.services.user_service import get_user_by_profile_code
+from app.services.weight_import_service import DEFAULT_CHUNK_SIZE, WeightImportError, import_weight_history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", help="Export file")
+    parser.add_argument("--profile-code", required=True, help="Profile code of the user to import into")
+    parser.add_argument("--format", choices=("csv", "json"), help="File format (default: detected)")
+    parser.add_argument("--unit", choices=("kg", "lb"), help="Weight unit when the file does not say (default: kg)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows written per INSERT")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = get_user_by_profile_code(db, args.profile_code)
+        if user is None:
+            raise SystemExit(f"No user with profile code {args.profile_code!r}")
+        with open(args.path, "rb") as f:
+            try:
+                stats = import_weight_history(db, user.id, f, args.format, args.unit, args.chunk_size)
+            except WeightImportError as e:
+                raise SystemExit(f"Cannot import {args.path}: {e}")
+        print(f"Read {stats['read']:,} records: {stats['imported']:,} imported, {stats['duplicates']:,} duplicates, "
+              f"{stats['invalid']:,} invalid")
+        if stats["imported"]:
+            print(f"Imported days {stats['first']} to {stats['last']}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ from urllib.parse import urlparse
 
 from app.config import DATABASE_URL
 from app.database import engine, Base
-from app.models import users, meal_plan, workout_plan, progress_log, recipes, workout
+from app.models import users, meal_plan, workout_plan, progress_log, recipes, workout, pantry_item, grocery_acceptance, tdee_estimate, generation_job, llm_usage, bootstrap_marker
 
 # Show which database we're using (so you can find it in pgAdmin)
 db_name = (urlparse(DATABASE_URL).path or "/").lstrip("/") or "postgres"
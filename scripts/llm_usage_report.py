@@ -0,0 +1,41 @@
+"""Print LLM usage from the llm_usage ledger: totals, latency, parse failures and the most expensive users.
+Run from project root: uv run python -m scripts.llm_usage_report [--days 7]"""
+import argparse
+
+from app.database import SessionLocal
+from app.services.llm_usage_service import (
+    cost_per_user, days_ago, latency_percentiles, parse_failure_rate, usage_totals,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=float, default=7, help="Reporting window in days")
+    parser.add_argument("--top", type=int, default=10, help="How many users to list")
+    args = parser.parse_args()
+    since = days_ago(args.days)
+
+    db = SessionLocal()
+    try:
+        t = usage_totals(db, since)
+        print(f"Last {args.days:g} days: {t['calls']} calls, {t['ok']} ok, {t['parse_failed']} parse failures, "
+              f"{t['rate_limited']} rate limited, {t['errors']} errors")
+        print(f"Tokens: {t['prompt_tokens']:,} prompt / {t['output_tokens']:,} output; cost ${t['cost_usd']:.4f}")
+        for kind in (None, "meal", "workout"):
+            lat = latency_percentiles(db, since, kind)
+            if lat:
+                label = kind or "all"
+                print(f"Latency ({label}): " + ", ".join(f"{k} {v / 1000:.2f} s" for k, v in lat.items()))
+        for kind, r in parse_failure_rate(db, since).items():
+            print(f"Parse failures ({kind}): {r['parse_failed']}/{r['responses']} ({r['rate']:.1%})")
+        print("Top users by cost:")
+        for r in cost_per_user(db, since, args.top):
+            who = f"user {r['user_id']}" if r["user_id"] is not None else "untracked"
+            print(f"  {who}: {r['calls']} calls, {r['prompt_tokens'] + r['output_tokens']:,} tokens, "
+                  f"${r['cost_usd']:.4f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
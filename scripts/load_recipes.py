@@ -2,6 +2,7 @@
 import csv
 from pathlib import Path
 
+from app import catalog_snapshot
 from app.database import SessionLocal
 from app.models.recipes import Recipe
 
@@ -37,6 +38,8 @@ def main():
                 db.add(recipe)
                 count += 1
             db.commit()
+        # Rebuild the memory-mapped catalog snapshot and tell other workers to reopen it
+        catalog_snapshot.refresh(db)
         print(f"Loaded {count} recipes into the database.")
     finally:
         db.close()
@@ -1,6 +1,7 @@
 import csv
 from pathlib import Path
 
+from app import catalog_snapshot
 from app.database import SessionLocal
 from app.models.workout import Workout
 
@@ -46,6 +47,7 @@ def load_workouts():
                     print(f"Skipping row due to error: {e}")
 
             db.commit()
+        catalog_snapshot.refresh(db)
 
         print(f"Loaded {count} workouts into database.")
 
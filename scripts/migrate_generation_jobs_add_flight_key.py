@@ -0,0 +1,26 @@
+"""One-time migration: add flight_key (single-flight dedupe key) to generation_jobs.
+Run if you already have a generation_jobs table: uv run python -m scripts.migrate_generation_jobs_add_flight_key"""
+from sqlalchemy import text
+
+from app.database import engine
+
+
+def main():
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("ALTER TABLE generation_jobs ADD COLUMN IF NOT EXISTS flight_key VARCHAR(100)"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_generation_jobs_flight_key ON generation_jobs (flight_key)"
+            ))
+            conn.commit()
+            print("Added column: flight_key")
+        except Exception as e:
+            if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                print("Column flight_key already exists, skipping.")
+            else:
+                raise
+    print("Migration done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""One-time migration: scope generation_jobs.idempotency_key to (user_id, kind) instead of the whole table.
+Run if you already have a generation_jobs table: uv run python -m scripts.migrate_generation_jobs_idempotency_scope"""
+from sqlalchemy import text
+
+from app.database import engine
+
+
+def main():
+    with engine.connect() as conn:
+        # The old column-level UNIQUE constraint (PostgreSQL's default name for it)
+        conn.execute(text(
+            "ALTER TABLE generation_jobs DROP CONSTRAINT IF EXISTS generation_jobs_idempotency_key_key"
+        ))
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_generation_jobs_idempotency "
+            "ON generation_jobs (user_id, kind, idempotency_key)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_generation_jobs_idempotency_key ON generation_jobs (idempotency_key)"
+        ))
+        conn.commit()
+        print("idempotency_key is now unique per (user_id, kind).")
+    print("Migration done.")
+
+
+if __name__ == "__main__":
+    main()
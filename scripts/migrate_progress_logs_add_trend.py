@@ -0,0 +1,46 @@
+"""One-time migration: add trend_kg to progress_logs and backfill it from existing logs.
+Run if you already have a progress_logs table: uv run python -m scripts.migrate_progress_logs_add_trend"""
+from sqlalchemy import text
+
+from app.database import engine
+from app.ai_engine.adaptive_tdee import smooth_weight
+
+
+def main():
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("ALTER TABLE progress_logs ADD COLUMN IF NOT EXISTS trend_kg FLOAT"))
+            conn.commit()
+            print("Added column: trend_kg")
+        except Exception as e:
+            if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                print("Column trend_kg already exists, skipping.")
+            else:
+                raise
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_progress_logs_user_date ON progress_logs (user_id, logged_at)"
+        ))
+        conn.commit()
+
+        # Backfill: one ordered pass over all logs, carrying the trend per user
+        rows = conn.execute(text(
+            "SELECT id, user_id, weight_kg, logged_at FROM progress_logs ORDER BY user_id, logged_at, id"
+        )).fetchall()
+        updates = []
+        prev_user, prev_trend, prev_date = None, None, None
+        for log_id, user_id, weight_kg, logged_at in rows:
+            if user_id != prev_user:
+                prev_user, prev_trend, prev_date = user_id, None, None
+            days = (logged_at - prev_date).days if prev_date is not None else 0
+            prev_trend = smooth_weight(prev_trend, weight_kg, days)
+            prev_date = logged_at
+            updates.append({"trend": prev_trend, "id": log_id})
+        if updates:
+            conn.execute(text("UPDATE progress_logs SET trend_kg = :trend WHERE id = :id"), updates)
+            conn.commit()
+        print(f"Backfilled trend_kg for {len(updates)} log(s).")
+    print("Migration done.")
+
+
+if __name__ == "__main__":
+    main()
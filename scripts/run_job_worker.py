@@ -0,0 +1,56 @@
+"""Run a standalone plan-generation worker that drains queued jobs from the database.
+Start one or more per host: uv run python -m scripts.run_job_worker [--threads 4]"""
+import argparse
+import threading
+import time
+
+from app.database import SessionLocal
+from app.services.job_service import claim_next_job, requeue_stale_jobs
+from app.services.job_runner import execute_claimed_job
+
+POLL_SECONDS = 1.0
+
+
+def worker_loop(stop):
+    db = SessionLocal()
+    try:
+        while not stop.is_set():
+            job = claim_next_job(db)
+            if job is None:
+                stop.wait(POLL_SECONDS)
+                continue
+            print(f"Running job {job.id} ({job.kind} plan for user {job.user_id})")
+            execute_claimed_job(db, job)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        requeued = requeue_stale_jobs(db)
+        if requeued:
+            print(f"Requeued {requeued} stale job(s).")
+    finally:
+        db.close()
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=worker_loop, args=(stop,), daemon=True) for _ in range(args.threads)]
+    for t in threads:
+        t.start()
+    print(f"Worker started with {args.threads} thread(s). Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+if __name__ == "__main__":
+    main()
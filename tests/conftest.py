@@ -0,0 +1,11 @@
+"""Point the app at a throwaway SQLite database before any app module is imported."""
+import os
+import tempfile
+from pathlib import Path
+
+_TMP = Path(tempfile.mkdtemp(prefix="student_fit_tests_"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP / 'test.db'}"
+os.environ.setdefault("GEMINI_API_KEY", "offline-tests")
+os.environ["CATALOG_SNAPSHOT_DIR"] = str(_TMP / "catalog_snapshot")
+os.environ["LLM_BACKEND"] = "synthetic"
+os.environ["LLM_USAGE_LEDGER"] = "0"
@@ -0,0 +1,43 @@
+"""Latest-plan endpoints: stored plan_json is validated before it is served."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.main import app
+from app.bootstrap import ensure_ready
+from app.database import SessionLocal
+from app.models.meal_plan import MealPlan
+
+USER_ID = 9100
+
+
+@pytest.fixture
+def client():
+    ensure_ready()
+    return TestClient(app)
+
+
+def store_plan(plan_json):
+    # Written directly, like rows from before the services validated on insert
+    session = SessionLocal()
+    try:
+        session.add(MealPlan(user_id=USER_ID, calorie_target=2000, plan_json=plan_json, weekly_cost=700))
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_valid_plan_is_served_verbatim(client):
+    store_plan('{"days": [], "total_weekly_cost": 700}')
+    response = client.get(f"/users/{USER_ID}/meal-plan/latest")
+    assert response.status_code == 200
+    assert response.json()["plan"] == {"days": [], "total_weekly_cost": 700}
+    assert client.get(f"/users/{USER_ID}/meal-plan/latest/summary").json()["summary"]["num_days"] == 0
+
+
+@pytest.mark.parametrize("plan_json", ['{"days": [', '{"days": []} }', "[1, 2]", "not json"])
+def test_corrupt_plan_is_an_error_not_broken_json(client, plan_json):
+    store_plan(plan_json)
+    for path in ("latest", "latest/summary"):
+        response = client.get(f"/users/{USER_ID}/meal-plan/{path}")
+        assert response.status_code == 500
+        assert "not a valid JSON object" in response.json()["detail"]
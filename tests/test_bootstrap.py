@@ -0,0 +1,58 @@
+"""Bootstrap: concurrent starters run the steps once; the marker check never ends the lock's transaction."""
+import threading
+
+from sqlalchemy import text
+
+from app import bootstrap
+from app.database import SessionLocal, engine
+
+
+def drop_marker_table():
+    bootstrap.ensure_ready()
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE bootstrap_markers"))
+
+
+def test_missing_marker_table_does_not_roll_back(monkeypatch):
+    drop_marker_table()
+    session = SessionLocal()
+    rollbacks = []
+    monkeypatch.setattr(session, "rollback", lambda: rollbacks.append(1))
+    try:
+        assert not bootstrap._marker_current(session)
+        assert rollbacks == []
+    finally:
+        session.close()
+        restore = SessionLocal()
+        bootstrap._run_steps(restore)
+        restore.close()
+
+
+def test_second_waiter_skips_the_steps(monkeypatch):
+    drop_marker_table()
+    runs = []
+    real_steps = bootstrap._run_steps
+    started = threading.Barrier(2)
+
+    def counted_steps(session):
+        runs.append(threading.current_thread().name)
+        real_steps(session)
+
+    monkeypatch.setattr(bootstrap, "_run_steps", counted_steps)
+    results = {}
+
+    def start():
+        session = SessionLocal()
+        try:
+            started.wait()
+            results[threading.current_thread().name] = bootstrap._run_once(session)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=start, name=f"worker-{i}") for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(runs) == 1
+    assert sorted(results.values()) == [False, True]
@@ -0,0 +1,36 @@
+"""Bulk plan writes: ids in input order, and malformed plan_json rejected like the single-row path."""
+import json
+
+import pytest
+
+from app.bootstrap import ensure_ready
+from app.database import SessionLocal
+from app.models.workout_plan import WorkoutPlan
+from app.services.bulk_write_service import create_plans_bulk
+
+USER_ID = 9200
+
+
+@pytest.fixture
+def session():
+    ensure_ready()
+    db = SessionLocal()
+    yield db
+    db.close()
+
+
+def test_ids_follow_input_order(session):
+    plans = [{"user_id": USER_ID, "plan_json": {"n": i}} for i in range(5)]
+    ids = create_plans_bulk(session, "workout", plans)
+    stored = {p.id: json.loads(p.plan_json)["n"] for p in session.query(WorkoutPlan).filter(WorkoutPlan.id.in_(ids))}
+    assert [stored[i] for i in ids] == list(range(5))
+
+
+def test_malformed_plan_json_writes_nothing(session):
+    before = session.query(WorkoutPlan).filter(WorkoutPlan.user_id == USER_ID + 1).count()
+    with pytest.raises(ValueError):
+        create_plans_bulk(session, "workout", [
+            {"user_id": USER_ID + 1, "plan_json": '{"days": []}'},
+            {"user_id": USER_ID + 1, "plan_json": '{"days": ['},
+        ])
+    assert session.query(WorkoutPlan).filter(WorkoutPlan.user_id == USER_ID + 1).count() == before
@@ -0,0 +1,30 @@
+"""Shared cache: backend errors are misses, never request failures."""
+import sqlite3
+
+from app import cache
+
+
+def locked(*_args):
+    raise sqlite3.OperationalError("database is locked")
+
+
+def test_backend_errors_fail_open(tmp_path):
+    store = cache.SqliteCache(tmp_path / "cache.sqlite3", version_poll_s=0)
+    store.set("plans", "meal:1", {"days": 3})
+    assert store.get("plans", "meal:1") == {"days": 3}
+
+    store._load = store._store = store._read_versions = locked
+    assert store.get("plans", "meal:1", "miss") == "miss"
+    store.set("plans", "meal:2", {"days": 5})
+    assert store.stats()["errors"] == 3
+    assert store.stats()["sets"] == 1
+
+
+def test_unopenable_backend_falls_back_to_null_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("CACHE_SQLITE_PATH", str(tmp_path / "missing" / "cache.sqlite3"))
+    previous = cache.set_cache(None)
+    try:
+        assert isinstance(cache.get_cache(), cache.NullCache)
+    finally:
+        cache.set_cache(previous)
@@ -0,0 +1,88 @@
+"""Batch calorie metrics match the scalar functions exactly, including rounding ties."""
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ai_engine.calorie_engine import (
+    estimate_weeks_to_weight,
+    get_all_metrics,
+    get_all_metrics_batch,
+    get_all_metrics_frame,
+    healthy_bmi_range_kg,
+    ideal_weight_kg,
+)
+
+GENDERS = ["Male", "Female", " male ", "M", "f", "", None, "Other"]
+GOALS = ["Weight Loss", "Lose Weight", "Muscle Gain", "Gain Muscle", "Maintain Weight", " LOSS ", "", None, "tone up"]
+
+
+def random_profiles(n, seed):
+    rng = np.random.default_rng(seed)
+    weight = np.round(rng.uniform(35, 140, n), 1)
+    height = np.round(rng.uniform(140, 205, n) * 2) / 2
+    # Height 100 cm makes BMI equal the weight, so x.x5 weights are BMI rounding ties (most are not exactly
+    # representable, which is where scaling by 10 and np.round alone goes wrong)
+    ties = rng.random(n) < 0.2
+    height[ties] = 100.0
+    weight[ties] = rng.integers(300, 1200, ties.sum()) / 10 + 0.05
+    weight[rng.random(n) < 0.03] = 0  # missing: the default applies
+    age = rng.integers(16, 60, n).astype(float)
+    age[rng.random(n) < 0.03] = np.nan
+    gender = rng.choice(np.array(GENDERS, dtype=object), n)
+    goal = rng.choice(np.array(GOALS, dtype=object), n)
+    factor = rng.choice([1.2, 1.375, 1.4, 1.55, 1.725, 1.9], n)
+    target = np.round(rng.uniform(40, 110, n), 1)
+    return weight, height, age, gender, goal, factor, target
+
+
+def scalar_metrics(weight, height, age, gender, goal, factor, target):
+    # Python floats, as loaded from the database (round() on NumPy floats rounds differently)
+    weight, height, age, factor = float(weight), float(height), float(age), float(factor)
+    target = None if target is None else float(target)
+    user = SimpleNamespace(weight_kg=weight, height_cm=height, age=None if math.isnan(age) else age,
+                           gender=gender, goal=goal)
+    m = get_all_metrics(user, activity_factor=factor)
+    weight, height = weight or 70, height or 170
+    ideal = ideal_weight_kg(height)
+    low, high = healthy_bmi_range_kg(height)
+    weeks, message = estimate_weeks_to_weight(
+        weight, ideal if target is None else target, m["tdee"], m["calorie_target"], goal
+    )
+    return m, ideal, low, high, weeks, message
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("with_target", [False, True])
+def test_batch_matches_scalar_functions(seed, with_target):
+    weight, height, age, gender, goal, factor, target = random_profiles(2000, seed)
+    batch = get_all_metrics_batch(weight, height, age, gender, goal, activity_factor=factor,
+                                  target_kg=target if with_target else None)
+    for i in range(len(weight)):
+        m, ideal, low, high, weeks, message = scalar_metrics(
+            weight[i], height[i], age[i], gender[i], goal[i], factor[i], target[i] if with_target else None
+        )
+        row = {k: batch[k][i] for k in ("bmi", "bmr", "tdee", "calorie_target")}
+        assert row == {k: m[k] for k in row}, i
+        assert (batch["ideal_weight_kg"][i], batch["healthy_min_kg"][i], batch["healthy_max_kg"][i]) == (ideal, low, high)
+        assert batch["weeks_message"][i] == message
+        if weeks is None:
+            assert math.isnan(batch["weeks_to_target"][i])
+        else:
+            assert batch["weeks_to_target"][i] == weeks
+
+
+def test_string_arrays_and_categoricals_agree():
+    weight, height, age, gender, goal, factor, _target = random_profiles(500, 3)
+    gender = np.array([g or "" for g in gender])
+    goal = np.array([g or "" for g in goal])
+    plain = get_all_metrics_batch(weight, height, age, gender, goal, activity_factor=factor)
+    frame = get_all_metrics_frame(pd.DataFrame({
+        "weight_kg": weight, "height_cm": height, "age": age, "activity_factor": factor,
+        "gender": pd.Categorical(gender), "goal": pd.Categorical(goal),
+    }))
+    for key in ("bmi", "bmr", "tdee", "calorie_target", "weeks_to_target"):
+        np.testing.assert_array_equal(plain[key], frame[key].to_numpy())
+    assert list(plain["weeks_message"]) == list(frame["weeks_message"])
@@ -0,0 +1,56 @@
+"""Catalog snapshot: workers reopen the snapshot a reload built instead of each rebuilding it."""
+import pytest
+
+from app import cache, catalog_snapshot
+from app.bootstrap import ensure_ready
+from app.database import SessionLocal
+from app.models.recipes import Recipe
+
+
+@pytest.fixture
+def session():
+    ensure_ready()
+    previous = cache.set_cache(cache.MemoryCache())
+    catalog_snapshot.reset()
+    db = SessionLocal()
+    yield db
+    db.close()
+    catalog_snapshot.reset()
+    cache.set_cache(previous)
+
+
+def expire_check():
+    catalog_snapshot._checked_at = -catalog_snapshot.CHECK_INTERVAL_S
+
+
+def count_builds(monkeypatch):
+    builds = []
+    real = catalog_snapshot.build_snapshot
+    monkeypatch.setattr(catalog_snapshot, "build_snapshot", lambda s: builds.append(1) or real(s))
+    return builds
+
+
+def test_invalidation_reopens_the_rebuilt_snapshot(session, monkeypatch):
+    first = catalog_snapshot.get_snapshot(session)
+    assert first is not None
+
+    # Another process reloads the catalog: it writes the new snapshot, then invalidates the namespace
+    session.add(Recipe(name="Snapshot test dal", calories_per_serving=320, diet_type="veg", cost_per_serving=40))
+    session.commit()
+    catalog_snapshot.build_snapshot(session)
+    cache.get_cache().invalidate(cache.CATALOG_NAMESPACE)
+
+    builds = count_builds(monkeypatch)
+    expire_check()
+    current = catalog_snapshot.get_snapshot(session)
+    assert current.hash != first.hash
+    assert builds == []
+
+
+def test_invalidation_without_a_new_snapshot_rebuilds(session, monkeypatch):
+    catalog_snapshot.get_snapshot(session)
+    builds = count_builds(monkeypatch)
+    cache.get_cache().invalidate(cache.CATALOG_NAMESPACE)
+    expire_check()
+    assert catalog_snapshot.get_snapshot(session) is not None
+    assert builds == [1]
@@ -0,0 +1,48 @@
+"""Downsampling: first and last points kept, sorted unique indices, and never more points than the budget."""
+import numpy as np
+import pytest
+
+from app.downsample import downsample_indices, lttb_indices, minmax_indices, point_budget
+
+
+def series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.integers(1, 4, n)).astype(float)  # uneven gaps, like missed weigh-in days
+    y = 80 + np.cumsum(rng.normal(0, 0.3, n))
+    return x, y
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("n", [5, 61, 500, 3001])
+@pytest.mark.parametrize("n_out", [4, 7, 60, 300])
+def test_indices_keep_ends_sorted_unique_within_budget(method, n, n_out):
+    x, y = series(n)
+    idx = downsample_indices(x, y, n_out, method=method)
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert np.all(np.diff(idx) > 0)  # sorted and unique
+    assert len(idx) <= min(n, n_out)
+
+
+@pytest.mark.parametrize("n_out", [50, 51, 1000])
+def test_budget_at_least_series_length_returns_everything(n_out):
+    x, y = series(50)
+    np.testing.assert_array_equal(lttb_indices(x, y, n_out), np.arange(50))
+    np.testing.assert_array_equal(minmax_indices(y, n_out), np.arange(50))
+
+
+def test_lttb_uses_the_whole_budget():
+    x, y = series(1000)
+    assert len(lttb_indices(x, y, 120)) == 120
+
+
+def test_minmax_keeps_the_extremes():
+    x, y = series(1000, seed=1)
+    idx = minmax_indices(y, 100)
+    assert int(y.argmin()) in idx and int(y.argmax()) in idx
+
+
+def test_point_budget():
+    assert point_budget(10_000, width_px=900) == 300
+    assert point_budget(100, width_px=900) == 100  # never more than the series has
+    assert point_budget(10_000, width_px=900, window_days=30) == 31  # at most one per day
+    assert point_budget(10_000, width_px=60) == 60  # min_points
@@ -0,0 +1,34 @@
+"""rank_calorie_targets: ranks the full-adherence scenario, and handles zero-week simulations."""
+import numpy as np
+import pytest
+
+from app.ai_engine.goal_simulator import rank_calorie_targets, simulate_trajectories
+
+TARGETS = [1500, 1800, 2100, 2600]
+
+
+def simulate(adherence_rates, weeks=40):
+    return simulate_trajectories([90.0, 60.0], [180, 165], [30, 25], [True, False], TARGETS,
+                                 adherence_rates=adherence_rates, weeks=weeks)
+
+
+def test_full_adherence_column_is_ranked_whatever_its_position():
+    expected = rank_calorie_targets(simulate([1.0]), TARGETS, [80.0, 55.0])
+    for rates in ([1.0, 0.5], [0.5, 1.0, 0.8]):
+        ranked, weeks = rank_calorie_targets(simulate(rates), TARGETS, [80.0, 55.0], adherence_rates=rates)
+        np.testing.assert_array_equal(ranked, expected[0])
+        np.testing.assert_array_equal(weeks, expected[1])
+    # 1500 kcal loses over 1 kg/week at 90 kg, so 1800 ranks first; 2600 never gets there
+    assert list(expected[0][0]) == [1800, 2100, 1500, 2600]
+
+
+def test_missing_full_adherence_is_an_error():
+    with pytest.raises(ValueError):
+        rank_calorie_targets(simulate([0.5, 0.8]), TARGETS, 80.0, adherence_rates=[0.5, 0.8])
+
+
+def test_zero_weeks_only_counts_users_already_at_target():
+    ranked, weeks = rank_calorie_targets(simulate([1.0], weeks=0), TARGETS, [90.0, 55.0])
+    assert ranked.shape == weeks.shape == (2, len(TARGETS))
+    np.testing.assert_array_equal(weeks[0], 0.0)  # the first user starts at 90 kg
+    assert np.isnan(weeks[1]).all()
@@ -0,0 +1,34 @@
+"""Idempotency keys are scoped to (user, kind), like the unique index that backs them."""
+import pytest
+
+from app.bootstrap import ensure_ready
+from app.database import SessionLocal
+from app.services.job_service import submit_job
+from app.services.user_service import create_user
+
+
+@pytest.fixture
+def session():
+    ensure_ready()
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def make_user(session, name):
+    return create_user(session, name, 30, "Female", 165, 60, "Maintain", "Vegetarian", 1500, "None", 30)
+
+
+def test_same_key_same_scope_returns_the_original_job(session):
+    user = make_user(session, "Idem A")
+    first = submit_job(session, user.id, "meal", "key-1")
+    assert submit_job(session, user.id, "meal", "key-1").id == first.id
+
+
+def test_same_key_in_another_scope_is_a_separate_job(session):
+    alice, bob = make_user(session, "Idem B"), make_user(session, "Idem C")
+    meal = submit_job(session, alice.id, "meal", "shared-key")
+    workout = submit_job(session, alice.id, "workout", "shared-key")
+    other_user = submit_job(session, bob.id, "meal", "shared-key")
+    assert len({meal.id, workout.id, other_user.id}) == 3
+    assert (other_user.user_id, other_user.kind, other_user.idempotency_key) == (bob.id, "meal", "shared-key")
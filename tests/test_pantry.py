@@ -0,0 +1,24 @@
+"""Grocery acceptance: a meal plan's list is applied to the pantry once, however often it is accepted."""
+from app.bootstrap import ensure_ready
+from app.database import SessionLocal
+from app.services.pantry_service import accept_grocery_list, get_pantry, is_grocery_list_accepted
+
+GROCERIES = [("Rice", "1 kg", 80.0, True), ("Spinach", "200 g", 30.0, False)]
+PLAN = {"days": [{"meals": [{"name": "Rice bowl", "recipe_detail": "rice, dal"}]}]}
+
+
+def test_grocery_list_is_accepted_once_per_plan():
+    ensure_ready()
+    session = SessionLocal()
+    try:
+        assert not is_grocery_list_accepted(session, 7001, 1)
+        assert accept_grocery_list(session, 7001, 1, GROCERIES, PLAN)
+        assert is_grocery_list_accepted(session, 7001, 1)
+        assert get_pantry(session, 7001)["rice"].quantity == 990.0
+
+        assert not accept_grocery_list(session, 7001, 1, GROCERIES, PLAN)
+        assert get_pantry(session, 7001)["rice"].quantity == 990.0
+        assert accept_grocery_list(session, 7001, 2, GROCERIES, PLAN)
+        assert get_pantry(session, 7001)["rice"].quantity == 1980.0
+    finally:
+        session.close()
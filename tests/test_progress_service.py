@@ -0,0 +1,71 @@
+"""Stored weight trends: log_weight's incremental trend_kg equals a full recompute over the user's logs."""
+from datetime import date, timedelta
+
+import pytest
+
+from app.ai_engine.adaptive_tdee import smooth_weight
+from app.bootstrap import ensure_ready
+from app.database import SessionLocal
+from app.models.progress_log import ProgressLog
+from app.services.progress_service import log_weight, log_weights_bulk
+
+USER_ID = 9300
+START = date(2026, 1, 1)
+
+
+@pytest.fixture
+def session():
+    ensure_ready()
+    db = SessionLocal()
+    yield db
+    db.close()
+
+
+def recomputed_trends(session, user_id):
+    # Same order log_weight uses: by date, same-day logs by insertion (id)
+    logs = (
+        session.query(ProgressLog)
+        .filter(ProgressLog.user_id == user_id)
+        .order_by(ProgressLog.logged_at.asc(), ProgressLog.id.asc())
+        .all()
+    )
+    expected, prev = {}, None
+    for log in logs:
+        trend = float(log.weight_kg) if prev is None else smooth_weight(prev[1], log.weight_kg, (log.logged_at - prev[0]).days)
+        expected[log.id] = trend
+        prev = (log.logged_at, trend)
+    return {log.id: log.trend_kg for log in logs}, expected
+
+
+def test_first_log_trend_is_its_weight(session):
+    log = log_weight(session, USER_ID, 82.4, START)
+    assert log.trend_kg == 82.4
+
+
+@pytest.mark.parametrize("offsets", [
+    [0, 3, 7, 10],  # appends
+    [10, 0, 7, 3, 14, 1],  # out-of-order backfills
+    [0, 5, 5, 2, 5, 2, 9],  # same-day duplicates, appended and backfilled
+])
+def test_incremental_trend_matches_full_recompute(session, offsets):
+    user_id = USER_ID + 1 + len(offsets)
+    for k, offset in enumerate(offsets):
+        log_weight(session, user_id, 80 + (k % 3) * 0.7 - k * 0.1, START + timedelta(days=offset))
+        stored, expected = recomputed_trends(session, user_id)
+        assert stored == pytest.approx(expected, rel=0, abs=1e-9), k
+
+
+def test_bulk_rows_map_to_their_inputs_with_duplicate_values(session):
+    user_id = USER_ID + 20
+    day = START + timedelta(days=40)
+    # Steady 80 kg keeps the trend at 80, so the three same-day rows are identical apart from insertion order
+    entries = [(day, 80.0), (day, 80.0), (day + timedelta(days=1), 81.0), (day - timedelta(days=2), 80.0), (day, 80.0)]
+    rows = log_weights_bulk(session, user_id, entries)
+    assert [(r.logged_at, r.weight_kg) for r in rows] == entries
+    # Same-day logs keep input order, so ids must increase along it
+    assert rows[0].id < rows[1].id < rows[4].id
+    stored = {log.id: log for log in session.query(ProgressLog).filter(ProgressLog.user_id == user_id)}
+    assert [(stored[r.id].logged_at, stored[r.id].weight_kg, stored[r.id].trend_kg) for r in rows] == [
+        (r.logged_at, r.weight_kg, r.trend_kg) for r in rows
+    ]
+    assert {r.id: r.trend_kg for r in rows} == pytest.approx(recomputed_trends(session, user_id)[1], rel=0, abs=1e-9)
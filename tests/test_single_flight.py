@@ -0,0 +1,83 @@
+"""SingleFlight.do: concurrent callers for one key share the leader's single run, result or error."""
+import threading
+import time
+
+from app.services.single_flight import SingleFlight
+
+FOLLOWERS = 7
+
+
+def run_concurrently(flight, key, fn, started, release):
+    """Start a leader (fn sets started, then waits for release), then FOLLOWERS more callers for the same key.
+    Returns each caller's outcome."""
+    outcomes = [None] * (FOLLOWERS + 1)
+
+    def call(i):
+        try:
+            outcomes[i] = ("ok", flight.do(key, fn))
+        except Exception as e:
+            outcomes[i] = ("error", e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(FOLLOWERS + 1)]
+    threads[0].start()
+    assert started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    time.sleep(0.1)  # let the followers reach done.wait() before the leader finishes
+    release.set()
+    for t in threads:
+        t.join(5)
+    return outcomes
+
+
+def test_concurrent_callers_share_one_run():
+    started, release = threading.Event(), threading.Event()
+    flight, calls = SingleFlight(), []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"plan": 42}
+
+    outcomes = run_concurrently(flight, "meal:1:v1", fn, started, release)
+    assert len(calls) == 1
+    assert [status for status, _ in outcomes] == ["ok"] * (FOLLOWERS + 1)
+    assert outcomes[0][1] == ({"plan": 42}, False)
+    assert all(value == ({"plan": 42}, True) for _, value in outcomes[1:])
+    # The key is released once the run finishes: the next call runs fn again
+    assert flight.do("meal:1:v1", lambda: "fresh") == ("fresh", False)
+
+
+def test_leader_error_reaches_every_waiter():
+    started, release = threading.Event(), threading.Event()
+    flight, calls = SingleFlight(), []
+    error = RuntimeError("LLM unavailable")
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        raise error
+
+    outcomes = run_concurrently(flight, "meal:1:v1", fn, started, release)
+    assert len(calls) == 1
+    assert all(outcome == ("error", error) for outcome in outcomes)
+    assert flight.do("meal:1:v1", lambda: "retried") == ("retried", False)
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    started, release = threading.Event(), threading.Event()
+    flight = SingleFlight()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    leader = threading.Thread(target=flight.do, args=("meal:1:v1", slow))
+    leader.start()
+    assert started.wait(5)
+    assert flight.do("workout:1:v1", lambda: "other") == ("other", False)
+    release.set()
+    leader.join(5)
@@ -0,0 +1,19 @@
+"""Profile codes: unique, and not biased toward any leading character."""
+from collections import Counter
+
+from app.bootstrap import ensure_ready
+from app.database import SessionLocal
+from app.services.user_service import _generate_profile_code
+
+
+def test_profile_codes_are_not_skewed_by_candidate_order():
+    ensure_ready()
+    session = SessionLocal()
+    try:
+        codes = [_generate_profile_code(session) for _ in range(1800)]
+    finally:
+        session.close()
+    assert all(len(c) == 8 and c.isalnum() and c == c.upper() for c in codes)
+    first = Counter(c[0] for c in codes)
+    # 36 symbols: about 50 each; taking the smallest of 10 candidates gave '0' about 430
+    assert max(first.values()) < 100
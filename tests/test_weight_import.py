@@ -0,0 +1,80 @@
+"""Weight export parsing: CSV / JSON / JSON Lines streaming and the unit rules."""
+import io
+import json
+from datetime import date
+
+import pytest
+
+from app.services.weight_import_service import KG_PER_LB, WeightImportError, iter_weight_records
+
+
+def records(text, **kwargs):
+    return list(iter_weight_records(io.BytesIO(text.encode()), **kwargs))
+
+
+def test_csv_detects_date_and_weight_columns():
+    assert records("Date,Weight (kg),Note\n2024-01-02,70.5,x\n01/03/2024,70.1,\n") == [
+        (date(2024, 1, 2), 70.5), (date(2024, 1, 3), 70.1),
+    ]
+
+
+def test_csv_with_bom_and_invalid_rows():
+    rows = records("\ufeffdate,weight\n2024-01-02,70\nnot a date,71\n2024-01-04,heavy\n2024-01-05,12\n")
+    assert rows == [(date(2024, 1, 2), 70.0), (None, 71.0), (date(2024, 1, 4), None), (date(2024, 1, 5), None)]
+
+
+def test_csv_without_weight_column_is_rejected():
+    with pytest.raises(WeightImportError):
+        records("foo,bar\n1,2\n")
+
+
+def test_json_array_jsonl_and_wrapped_object_agree():
+    items = [{"dateTime": f"2024-01-{d:02d}T07:00:00Z", "value": 70 + d / 10} for d in range(1, 30)]
+    expected = [(date(2024, 1, d), 70 + d / 10) for d in range(1, 30)]
+    assert records(json.dumps(items)) == expected
+    assert records("\n".join(json.dumps(i) for i in items) + "\n") == expected
+    assert records(json.dumps({"weight": items})) == expected
+
+
+def test_json_epoch_timestamps():
+    ts = 1704182400  # 2024-01-02T08:00:00Z
+    assert records(json.dumps([{"timestamp": ts, "kg": 70}, {"timestamp": ts * 1000, "kg": 71}])) == [
+        (date(2024, 1, 2), 70.0), (date(2024, 1, 2), 71.0),
+    ]
+
+
+def test_json_values_split_across_reads():
+    # Many records, so values (including bare numbers) straddle the parser's read boundaries
+    items = [{"date": f"2024-{1 + d // 28:02d}-{1 + d % 28:02d}", "weight": 60 + d % 50} for d in range(3000)]
+    rows = records(json.dumps(items, indent=2))
+    assert len(rows) == 3000
+    assert [w for _, w in rows] == [float(60 + d % 50) for d in range(3000)]
+
+
+def test_invalid_json_is_rejected():
+    with pytest.raises(WeightImportError):
+        records('[{"date": "2024-01-02", "weight": 70}, {"date": ')
+
+
+def test_unit_field_wins_over_column_and_argument():
+    rows = records("date,weight_kg,unit\n2024-01-02,154,lbs\n2024-01-03,70,kg\n", unit="lb")
+    assert rows[0][1] == pytest.approx(154 * KG_PER_LB)
+    assert rows[1][1] == 70.0
+    rows = records(json.dumps([{"date": "2024-01-02", "weight": 70, "unit": "kg"}]), unit="lb")
+    assert rows == [(date(2024, 1, 2), 70.0)]
+
+
+def test_column_name_wins_over_argument():
+    assert records("date,weight_kg\n2024-01-02,70\n", unit="lb") == [(date(2024, 1, 2), 70.0)]
+    rows = records("date,Weight (lbs)\n2024-01-02,154\n", unit="kg")
+    assert rows[0][1] == pytest.approx(154 * KG_PER_LB)
+    rows = records(json.dumps([{"date": "2024-01-02", "weight_lb": 154}]))
+    assert rows[0][1] == pytest.approx(154 * KG_PER_LB)
+
+
+def test_argument_applies_only_to_unlabelled_weights():
+    assert records("date,weight\n2024-01-02,154\n", unit="lb")[0][1] == pytest.approx(154 * KG_PER_LB)
+    assert records("date,weight\n2024-01-02,70\n") == [(date(2024, 1, 2), 70.0)]
+    # An empty unit field says nothing, so the argument applies
+    rows = records("date,weight,unit\n2024-01-02,154,\n", unit="lb")
+    assert rows[0][1] == pytest.approx(154 * KG_PER_LB)